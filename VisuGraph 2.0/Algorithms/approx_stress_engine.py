@@ -0,0 +1,177 @@
+import heapq
+import math
+
+import numpy as np
+
+from Algorithms.stress_engine import StressEngine
+
+
+class ApproxStressEngine(StressEngine):
+    """Приближённая итерация SacredAlgorithm за O(n log n) по времени и O(k n + m) по памяти.
+
+    Пары с заданным расстоянием считаются точно, как в разреженном режиме
+    StressEngine. Остальные пары учитываются через k опорных вершин:
+    расстояние от i до j оценивается кратчайшим путём от ближайшей к i
+    опорной вершины до j. Вклад далёких вершин суммируется по ячейкам
+    квадродерева (Barnes-Hut): ячейка, видимая из вершины под углом меньше
+    theta, заменяется одной точкой в центре масс с массой, равной числу
+    вершин, и средним оценочным расстоянием. Чем меньше theta и чем больше
+    pivots, тем точнее и медленнее итерация.
+
+    Смещение вершины делится на число её слагаемых (вершин, до которых
+    есть путь), то есть вершина сдвигается к среднему из положений,
+    которые ей предлагают остальные. Без этого шаг растёт с числом вершин
+    и при alpha порядка 1 раскладка расходится.
+
+    Ошибка считается, как и в StressEngine, только по заданным расстояниям.
+    Пары из разных компонент связности (путь не существует) не учитываются.
+    """
+
+    PIVOTS = 32
+    THETA = 0.8
+    MAX_DEPTH = 16  # Глубина квадродерева; более близкие вершины не разделяются
+
+    def __init__(self, vertex_ids, distances, alpha=1.0, pivots=PIVOTS, theta=THETA):
+        super().__init__(vertex_ids, distances, alpha, mode="sparse")
+        self.mode = "approx"
+        self.theta = theta
+        size = len(self.vertex_ids)
+
+        # Пары (rows, cols) отсортированы по rows - это готовые списки смежности
+        self.indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.rows, minlength=size), out=self.indptr[1:])
+
+        self.pivots, pivot_distances = self._select_pivots(min(pivots, size))
+        self.pivot_of = np.argmin(pivot_distances, axis=0) if size else np.empty(0, dtype=np.int64)
+        pivot_distances[np.isinf(pivot_distances)] = np.nan  # nan - путь не существует
+        self.pivot_distances = pivot_distances  # k x n: кратчайшие пути от опорных вершин
+
+        # Оценка заданных пар - её вклад уже входит в дальнее поле и заменяется точным
+        self.estimated_targets = pivot_distances[self.pivot_of[self.rows], self.cols]
+
+        # Слагаемых у вершины столько, сколько вершин достижимо из её опорной; если опорная
+        # вершина из другой компоненты (опорных меньше, чем компонент), остаются только заданные пары
+        reachable = (~np.isnan(pivot_distances)).sum(axis=1)[self.pivot_of] - 1 if size else np.empty(0)
+        own = ~np.isnan(pivot_distances[self.pivot_of, np.arange(size)]) if size else np.empty(0, dtype=bool)
+        terms = np.where(own, reachable, np.bincount(self.rows, minlength=size))
+        self.scale = 1 / np.maximum(terms, 1)
+
+    @staticmethod
+    def _shortest_paths(source, indptr, cols, targets):
+        """Дейкстра по заданным расстояниям от строки source; смежность - списки в формате CSR"""
+        distances = [math.inf] * (len(indptr) - 1)
+        distances[source] = 0.0
+        heap = [(0.0, source)]
+        while heap:
+            distance, vertex = heapq.heappop(heap)
+            if distance > distances[vertex]:
+                continue
+            for k in range(indptr[vertex], indptr[vertex + 1]):
+                candidate = distance + targets[k]
+                if candidate < distances[cols[k]]:
+                    distances[cols[k]] = candidate
+                    heapq.heappush(heap, (candidate, cols[k]))
+        return distances
+
+    def _select_pivots(self, count):
+        """Опорные вершины выбором самой далёкой от уже выбранных (max-min); возвращает (строки, расстояния)"""
+        adjacency = self.indptr.tolist(), self.cols.tolist(), self.targets.tolist()
+        pivots, rows = [], []
+        nearest = np.full(len(self.vertex_ids), np.inf)
+        candidate = 0
+        for _ in range(count):
+            pivots.append(candidate)
+            rows.append(self._shortest_paths(candidate, *adjacency))
+            np.minimum(nearest, rows[-1], out=nearest)
+            candidate = int(np.argmax(nearest))  # Недостижимые вершины (inf) выбираются первыми
+            if nearest[candidate] == 0:
+                break
+        return np.array(pivots, dtype=np.int64), np.array(rows, dtype=np.float64).reshape(len(rows), -1)
+
+    def step(self, positions):
+        positions = np.asarray(positions, dtype=np.float64)
+        if not len(positions):
+            return positions.copy()
+
+        delta = positions[self.rows] - positions[self.cols]
+        distances = np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1])
+        factors = self._factors(self.targets, distances) - self._factors(self.estimated_targets, distances)
+        shift = self._far_field(positions)
+        np.add.at(shift, self.rows, factors[:, None] * delta)
+        return positions + shift * self.scale[:, None]
+
+    def _far_field(self, positions):
+        """Сумма оценочных слагаемых по всем парам, обход квадродерева сразу для всех вершин"""
+        size = len(positions)
+        lower = positions.min(axis=0)
+        span = float((positions.max(axis=0) - lower).max()) or 1.0
+        cells = 1 << self.MAX_DEPTH
+        quantized = np.minimum(((positions - lower) / span * cells).astype(np.int64), cells - 1)
+
+        result = np.zeros_like(positions)
+        vertices = np.arange(size)
+        nodes = np.zeros(size, dtype=np.int64)  # Фронт обхода: пары (вершина, узел текущего уровня)
+        node_of, counts, centers, members = self._tree_level(positions, quantized, 0)
+        for depth in range(self.MAX_DEPTH + 1):
+            own = node_of[vertices] == nodes
+            single = counts[nodes] == 1
+            delta = positions[vertices] - centers[nodes]
+            distances = np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1])
+            last = depth == self.MAX_DEPTH
+            with np.errstate(divide="ignore"):
+                far = span / (1 << depth) / distances < self.theta
+            # На последнем уровне чужие ячейки берутся целиком, а своя отбрасывается
+            accept = ~own & (single | far | last)
+
+            if accept.any():
+                pairs, accepted_nodes = vertices[accept], nodes[accept]
+                pivot_rows = self.pivot_of[pairs]
+                is_single = single[accept]
+                targets = np.empty(len(pairs))
+                targets[is_single] = self.pivot_distances[pivot_rows[is_single], members[accepted_nodes[is_single]]]
+                if not is_single.all():
+                    means = self._cell_means(node_of, counts)
+                    targets[~is_single] = means[pivot_rows[~is_single], accepted_nodes[~is_single]]
+                terms = counts[accepted_nodes] * self._factors(targets, distances[accept])
+                result[:, 0] += np.bincount(pairs, weights=terms * delta[accept, 0], minlength=size)
+                result[:, 1] += np.bincount(pairs, weights=terms * delta[accept, 1], minlength=size)
+
+            expand = ~accept & ~single  # Свой одиночный узел - сама вершина
+            if last or not expand.any():
+                break
+            child_node_of, counts, centers, members = self._tree_level(positions, quantized, depth + 1)
+            vertices, nodes = self._children(node_of, members, vertices[expand], nodes[expand])
+            node_of = child_node_of
+        return result
+
+    def _tree_level(self, positions, quantized, depth):
+        """Непустые ячейки уровня depth: (ячейка каждой вершины, число вершин, центры масс, одна вершина ячейки)"""
+        shift = self.MAX_DEPTH - depth
+        keys = ((quantized[:, 0] >> shift) << depth) + (quantized[:, 1] >> shift)
+        _, node_of = np.unique(keys, return_inverse=True)
+        node_of = node_of.reshape(-1)
+        counts = np.bincount(node_of)
+        centers = np.column_stack((np.bincount(node_of, weights=positions[:, 0]),
+                                   np.bincount(node_of, weights=positions[:, 1]))) / counts[:, None]
+        members = np.empty(len(counts), dtype=np.int64)
+        members[node_of] = np.arange(len(node_of))
+        return node_of, counts, centers, members
+
+    def _cell_means(self, node_of, counts):
+        """Средние кратчайшие пути от каждой опорной вершины до вершин каждой ячейки, массив k x ячейки"""
+        return np.array([np.bincount(node_of, weights=row, minlength=len(counts)) for row in self.pivot_distances],
+                        dtype=np.float64).reshape(len(self.pivot_distances), -1) / counts
+
+    @staticmethod
+    def _children(node_of, child_members, vertices, nodes):
+        """Новый фронт: каждая пара (вершина, узел) заменяется парами с дочерними узлами"""
+        parents = node_of[child_members]  # Родитель каждого узла следующего уровня
+        order = np.argsort(parents, kind="stable")
+        indptr = np.zeros(int(node_of.max()) + 2, dtype=np.int64)
+        np.cumsum(np.bincount(parents, minlength=len(indptr) - 1), out=indptr[1:])
+
+        numbers = indptr[nodes + 1] - indptr[nodes]
+        total = int(numbers.sum())
+        starts = np.repeat(indptr[nodes], numbers)
+        offsets = np.arange(total) - np.repeat(np.cumsum(numbers) - numbers, numbers)
+        return np.repeat(vertices, numbers), order[starts + offsets]
@@ -0,0 +1,119 @@
+import hashlib
+import os
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from Algorithms.shortest_paths import dijkstra
+
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".visugraph", "distances")
+APSP_MAX_VERTICES = 2000  # Больше - пар слишком много, в режиме "auto" берутся опорные вершины
+PIVOTS = 64  # Опорных вершин в режиме "pivots"
+TASK_SOURCES = 32  # Источников в одной задаче пула процессов
+TARGET_MODES = ("edges", "apsp", "pivots", "auto")
+
+_worker = {}  # Состояние процесса пула: смежность и выходной массив в общей памяти
+
+
+def csr_arrays(size, edges):
+    """Неориентированная CSR-смежность по рёбрам (строка начала, строка конца, вес): списки Python"""
+    edges = np.asarray(edges, dtype=np.float64).reshape(-1, 3)
+    starts, ends, weights = edges[:, 0].astype(np.int64), edges[:, 1].astype(np.int64), edges[:, 2]
+    sources = np.concatenate((starts, ends))
+    targets = np.concatenate((ends, starts))
+    edge_rows = np.concatenate((np.arange(len(edges)), np.arange(len(edges))))
+    order = np.argsort(sources, kind="stable")
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=size), out=indptr[1:])
+    return indptr.tolist(), targets[order].tolist(), edge_rows[order].tolist(), weights.tolist()
+
+
+def _init_worker(csr, memory_name, shape):
+    memory = shared_memory.SharedMemory(name=memory_name)
+    _worker.update(csr=csr, memory=memory, output=np.ndarray(shape, dtype=np.float64, buffer=memory.buf))
+
+
+def _run_sources(task):
+    """Дейкстра из каждого источника задачи; строки результата пишутся прямо в общую память"""
+    first_row, sources = task
+    output = _worker["output"]
+    for offset, source in enumerate(sources):
+        output[first_row + offset] = dijkstra(*_worker["csr"], source)[0]
+    return len(sources)
+
+
+def shortest_path_rows(size, edges, sources, workers=None):
+    """Кратчайшие расстояния от каждой вершины sources до всех вершин: массив (len(sources), size).
+
+    Источники делятся на задачи по TASK_SOURCES и считаются в пуле
+    процессов; каждый процесс пишет свои строки в общий массив
+    shared_memory, так что результат не пересылается между процессами.
+    """
+    csr = csr_arrays(size, edges)
+    shape = (len(sources), size)
+    tasks = [(start, sources[start:start + TASK_SOURCES]) for start in range(0, len(sources), TASK_SOURCES)]
+    if workers == 1 or len(tasks) <= 1:
+        output = np.empty(shape)
+        for row, source in enumerate(sources):
+            output[row] = dijkstra(*csr, source)[0]
+        return output
+
+    memory = shared_memory.SharedMemory(create=True, size=max(8 * shape[0] * shape[1], 1))
+    try:
+        with Pool(workers, initializer=_init_worker, initargs=(csr, memory.name, shape)) as pool:
+            for _ in pool.imap_unordered(_run_sources, tasks):
+                pass
+        return np.ndarray(shape, dtype=np.float64, buffer=memory.buf).copy()
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def cache_key(size, edges, mode, pivots):
+    """Хэш графа и параметров расчёта - имя файла кэша"""
+    digest = hashlib.sha256(f"{mode}:{pivots}:{size}:".encode())
+    digest.update(np.ascontiguousarray(np.asarray(edges, dtype=np.float64).reshape(-1, 3)).tobytes())
+    return digest.hexdigest()
+
+
+def pivot_sources(size, pivots):
+    """Опорные вершины: детерминированная случайная выборка, чтобы кэш совпадал между запусками"""
+    count = min(pivots, size)
+    return sorted(np.random.default_rng(0).choice(size, count, replace=False).tolist())
+
+
+def target_distances(size, edges, mode="auto", pivots=PIVOTS, workers=None, cache_dir=CACHE_DIR):
+    """Теоретические расстояния для SacredLayout по кратчайшим путям графа.
+
+    edges - тройки (id начала, id конца, вес) с id вершин от 1 до size.
+    mode="apsp" - расстояния между всеми парами вершин, "pivots" - от
+    pivots опорных вершин до всех остальных, "auto" - apsp для графов до
+    APSP_MAX_VERTICES вершин, иначе pivots. Результат кэшируется на диске
+    по хэшу графа, и повторная раскладка того же графа расчёт пропускает.
+    Возвращает тройки (id начала, id конца, расстояние) для достижимых пар.
+    """
+    if mode == "auto":
+        mode = "apsp" if size <= APSP_MAX_VERTICES else "pivots"
+    if mode not in ("apsp", "pivots"):
+        raise ValueError(f"Неизвестный режим расстояний: {mode}")
+    rows = [(start - 1, end - 1, weight) for start, end, weight in edges]
+    sources = list(range(size)) if mode == "apsp" else pivot_sources(size, pivots)
+
+    path = os.path.join(cache_dir, cache_key(size, rows, mode, pivots) + ".npy")
+    if os.path.exists(path):
+        distances = np.load(path, mmap_mode="r")
+    else:
+        distances = shortest_path_rows(size, rows, sources, workers)
+        os.makedirs(cache_dir, exist_ok=True)
+        temporary_path = path + ".tmp.npy"
+        np.save(temporary_path, distances)
+        os.replace(temporary_path, path)
+
+    source_rows = np.repeat(np.array(sources, dtype=np.int64), size)
+    target_rows = np.tile(np.arange(size), len(sources))
+    values = np.asarray(distances).reshape(-1)
+    keep = np.isfinite(values) & (values > 0)
+    if mode == "apsp":
+        keep &= source_rows < target_rows  # Каждая пара один раз
+    return list(zip((source_rows[keep] + 1).tolist(), (target_rows[keep] + 1).tolist(), values[keep].tolist()))
@@ -0,0 +1,231 @@
+import math
+import random
+import time
+
+import numpy as np
+
+from Algorithms.approx_stress_engine import ApproxStressEngine
+from Algorithms.graph_distances import TARGET_MODES, target_distances
+from Algorithms.multilevel import multilevel_positions
+from Algorithms.stress_engine import StressEngine
+from Core.weight_matrix import SparseMatrix, as_sparse, check_weight_matrix, dense_array, load_weight_matrix
+
+
+def load_adjacency_matrix(file_path):
+    """Читает матрицу смежности: плотную из JSON или разреженную (SparseMatrix) из JSON или .npz."""
+    return load_weight_matrix(file_path)
+
+
+def validate_adjacency_matrix(matrix):
+    """Проверяет матрицу смежности; при ошибке выбрасывает ValueError."""
+    check_weight_matrix(matrix).raise_for_errors()
+
+
+def adjacency_matrix_to_edges(matrix):
+    """Список рёбер {"start", "end", "weight"} по заданным элементам матрицы (вершины с 1), по ребру на пару."""
+    return as_sparse(matrix).edges()
+
+
+def scale_to_canvas(positions, width, height):
+    """Масштабирует координаты так, чтобы они заняли прямоугольник width x height."""
+    positions = np.asarray(positions, dtype=np.float64)
+    minimum = positions.min(axis=0)
+    span = positions.max(axis=0) - minimum
+    safe_span = np.where(span != 0, span, 1)
+    scale = np.where(span != 0, np.array([width, height]) / safe_span, 1)
+    return (positions - minimum) * scale
+
+
+class LayoutResult:
+    """Результат раскладки: id вершин, их координаты, ошибка на каждой итерации и причина остановки."""
+
+    def __init__(self, vertex_ids, positions, errors, stop_reason=None):
+        self.vertex_ids = vertex_ids
+        self.positions = positions  # Массив n x 2 в порядке vertex_ids
+        self.errors = errors
+        self.stop_reason = stop_reason  # Одна из констант SacredLayout.STOP_*
+
+    def as_dict(self):
+        """Координаты в виде {id вершины: (x, y)}"""
+        return {vertex_id: (x, y) for vertex_id, (x, y) in zip(self.vertex_ids, self.positions.tolist())}
+
+
+class SacredLayout:
+    """Вычислительное ядро SacredAlgorithm без Qt: матрица и параметры на входе, координаты на выходе.
+
+    Подходит для тестов, пакетной обработки и запуска в отдельном потоке
+    или процессе; графический интерфейс лишь вызывает step() и рисует
+    результат.
+
+    iterations - верхняя граница числа итераций; расчёт заканчивается раньше,
+    если относительное уменьшение ошибки за итерацию меньше tolerance,
+    наибольшее смещение вершины меньше displacement_tolerance или время
+    расчёта превысило time_budget секунд (None отключает критерий). В режиме
+    adaptive шаг, увеличивший ошибку, отменяется и alpha уменьшается, а
+    пока ошибка падает - увеличивается; без него нечисловая ошибка
+    останавливает расчёт. В итоге остаются координаты с наименьшей
+    ошибкой из всех пройденных, а не последние.
+
+    При multilevel=True начальные координаты берутся не случайными, а из
+    многоуровневой раскладки (см. Algorithms.multilevel), и итерации
+    только уточняют её на исходном графе. Если она всё же получилась
+    нечисловой, начальные координаты остаются случайными.
+
+    targets="edges" берёт теоретические расстояния только по рёбрам;
+    "apsp", "pivots" или "auto" - по кратчайшим путям между всеми парами
+    или от опорных вершин (см. Algorithms.graph_distances), так что
+    несмежные вершины тоже расходятся на свои расстояния. Тогда шаг
+    вершины нормируется числом её слагаемых (StressEngine, normalized).
+    Кратчайшие пути и движок итераций готовит prepare(): его вызывает
+    первая итерация, то есть уже поток расчёта, а не конструктор.
+    """
+
+    STOP_ITERATIONS = "iterations"  # Выполнены все итерации
+    STOP_ERROR = "error"  # Ошибка перестала уменьшаться
+    STOP_DISPLACEMENT = "displacement"  # Вершины практически не смещаются
+    STOP_TIME = "time"  # Исчерпан бюджет времени
+    STOP_DIVERGED = "diverged"  # Ошибка стала бесконечной или нечисловой
+
+    ADAPTIVE_GROWTH = 1.1  # Множитель alpha после уменьшения ошибки
+    ADAPTIVE_SHRINK = 0.5  # Множитель alpha после роста ошибки
+    ADAPTIVE_MIN_ALPHA = 1e-6
+
+    def __init__(self, matrix, iterations=10, alpha=1.0, seed=None, width=1000, height=1000,
+                 tolerance=None, displacement_tolerance=None, time_budget=None, adaptive=False,
+                 multilevel=False, mode="auto", theta=ApproxStressEngine.THETA, targets="edges"):
+        if not isinstance(matrix, SparseMatrix):
+            matrix = dense_array(matrix)  # Преобразуется один раз и для проверки, и для рёбер
+        validate_adjacency_matrix(matrix)
+        self.iterations = iterations
+        self.alpha = alpha
+        self.tolerance = tolerance
+        self.displacement_tolerance = displacement_tolerance
+        self.time_budget = time_budget
+        self.adaptive = adaptive
+        self.width = width  # Область, в которой выбираются начальные координаты
+        self.height = height
+        self.random = random.Random(seed)
+
+        self.edges = adjacency_matrix_to_edges(matrix)
+        self.edge_distances = [(edge["start"], edge["end"], edge["weight"]) for edge in self.edges]
+        self.vertex_ids = list(range(1, len(matrix) + 1))
+        if targets not in TARGET_MODES:
+            raise ValueError(f"Неизвестный режим расстояний: {targets}")
+        self.targets = targets
+        self.mode = mode
+        self.theta = theta
+        self.distances = None  # Теоретические расстояния; задаёт prepare()
+        self.engine = None
+
+        self.multilevel = multilevel
+        self.positions = self.multilevel_positions() if multilevel else self.random_positions()
+        self.errors = []
+        self.alphas = []  # alpha, с которым выполнена каждая итерация
+        self.displacement = None  # Наибольшее смещение вершины на последней итерации
+        self.best_error = math.inf  # Наименьшая ошибка из пройденных координат
+        self.best_positions = self.positions
+        self.accepted = None  # (ошибка, координаты) последнего принятого шага в режиме adaptive
+        self.elapsed = 0.0  # Время, затраченное на итерации, с
+        self.iteration = 0
+        self.stop_reason = None
+
+    def random_positions(self):
+        """Случайные целочисленные начальные координаты в пределах width x height"""
+        return np.array([(self.random.randint(0, self.width), self.random.randint(0, self.height))
+                         for _ in self.vertex_ids], dtype=np.float64).reshape(-1, 2)
+
+    def multilevel_positions(self):
+        """Начальные координаты из раскладки огрублённых копий графа; случайные, если она разошлась"""
+        index = {vertex_id: row for row, vertex_id in enumerate(self.vertex_ids)}
+        rows = [(index[start], index[end], distance) for start, end, distance in self.edge_distances]
+        positions = multilevel_positions(len(self.vertex_ids), rows, self.random, self.width, self.height, self.alpha)
+        return positions if np.isfinite(positions).all() else self.random_positions()
+
+    def prepare(self):
+        """Теоретические расстояния и движок итераций; повторный вызов ничего не делает"""
+        if self.engine is not None:
+            return
+        if self.targets == "edges":
+            self.distances = self.edge_distances
+        else:
+            self.distances = target_distances(len(self.vertex_ids), self.edge_distances, self.targets)
+        if self.mode == "approx":
+            self.engine = ApproxStressEngine(self.vertex_ids, self.distances, self.alpha, theta=self.theta)
+        else:
+            self.engine = StressEngine(self.vertex_ids, self.distances, self.alpha, self.mode,
+                                       normalized=self.targets != "edges")
+
+    def step(self):
+        """Одна итерация: записывает ошибку текущих координат и переходит к новым"""
+        self.prepare()
+        started = time.perf_counter()
+        error = self.engine.error(self.positions)
+        self.errors.append(error)
+        self.remember_best(error, self.positions)
+        if self.adaptive:
+            self.adapt_alpha(error)
+        self.alphas.append(self.engine.alpha)
+        positions = self.engine.step(self.positions)
+        delta = positions - self.positions
+        self.displacement = float(np.sqrt((delta * delta).sum(axis=1)).max()) if len(delta) else 0.0
+        self.positions = positions
+        self.iteration += 1
+        self.elapsed += time.perf_counter() - started
+        self.stop_reason = self.check_convergence()
+        return self.positions
+
+    def remember_best(self, error, positions):
+        # Нечисловая ошибка не меньше ни одной; нечисловые координаты нельзя показать
+        if error < self.best_error and np.isfinite(positions).all():
+            self.best_error, self.best_positions = error, positions
+
+    def adapt_alpha(self, error):
+        """Меняет шаг по динамике ошибки: рост ошибки - перелёт, шаг отменяется и уменьшается"""
+        if self.accepted is not None and not error <= self.accepted[0]:
+            self.positions = self.accepted[1]  # Откат к координатам до шага, увеличившего ошибку
+            self.engine.alpha = max(self.engine.alpha * self.ADAPTIVE_SHRINK, self.ADAPTIVE_MIN_ALPHA)
+            return
+        if self.accepted is not None:
+            self.engine.alpha *= self.ADAPTIVE_GROWTH
+        self.accepted = (error, self.positions)
+
+    def check_convergence(self):
+        """Причина досрочной остановки после текущей итерации или None"""
+        if self.time_budget is not None and self.elapsed >= self.time_budget:
+            return self.STOP_TIME
+        if not self.adaptive and not math.isfinite(self.errors[-1]):
+            return self.STOP_DIVERGED
+        if self.displacement_tolerance is not None and self.displacement < self.displacement_tolerance:
+            return self.STOP_DISPLACEMENT
+        if self.tolerance is not None and len(self.errors) >= 2:
+            previous, current = self.errors[-2], self.errors[-1]
+            if previous == 0:
+                return self.STOP_ERROR
+            decrease = (previous - current) / previous
+            # В адаптивном режиме рост ошибки исправляется шагом, останавливаемся только на плато
+            if decrease < self.tolerance and not (self.adaptive and decrease < 0):
+                return self.STOP_ERROR
+        return None
+
+    def iterate(self):
+        """Генератор координат после каждой из оставшихся итераций"""
+        while self.iteration < self.iterations and self.stop_reason is None:
+            yield self.step()
+        if self.stop_reason is None and self.iteration >= self.iterations:
+            self.stop_reason = self.STOP_ITERATIONS
+        self.finish()
+
+    def finish(self):
+        """Оставляет координаты с наименьшей ошибкой; у последних ошибка ещё не посчитана"""
+        self.prepare()
+        self.remember_best(self.engine.error(self.positions), self.positions)
+        self.positions = self.best_positions
+
+    def result(self):
+        return LayoutResult(self.vertex_ids, self.positions, self.errors, self.stop_reason)
+
+    def run(self):
+        """Выполняет все итерации и возвращает LayoutResult"""
+        for _ in self.iterate():
+            pass
+        return self.result()
@@ -0,0 +1,65 @@
+import threading
+
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class LayoutWorker(QObject):
+    """Выполняет итерации SacredLayout в отдельном потоке.
+
+    До итераций в том же потоке вызывается SacredLayout.prepare() - расчёт
+    кратчайших путей для теоретических расстояний не задерживает окно.
+    После каждой итерации сохраняет снимок (номер итерации, координаты);
+    холст забирает только последний снимок со своей частотой кадров,
+    поэтому скорость расчёта не зависит от скорости отрисовки. Нечисловые
+    координаты разошедшегося шага в снимок не попадают. finished
+    испускается всегда, даже если расчёт завершился исключением.
+    """
+
+    finished = pyqtSignal()
+
+    def __init__(self, layout):
+        super().__init__()
+        self.layout = layout
+        self.cancelled = False
+        self._paused = False
+        self._snapshot = None
+        self._condition = threading.Condition()
+
+    def run(self):
+        """Цикл итераций; вызывается в рабочем потоке"""
+        try:
+            self.layout.prepare()
+            for positions in self.layout.iterate():
+                with self._condition:
+                    if np.isfinite(positions).all():
+                        # Массив координат после step() больше не изменяется, копия не нужна
+                        self._snapshot = (self.layout.iteration, positions)
+                    while self._paused and not self.cancelled:
+                        self._condition.wait()
+                    if self.cancelled:
+                        break
+        except Exception as e:
+            print("Ошибка при расчёте раскладки:", e)
+        finally:
+            self.finished.emit()
+
+    def take_snapshot(self):
+        """Последний ещё не отрисованный снимок или None"""
+        with self._condition:
+            snapshot, self._snapshot = self._snapshot, None
+        return snapshot
+
+    def pause(self):
+        with self._condition:
+            self._paused = True
+
+    def resume(self):
+        with self._condition:
+            self._paused = False
+            self._condition.notify_all()
+
+    def cancel(self):
+        with self._condition:
+            self.cancelled = True
+            self._condition.notify_all()
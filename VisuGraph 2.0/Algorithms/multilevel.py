@@ -0,0 +1,108 @@
+import math
+
+import numpy as np
+
+from Algorithms.stress_engine import StressEngine
+
+MAX_LEVEL_ALPHA = 1.0  # Больший шаг огрублённых уровней перелетает и уводит координаты в бесконечность
+
+
+class Level:
+    """Один уровень огрубления: вершины - строки 0..size-1, расстояния - тройки (строка, строка, d).
+
+    parents[v] - строка следующего (более грубого) уровня, в которую слита вершина v,
+    spreads[v] - на сколько вершину нужно отодвинуть от центра родителя при
+    интерполяции (половина длины стянутого ребра, 0 для неспаренной вершины).
+    """
+
+    def __init__(self, size, distances):
+        self.size = size
+        self.distances = distances
+        self.parents = None
+        self.spreads = None
+
+
+def coarsen(level):
+    """Жадное паросочетание по самым коротким рёбрам; возвращает следующий уровень"""
+    parents = [-1] * level.size
+    spreads = [0.0] * level.size
+    count = 0
+    for i, j, distance in sorted(level.distances, key=lambda pair: pair[2]):
+        if i != j and parents[i] < 0 and parents[j] < 0:
+            parents[i] = parents[j] = count
+            spreads[i] = spreads[j] = distance / 2
+            count += 1
+    for v in range(level.size):
+        if parents[v] < 0:
+            parents[v] = count
+            count += 1
+
+    sums = {}  # Пара строк грубого уровня -> [сумма расстояний, число пар]
+    for i, j, distance in level.distances:
+        ci, cj = parents[i], parents[j]
+        if ci == cj:
+            continue
+        total = sums.setdefault((min(ci, cj), max(ci, cj)), [0.0, 0])
+        total[0] += distance
+        total[1] += 1
+
+    level.parents = np.array(parents, dtype=np.int64)
+    level.spreads = np.array(spreads, dtype=np.float64)
+    return Level(count, [(ci, cj, total / number) for (ci, cj), (total, number) in sums.items()])
+
+
+def build_levels(size, distances, coarsest_size=50, min_reduction=0.9):
+    """Иерархия уровней от исходного графа до самого грубого.
+
+    Огрубление прекращается, когда вершин не больше coarsest_size или
+    паросочетание уменьшило граф меньше чем до min_reduction от прежнего размера.
+    """
+    levels = [Level(size, distances)]
+    while levels[-1].size > coarsest_size:
+        coarse = coarsen(levels[-1])
+        if coarse.size > min_reduction * levels[-1].size:
+            levels[-1].parents = levels[-1].spreads = None
+            break
+        levels.append(coarse)
+    return levels
+
+
+def interpolate(level, coarse_positions, rng):
+    """Начальные координаты уровня: центр родителя плюс разнесение пары в случайную сторону"""
+    positions = coarse_positions[level.parents].copy()
+    angles = np.array([rng.uniform(0, 2 * math.pi) for _ in range(len(coarse_positions))])
+    directions = np.column_stack((np.cos(angles), np.sin(angles)))[level.parents]
+    # Вершины пары расходятся в противоположные стороны, иначе они совпадут и не разойдутся
+    sign = np.ones(level.size)
+    first = np.zeros(len(coarse_positions), dtype=bool)
+    for v, parent in enumerate(level.parents.tolist()):
+        if first[parent]:
+            sign[v] = -1
+        first[parent] = True
+    return positions + (sign * level.spreads)[:, None] * directions
+
+
+def multilevel_positions(size, distances, rng, width, height, alpha=1.0, level_iterations=30, coarsest_size=50):
+    """Начальные координаты исходного графа, полученные раскладкой от грубого уровня к точному.
+
+    Самый грубый уровень раскладывается из случайных координат, каждый
+    следующий - из интерполированных и уточняется level_iterations
+    итерациями StressEngine с нормированным шагом, чтобы alpha порядка 1
+    не разгонял вершины с большим числом соседей; alpha больше
+    MAX_LEVEL_ALPHA на уровнях не используется. Сам исходный уровень
+    не уточняется: это делают обычные итерации SacredLayout.
+    """
+    levels = build_levels(size, distances, coarsest_size)
+    coarsest = levels[-1]
+    positions = np.array([(rng.randint(0, width), rng.randint(0, height)) for _ in range(coarsest.size)],
+                         dtype=np.float64).reshape(-1, 2)
+    for index in range(len(levels) - 1, -1, -1):
+        level = levels[index]
+        if index < len(levels) - 1:
+            positions = interpolate(level, positions, rng)
+        if index == 0:
+            break
+        engine = StressEngine(range(level.size), level.distances, min(alpha, MAX_LEVEL_ALPHA), normalized=True)
+        for _ in range(level_iterations):
+            positions = engine.step(positions)
+    return positions
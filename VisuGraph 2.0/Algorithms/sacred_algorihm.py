@@ -1,39 +1,68 @@
 import json
-import math
-import random
+
 import matplotlib.pyplot as plt
+import numpy as np
 
 from PyQt5 import QtWidgets
-from PyQt5.QtCore import Qt, QPointF, QTimer
-from PyQt5.QtGui import QColor, QPen, QBrush, QTransform
-from PyQt5.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsEllipseItem, QGraphicsTextItem, QGraphicsLineItem
+from PyQt5.QtCore import Qt, QThread, QTimer
 
-from Core.graph import Graph, Vertex, Edge
+from Core.graph import Vertex
 from Core.vizualization import Canvas
+from Core.weight_matrix import MATRIX_FILE_FILTER
+from Algorithms.layout import SacredLayout, load_adjacency_matrix, scale_to_canvas
+from Algorithms.layout_worker import LayoutWorker
 
 class SacredAlgorithm:
+    """Графическая оболочка над SacredLayout: диалоги, фоновый расчёт и отрисовка на холсте."""
+
+    FRAME_INTERVAL = 33  # Период отрисовки снимков, мс (~30 кадров в секунду)
+    ERROR_TOLERANCE = 1e-4  # Остановка, если ошибка за итерацию падает меньше чем на эту долю
+    DISPLACEMENT_TOLERANCE = 0.01  # Остановка, если вершины смещаются меньше, чем на эту величину
+    TIME_BUDGET = 60  # Наибольшее время расчёта, с
+    VERTICES_PER_SCREEN = 200  # Больший граф раскладывается на площади в несколько окон
+    MULTILEVEL_MIN_VERTICES = 500  # Начиная с этого размера граф раскладывается многоуровнево
+    ENGINE_MODE = "auto"  # Движок итераций SacredLayout; "approx" - приближённый учёт всех пар
+
+    STOP_MESSAGES = {
+        SacredLayout.STOP_ITERATIONS: "выполнены все итерации",
+        SacredLayout.STOP_ERROR: "ошибка перестала уменьшаться",
+        SacredLayout.STOP_DISPLACEMENT: "вершины перестали смещаться",
+        SacredLayout.STOP_TIME: "исчерпано время расчёта",
+        SacredLayout.STOP_DIVERGED: "раскладка разошлась, показаны лучшие координаты",
+    }
+
     def __init__(self, canvas):
         self.t_iterations = None  # Количество итераций
         self.alpha = None  # Специальный коэффициент
+        self.adaptive = False  # Адаптивный шаг alpha
+        self.targets = "edges"  # Теоретические расстояния: по рёбрам или по кратчайшим путям
         self.matrix = None  # Матрица смежности
-        self.list_from_edges = []  # Список рёбер
-        self.d_evklid = []  # Массив евклидовых расстояний между вершинами
-        self.d = []  # Массив теоретических расстояний между вершинами
-        self.i_previous = []  # Массив координат вершин на предыдущей итерации
-        self.i_current = []  # Массив координат вершин на текущей итерации
-        self.error = []  # Массив хранящий ошибки для каждой итерации
-        self.scale_screen = []  # Массив, хранящий координаты точек для отображения на холсте
+        self.layout = None  # Вычислительное ядро раскладки
+        self.layout_vertices = []  # Вершины холста в порядке строк массива координат
+        self.layout_edges = []  # Рёбра холста в порядке self.layout.edges
+        self.edge_rows = None  # Строки концов рёбер в массиве координат
         self.canvas_width = None  
         self.canvas_height = None  
-        self.graph = Graph()
         self.canvas = canvas
+        self.worker = None  # Расчёт итераций в фоновом потоке
+        self.thread = None  
         self.timer = QTimer()  
-        self.timer.timeout.connect(self.on_iteration)  
+        self.timer.timeout.connect(self.on_frame)  
+        self.canvas.edit_listeners.append(self.on_edit)
+
+        self.current_iteration = 0  # Итерация, показанная на холсте
+
+    @property
+    def error(self):
+        """Ошибки для каждой итерации"""
+        return self.layout.errors if self.layout else []
 
-        self.current_iteration = 0
+    def set_canvas_dimensions(self, vertex_count=0):
+        """Устанавливаем размеры холста для использования в алгоритме.
 
-    def set_canvas_dimensions(self):
-        """Устанавливаем размеры холста для использования в алгоритме"""
+        Площадь раскладки растёт с числом вершин, чтобы большой граф не
+        сжимался в одно окно; его можно рассматривать масштабированием.
+        """
         if self.canvas is None:
             raise ValueError("Объект Canvas не может быть None.")
         
@@ -42,8 +71,9 @@ class SacredAlgorithm:
         if width <= 0 or height <= 0:
             raise ValueError(f"Невозможные размеры холста: ширина = {width}, высота = {height}")
 
-        self.canvas_width = round(width*0.9)
-        self.canvas_height = round(height*0.9)
+        scale = 0.9 * max(1, (vertex_count / self.VERTICES_PER_SCREEN) ** 0.5)
+        self.canvas_width = round(width*scale)
+        self.canvas_height = round(height*scale)
 
     def sacred_algorithm_calling(self):     
         self.set_canvas_dimensions()
@@ -60,195 +90,176 @@ class SacredAlgorithm:
         if not ok:
             return
 
+        adaptive = QtWidgets.QMessageBox.question(
+            None, "Адаптивный шаг", "Подбирать коэффициент alpha по динамике ошибки?",
+            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No, QtWidgets.QMessageBox.No
+        ) == QtWidgets.QMessageBox.Yes
+
+        shortest_paths = QtWidgets.QMessageBox.question(
+            None, "Теоретические расстояния", "Учитывать кратчайшие пути между несмежными вершинами?",
+            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No, QtWidgets.QMessageBox.No
+        ) == QtWidgets.QMessageBox.Yes
+
+        self.cancel()
         self.t_iterations = t_iterations
         self.alpha = alpha
+        self.adaptive = adaptive
+        self.targets = "auto" if shortest_paths else "edges"
 
         file_path, _ = QtWidgets.QFileDialog.getOpenFileName(
-            None, "Выберите файл с матрицей смежности", "", "JSON Files (*.json);;All Files (*)"
+            None, "Выберите файл с матрицей смежности", "", MATRIX_FILE_FILTER
         )
         if not file_path:
             QtWidgets.QMessageBox.warning(None, "Ошибка", "Файл не выбран.")
             return
 
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                data = json.load(file)
-
-            matrix = data.get("adjacency_matrix")
-            if not matrix:
-                raise ValueError("Матрица смежности отсутствует в файле.")
-
-            self.matrix = matrix
-            SacredAlgorithm.validate_adjacency_matrix(matrix)
-            self.list_from_edges = SacredAlgorithm.adjacency_matrix_to_edges(matrix)
-
+            self.matrix = load_adjacency_matrix(file_path)
+            self.set_canvas_dimensions(len(self.matrix))
+            self.layout = SacredLayout(self.matrix, iterations=t_iterations, alpha=alpha,
+                                       width=self.canvas_width, height=self.canvas_height,
+                                       tolerance=self.ERROR_TOLERANCE,
+                                       displacement_tolerance=self.DISPLACEMENT_TOLERANCE,
+                                       time_budget=self.TIME_BUDGET, adaptive=adaptive,
+                                       multilevel=len(self.matrix) >= self.MULTILEVEL_MIN_VERTICES,
+                                       mode=self.ENGINE_MODE, targets=self.targets)
         except (json.JSONDecodeError, ValueError) as e:
             QtWidgets.QMessageBox.critical(None, "Ошибка", f"Возникла ошибка при загрузке матрицы: {e}")
+            return
         except Exception as e:
             QtWidgets.QMessageBox.critical(None, "Ошибка", f"Непредвиденная ошибка: {e}")
-
-        self.convert_edges_to_theoretical_distances()
-        self.randomize_vertex_positions()
-        self.calculate_euclidean_distances()
-        self.calculate_error()
-        self.scale_vertices_to_canvas()
-        self.draw_vertices_and_edges_from_scaled_data()
-        self.update_vertex_positions()
-
-        self.current_iteration = 1  
-        self.timer.start(100) 
-        self.on_iteration() 
-
-    def on_iteration(self):
-        """Обработчик итерации, вызываемый по таймеру"""
-        if self.current_iteration <= self.t_iterations:
-            self.i_previous = self.i_current  
-            self.calculate_euclidean_distances()  
-            self.calculate_error()  
-            self.scale_vertices_to_canvas()  
-            self.clear_canvas_and_graph()  
-            self.draw_vertices_and_edges_from_scaled_data()  
-            self.update_vertex_positions()  
-            self.current_iteration += 1  
-        else:
-            self.timer.stop()  
-
-            self.i_previous = self.i_current  
-            self.scale_vertices_to_canvas()  
-            self.calculate_euclidean_distances()  
-            self.clear_canvas_and_graph() 
-            self.draw_vertices_and_edges_from_scaled_data()  
-            self.plot_error_graph()
-
-    def validate_adjacency_matrix(matrix):
-        size = len(matrix)
-        for i in range(size):
-            for j in range(size):
-                if matrix[i][j] is None or matrix[j][i] is None:
-                    continue
-
-                if isinstance(matrix[i][j], float) and math.isnan(matrix[i][j]):
-                    continue
-
-                if i == j:
-                    if matrix[i][j] is None:
-                        raise ValueError(f"Ошибка: элемент на главной диагонали matrix[{i}][{j}] отсутствует.")
-                    if matrix[i][j] != 0:
-                        raise ValueError(f"Ошибка: элемент на главной диагонали matrix[{i}][{j}] должен быть 0.")
-
-                if matrix[i][j] != matrix[j][i]:
-                    if matrix[i][j] is not None and matrix[j][i] is not None:
-                        raise ValueError(f"Ошибка: матрица не симметрична на позициях [{i}][{j}] и [{j}][{i}].")
-
-                if matrix[i][j] is not None and matrix[i][j] < 0:
-                    raise ValueError(f"Ошибка: отрицательное значение matrix[{i}][{j}]={matrix[i][j]}. Элементы должны быть >= 0.")
-
+            return
         QtWidgets.QMessageBox.information(None, "Успех", "Матрица корректна.")
 
-    def adjacency_matrix_to_edges(matrix):
-        edges = []
-        size = len(matrix)
-        for i in range(size):
-            for j in range(i + 1, size):  
-                if matrix[i][j] is None or isinstance(matrix[i][j], float) and math.isnan(matrix[i][j]):
-                    continue 
-
-                edge = {
-                    "start": i + 1, 
-                    "end": j + 1,
-                    "weight": matrix[i][j]
-                }
-                edges.append(edge)
-
-        return edges
-
-    def convert_edges_to_theoretical_distances(self):
-        self.d = [(edge["start"], edge["end"], edge["weight"]) for edge in self.list_from_edges]
-
-    def calculate_euclidean_distances(self):
-        """Вычисляет евклидовы расстояния между всеми парами вершин из self.i_previous и сохраняет их в self.d_evklid."""
-        self.d_evklid = [] 
-        for i in range(len(self.i_previous)):
-            for j in range(i + 1, len(self.i_previous)):  
-                vertex_id_1, x1, y1 = self.i_previous[i]
-                vertex_id_2, x2, y2 = self.i_previous[j]
-                distance = math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
-                self.d_evklid.append((vertex_id_1, vertex_id_2, distance))
-
-    def randomize_vertex_positions(self):
-        if self.canvas_width is None or self.canvas_height is None:
-            raise ValueError(f"Размеры холста не установлены: ширина = {self.canvas_width}, высота = {self.canvas_height}")
-        self.i_previous = []
-        for i in range(len(self.matrix)):
-            random_x = random.randint(0, self.canvas_width)
-            random_y = random.randint(0, self.canvas_height)
-            self.i_previous.append((i + 1, random_x, random_y)) 
-            vertex = self.graph.vertices.get(i + 1)
-            if not vertex:
-                vertex = Vertex(i + 1, x=random_x, y=random_y)
-                self.graph.add_vertex(vertex)
-            vertex.x = random_x
-            vertex.y = random_y
-
-    def scale_vertices_to_canvas(self):
-        """Масштабирует координаты вершин, чтобы они соответствовали размеру холста."""
-        if not self.i_previous:
-            raise ValueError("Список i_previous пуст. Убедитесь, что вершины были случайным образом размещены.")
-        min_x = min(self.i_previous, key=lambda v: v[1])[1]
-        max_x = max(self.i_previous, key=lambda v: v[1])[1]
-        min_y = min(self.i_previous, key=lambda v: v[2])[2]
-        max_y = max(self.i_previous, key=lambda v: v[2])[2]
-        scale_x = self.canvas_width / (max_x - min_x) if max_x != min_x else 1
-        scale_y = self.canvas_height / (max_y - min_y) if max_y != min_y else 1
-
-        self.scale_screen = []  
-        for i, x, y in self.i_previous:
-            vertex = self.graph.vertices.get(i)
-            if vertex:
-                scaled_x = (x - min_x) * scale_x
-                scaled_y = (y - min_y) * scale_y
-                vertex.x = scaled_x
-                vertex.y = scaled_y
-                self.scale_screen.append((i, scaled_x, scaled_y))
-
-
-
-    def draw_vertices_and_edges_from_scaled_data(self):
-        """Отрисовывает вершины и рёбра на холсте из данных в self.scale_screen и self.d_evklid."""
-        for vertex_id, scaled_x, scaled_y in self.scale_screen:
+        self.current_iteration = 0  
+        self.build_scene()  
+        self.canvas.fit_to_view()
+        self.start_worker()
+
+    def start_worker(self):
+        """Запускает итерации в отдельном потоке и отрисовку снимков по таймеру"""
+        worker = LayoutWorker(self.layout)
+        self.thread = QThread()
+        self.worker = worker
+        worker.moveToThread(self.thread)
+        # run выполняется уже внутри цикла событий потока, а quit вызывается прямо
+        # из рабочего потока: главный поток может ждать его завершения в cancel()
+        self.thread.started.connect(worker.run, Qt.QueuedConnection)
+        worker.finished.connect(self.thread.quit, Qt.DirectConnection)
+        self.thread.finished.connect(lambda: self.on_finished(worker))
+        self.thread.start()
+        self.timer.start(self.FRAME_INTERVAL) 
+
+    def on_frame(self):
+        """Обработчик кадра: рисует последний снимок, если расчёт ушёл вперёд"""
+        snapshot = self.worker.take_snapshot() if self.worker else None
+        if snapshot is None:
+            return
+        self.current_iteration, positions = snapshot
+        self.move_scene(positions)  
+
+    def on_finished(self, worker):
+        """Завершение расчёта: итоговая отрисовка и график ошибки"""
+        if worker is not self.worker:
+            return  # Расчёт уже прерван через cancel()
+        self.timer.stop()  
+        self.worker, self.thread = None, None
+        self.current_iteration = self.layout.iteration
+        self.move_scene(self.layout.positions)  
+        self.canvas.checkpoint()
+        print(f"Sacred Algorithm: {self.layout.iteration} итераций, "
+              f"{self.STOP_MESSAGES.get(self.layout.stop_reason, 'расчёт прерван')}")
+        self.plot_error_graph()
+
+    def pause(self):
+        """Приостанавливает расчёт"""
+        if self.worker:
+            self.worker.pause()
+
+    def resume(self):
+        """Продолжает приостановленный расчёт"""
+        if self.worker:
+            self.worker.resume()
+
+    def cancel(self):
+        """Прерывает расчёт, оставляя на холсте последний показанный кадр"""
+        if self.stop():
+            self.canvas.checkpoint()
+
+    def stop(self):
+        """Останавливает фоновый расчёт и забывает элементы холста; возвращает, шёл ли расчёт"""
+        if not self.worker:
+            return False
+        self.worker.cancel()
+        self.thread.wait()
+        self.timer.stop()
+        self.worker, self.thread = None, None
+        self.layout_vertices, self.layout_edges = [], []
+        return True
+
+    def on_edit(self, operation):
+        """Правка холста во время расчёта.
+
+        Очистка и загрузка графа, загрузчики и правки вершин и рёбер (в том
+        числе отмена и повтор) удаляют элементы, которые двигает раскладка,
+        поэтому расчёт останавливается. Перемещение вершины ему не мешает, а
+        reweight_edges присылает сама раскладка (move_scene).
+        """
+        if operation["op"] not in ("move_vertex", "reweight_edges"):
+            self.stop()
+
+    def build_scene(self):
+        """Один раз создаёт на холсте вершины и рёбра раскладки; дальше они только перемещаются."""
+        self.clear_canvas_and_graph()
+        scaled = scale_to_canvas(self.layout.positions, self.canvas_width, self.canvas_height)
+        self.layout_vertices = []
+        for vertex_id, (scaled_x, scaled_y) in zip(self.layout.vertex_ids, scaled.tolist()):
             vertex = Vertex(vertex_id, x=scaled_x, y=scaled_y)
-            self.graph.add_vertex(vertex)  
-            self.canvas.create_vertex(QPointF(scaled_x, scaled_y))  
-
-        for start_id, end_id, weight in self.d_evklid:
-            start_vertex = self.graph.vertices.get(start_id)
-            end_vertex = self.graph.vertices.get(end_id)
-
-            if start_vertex and end_vertex:
-                weight = round(weight)
-                self.canvas.create_edge_special(start_id, end_id, weight) 
-        self.canvas.update()  
-        self.scale_screen = []  
-
+            self.canvas.graph.add_vertex(vertex)
+            self.layout_vertices.append(vertex)
+
+        index = {vertex_id: row for row, vertex_id in enumerate(self.layout.vertex_ids)}
+        self.edge_rows = np.array([(index[edge["start"]], index[edge["end"]]) for edge in self.layout.edges],
+                                  dtype=np.int64).reshape(-1, 2)
+        distances = self.edge_lengths(self.layout.positions)
+        self.layout_edges = [
+            self.canvas.graph.add_edge(self.layout_vertices[start], self.layout_vertices[end], weight=round(distance))
+            for (start, end), distance in zip(self.edge_rows.tolist(), distances.tolist())
+        ]
+        self.canvas.add_visuals(self.layout_vertices, self.layout_edges)
+        self.canvas.checkpoint()
+
+    def edge_lengths(self, positions):
+        """Евклидовы длины рёбер раскладки"""
+        delta = positions[self.edge_rows[:, 1]] - positions[self.edge_rows[:, 0]]
+        return np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1])
+
+    def move_scene(self, positions):
+        """Переносит существующие элементы в новые координаты и обновляет подписи длин рёбер.
+
+        Изменившиеся веса сообщаются слушателям холста одной операцией
+        reweight_edges, чтобы кэш кратчайших путей и остовный лес не
+        устаревали. Нечисловые координаты (разошедшийся шаг) не рисуются.
+        """
+        distances = self.edge_lengths(positions)
+        if not (np.isfinite(positions).all() and np.isfinite(distances).all()):
+            return
+        changed = []
+        for edge, distance in zip(self.layout_edges, distances.tolist()):
+            weight = round(distance)
+            if weight != edge.weight:
+                changed.append([edge.start_vertex.id, edge.end_vertex.id, edge.weight, weight])
+                edge.weight = weight
+                self.canvas.set_edge_label(edge, weight)
+        if changed:
+            self.canvas.notify_edit({"op": "reweight_edges", "edges": changed})
+        scaled = scale_to_canvas(positions, self.canvas_width, self.canvas_height)
+        self.canvas.move_vertices(self.layout_vertices, scaled.tolist())
 
     def clear_canvas_and_graph(self):
         """Очистить холст и граф от старых данных (вершин и рёбер)."""
-        self.canvas.scene.clear() 
-        self.canvas.graph.vertices.clear()  
-        self.canvas.graph.edges.clear()  
-        self.canvas.update()  
-
-    def calculate_error(self):
-        """Вычисляет ошибку по формуле sum по i,j i>j (dij - dij_evklid)^2 и сохраняет её в self.error."""
-        euclidean_distances = { (min(start, end), max(start, end)): dist for start, end, dist in self.d_evklid }
-        total_error = 0
-        for start, end, dij in self.d:  
-            if (min(start, end), max(start, end)) not in euclidean_distances:
-                continue
-            dij_evklid = euclidean_distances[(min(start, end), max(start, end))]
-            error_term = (dij - dij_evklid) ** 2
-            total_error += error_term
-        self.error.append(total_error)
+        self.canvas.clear_scene() 
+        self.canvas.graph.clear()  
 
     def plot_error_graph(self):
         """Функция для построения графика зависимости ошибки от номера итерации"""
@@ -259,55 +270,3 @@ class SacredAlgorithm:
         plt.ylabel('Ошибка')
         plt.grid(True)
         plt.show()
-
-    def update_vertex_positions(self):
-        """Вычисляет улучшенные координаты для каждой вершины по заданной формуле."""
-        self.i_current = []
-        for i, (vertex_id_i, x_i_prev, y_i_prev) in enumerate(self.i_previous):
-            vertex_i = self.graph.vertices.get(vertex_id_i)
-            if not vertex_i:
-                continue  
-            x_i_current = x_i_prev
-            y_i_current = y_i_prev
-            for j, (vertex_id_j, x_j_prev, y_j_prev) in enumerate(self.i_previous):
-                if i == j:
-                    continue 
-
-                vertex_j = self.graph.vertices.get(vertex_id_j)
-                if not vertex_j:
-                    continue  
-
-                dij = None
-                for edge in self.d:
-                    if (edge[0] == vertex_id_i and edge[1] == vertex_id_j) or (edge[0] == vertex_id_j and edge[1] == vertex_id_i):
-                        dij = edge[2]
-                        break
-
-                if dij is None:
-                    continue 
-
-                dij_evklid = None
-                for start, end, dist in self.d_evklid:
-                    if (start == vertex_id_i and end == vertex_id_j) or (start == vertex_id_j and end == vertex_id_i):
-                        dij_evklid = dist
-                        break
-
-                if dij_evklid is None:
-                    continue  
-
-                factor = (dij - dij_evklid) / dij_evklid
-                dx = x_i_prev - x_j_prev
-                dy = y_i_prev - y_j_prev
-
-                x_i_current += self.alpha * factor * dx
-                y_i_current += self.alpha * factor * dy
-
-            if vertex_i:
-                vertex_i.x = x_i_current
-                vertex_i.y = y_i_current
-            
-            self.i_current.append((vertex_id_i, x_i_current, y_i_current))
-
-
-
-
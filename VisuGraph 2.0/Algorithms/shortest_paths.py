@@ -0,0 +1,165 @@
+import math
+from heapq import heappop, heappush
+
+
+def dijkstra(indptr, indices, edge_rows, weights, source):
+    """Алгоритм Дейкстры с двоичной кучей по CSR-смежности.
+
+    Возвращает списки по строкам вершин: расстояния (inf для
+    недостижимых), строки предков и строки рёбер к предкам (-1 у корня и
+    недостижимых). Устаревшие записи кучи пропускаются при извлечении.
+    С отрицательным весом результат был бы неверным, поэтому, встретив
+    такое ребро среди достижимых, выбрасывает ValueError.
+    """
+    size = len(indptr) - 1
+    distances = [math.inf] * size
+    parents = [-1] * size
+    parent_edges = [-1] * size
+    distances[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        distance, vertex = heappop(heap)
+        if distance > distances[vertex]:
+            continue
+        for k in range(indptr[vertex], indptr[vertex + 1]):
+            neighbor, edge_row = indices[k], edge_rows[k]
+            weight = weights[edge_row]
+            if weight < 0:
+                raise ValueError(f"Ошибка: отрицательный вес ребра {weight:g}; "
+                                 f"алгоритм Дейкстры работает только с неотрицательными весами.")
+            candidate = distance + weight
+            if candidate < distances[neighbor]:
+                distances[neighbor] = candidate
+                parents[neighbor] = vertex
+                parent_edges[neighbor] = edge_row
+                heappush(heap, (candidate, neighbor))
+    return distances, parents, parent_edges
+
+
+class ShortestPathTree:
+    """Дерево кратчайших путей из одной вершины; хранится по id, а не по строкам хранилища.
+
+    Строки вершин меняются при удалении, id - нет, поэтому дерево остаётся
+    верным, пока правка не затрагивает достижимую часть графа.
+    """
+
+    def __init__(self, source_id, distance, parent):
+        self.source_id = source_id
+        self.distance = distance  # id -> расстояние, только достижимые вершины
+        self.parent = parent  # id -> id предка
+
+    @classmethod
+    def build(cls, graph, source_id):
+        indptr, indices, edge_rows = graph.store.csr()
+        distances, parents, _ = dijkstra(indptr.tolist(), indices.tolist(), edge_rows.tolist(),
+                                         graph.store.weights().tolist(), graph.vertex_row(source_id))
+        ids = graph.store.ids().tolist()
+        distance = {ids[row]: value for row, value in enumerate(distances) if value != math.inf}
+        parent = {ids[row]: ids[parent_row] for row, parent_row in enumerate(parents) if parent_row >= 0}
+        return cls(source_id, distance, parent)
+
+    def path(self, target_id):
+        """Вершины пути от источника до target_id или None, если она недостижима; время O(длины пути)"""
+        if target_id not in self.distance:
+            return None
+        path = [target_id]
+        while path[-1] != self.source_id:
+            path.append(self.parent[path[-1]])
+        path.reverse()
+        return path
+
+    def is_tree_edge(self, start_id, end_id):
+        return self.parent.get(end_id) == start_id or self.parent.get(start_id) == end_id
+
+    def improved_by(self, start_id, end_id, weight):
+        """Сокращает ли ребро веса weight какое-нибудь расстояние"""
+        start = self.distance.get(start_id, math.inf)
+        end = self.distance.get(end_id, math.inf)
+        return start + weight < end or end + weight < start
+
+    def affected_by(self, operation):
+        """Может ли правка холста (операция журнала) изменить дерево"""
+        kind = operation["op"]
+        if kind == "move_vertex":
+            return False  # Веса не зависят от положения вершин
+        if kind == "add_vertex":
+            return any(self.improved_by(start, end, weight) for start, end, weight in operation.get("edges", ()))
+        if kind == "remove_vertex":
+            return operation["id"] in self.distance  # Рёбра недостижимой вершины в дерево не входят
+        if kind == "add_edge":
+            # Ребро могло уже существовать - тогда это замена веса
+            return (self.improved_by(operation["start"], operation["end"], operation["weight"]) or
+                    self.is_tree_edge(operation["start"], operation["end"]))
+        if kind == "remove_edge":
+            return self.is_tree_edge(operation["start"], operation["end"])
+        if kind == "reweight_edge":
+            return (self.improved_by(operation["start"], operation["end"], operation["to"]) or
+                    self.is_tree_edge(operation["start"], operation["end"]) and operation["to"] > operation["from"])
+        if kind == "reweight_edges":
+            return any(self.affected_by({"op": "reweight_edge", "start": start, "end": end, "from": old, "to": new})
+                       for start, end, old, new in operation["edges"])
+        return True
+
+
+class ShortestPathCache:
+    """Деревья кратчайших путей по вершинам-источникам.
+
+    Дерево считается при первом запросе и сбрасывается только той правкой,
+    которая может его изменить (см. ShortestPathTree.affected_by); поэтому
+    повторные запросы пути отвечаются за O(длины пути).
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.trees = {}  # id источника -> ShortestPathTree
+
+    def tree(self, source_id):
+        tree = self.trees.get(source_id)
+        if tree is None:
+            tree = self.trees[source_id] = ShortestPathTree.build(self.graph, source_id)
+        return tree
+
+    def path(self, source_id, target_id):
+        """(расстояние, вершины пути) или (inf, None), если target_id недостижима"""
+        tree = self.tree(source_id)
+        path = tree.path(target_id)
+        return (tree.distance[target_id], path) if path is not None else (math.inf, None)
+
+    def on_edit(self, operation):
+        """Сбрасывает деревья, которые правка могла изменить"""
+        self.trees = {source_id: tree for source_id, tree in self.trees.items() if not tree.affected_by(operation)}
+
+
+class PathHighlight:
+    """Выделение пути на холсте; при смене пути перерисовываются только изменившиеся элементы."""
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.vertices = set()  # id выделенных вершин
+        self.edges = set()  # Пары id концов выделенных рёбер
+
+    def show(self, path):
+        """Выделяет путь (список id вершин); пустой список снимает выделение"""
+        vertices = set(path)
+        edges = {self.canvas.graph.edge_key(start, end) for start, end in zip(path, path[1:])}
+        for vertex_id in self.vertices - vertices:
+            self.set_vertex(vertex_id, False)
+        for key in self.edges - edges:
+            self.set_edge(key, False)
+        for vertex_id in vertices - self.vertices:
+            self.set_vertex(vertex_id, True)
+        for key in edges - self.edges:
+            self.set_edge(key, True)
+        self.vertices, self.edges = vertices, edges
+
+    def set_vertex(self, vertex_id, highlighted):
+        vertex = self.canvas.graph.vertices.get(vertex_id)
+        if vertex is not None:
+            vertex.set_highlighted(highlighted)
+            self.canvas.apply_vertex_style(vertex)
+
+    def set_edge(self, key, highlighted):
+        edge = self.canvas.graph.get_edge(*key)
+        if edge is not None:
+            edge.set_highlighted(highlighted)
+            self.canvas.apply_edge_style(edge)
@@ -0,0 +1,191 @@
+from collections import deque
+from heapq import heapify, heappop, heappush
+
+
+def prim(indptr, indices, edge_rows, weights):
+    """Алгоритм Прима с двоичной кучей по CSR-смежности; строки рёбер минимального остовного леса.
+
+    Для каждой ещё не охваченной вершины дерево строится заново, поэтому
+    несвязный граф даёт лес. Время O(m log m).
+    """
+    size = len(indptr) - 1
+    in_tree = bytearray(size)
+    tree_edges = []
+    for root in range(size):
+        if in_tree[root]:
+            continue
+        in_tree[root] = 1
+        heap = [(weights[edge_rows[k]], indices[k], edge_rows[k]) for k in range(indptr[root], indptr[root + 1])]
+        heapify(heap)
+        while heap:
+            _, vertex, edge_row = heappop(heap)
+            if in_tree[vertex]:
+                continue
+            in_tree[vertex] = 1
+            tree_edges.append(edge_row)
+            for k in range(indptr[vertex], indptr[vertex + 1]):
+                if not in_tree[indices[k]]:
+                    heappush(heap, (weights[edge_rows[k]], indices[k], edge_rows[k]))
+    return tree_edges
+
+
+class MinimumSpanningForest:
+    """Минимальный остовный лес графа, поддерживаемый при правках рёбер.
+
+    Лес строится алгоритмом Прима один раз, дальше на каждую операцию
+    журнала холста (on_edit) меняются только затронутые рёбра:
+    - новое или полегчавшее ребро вне леса соединяет два дерева или
+      заменяет самое тяжёлое ребро цикла, который оно замыкает;
+    - удалённое или изменившее вес ребро леса разрезает дерево, и из
+      меньшей части выбирается самое лёгкое ребро через разрез.
+    Изменения леса передаются в on_change(добавленные, удалённые) парами id концов.
+    """
+
+    def __init__(self, graph, on_change=None):
+        self.graph = graph
+        self.on_change = on_change
+        self.tree = {}  # id -> {id соседа по лесу: вес ребра}
+        self.weight = 0  # Суммарный вес леса
+        self._added = set()
+        self._removed = set()
+        self.rebuild()
+
+    def rebuild(self):
+        """Пересчитывает лес заново"""
+        old_keys = self.edge_keys()
+        store = self.graph.store
+        indptr, indices, edge_rows = store.csr()
+        rows = prim(indptr.tolist(), indices.tolist(), edge_rows.tolist(), store.weights().tolist())
+        ids = store.ids().tolist()
+        self.tree = {vertex_id: {} for vertex_id in self.graph.vertices}
+        self.weight = 0
+        for (start, end), weight in zip(store.endpoints()[rows].tolist(), store.weights()[rows].tolist()):
+            self.tree[ids[start]][ids[end]] = self.tree[ids[end]][ids[start]] = weight
+            self.weight += weight
+        new_keys = self.edge_keys()
+        self._added, self._removed = new_keys - old_keys, old_keys - new_keys
+        self._flush()
+
+    def edge_keys(self):
+        return {self.graph.edge_key(start, end) for start, neighbors in self.tree.items() for end in neighbors}
+
+    def on_edit(self, operation):
+        """Обновляет лес после правки холста (операции журнала)"""
+        kind = operation["op"]
+        if kind == "reset":
+            self.rebuild()
+            return
+        if kind == "add_vertex":
+            self.tree.setdefault(operation["id"], {})
+            for start, end, weight in operation.get("edges", ()):
+                self.edge_changed(start, end, weight)
+        elif kind == "remove_vertex":
+            vertex_id = operation["id"]
+            for neighbor in list(self.tree.get(vertex_id, ())):
+                self.reconnect(vertex_id, neighbor)  # Рёбер удалённой вершины в графе уже нет
+            self.tree.pop(vertex_id, None)
+        elif kind == "add_edge":
+            self.edge_changed(operation["start"], operation["end"], operation["weight"])
+        elif kind == "reweight_edge":
+            self.edge_changed(operation["start"], operation["end"], operation["to"])
+        elif kind == "reweight_edges":
+            for start, end, _, weight in operation["edges"]:
+                self.edge_changed(start, end, weight)
+        elif kind == "remove_edge":
+            if operation["end"] in self.tree.get(operation["start"], ()):
+                self.reconnect(operation["start"], operation["end"])
+        self._flush()
+
+    def edge_changed(self, start, end, weight):
+        """Ребро добавлено или получило новый вес (прежний может быть неизвестен)"""
+        self.tree.setdefault(start, {})
+        self.tree.setdefault(end, {})
+        if start == end:
+            return
+        if end in self.tree[start]:
+            self.reconnect(start, end)  # Ребро снова станет кандидатом на разрез уже с новым весом
+        else:
+            self.insert(start, end, weight)
+
+    def insert(self, start, end, weight):
+        """Ребро вне леса: соединяет деревья или вытесняет самое тяжёлое ребро цикла"""
+        path = self.tree_path(start, end)
+        if path is None:
+            self._link(start, end, weight)
+            return
+        heaviest = max(zip(path, path[1:]), key=lambda pair: self.tree[pair[0]][pair[1]])
+        if self.tree[heaviest[0]][heaviest[1]] > weight:
+            self._cut(*heaviest)
+            self._link(start, end, weight)
+
+    def reconnect(self, start, end):
+        """Убирает ребро леса и соединяет части самым лёгким ребром графа через разрез"""
+        self._cut(start, end)
+        side = self.smaller_side(start, end)
+        best = None
+        weights = self.graph.store.edge_weights
+        for vertex_id in side:
+            for neighbor, row in self.graph.neighbors(vertex_id):
+                if neighbor not in side and (best is None or weights[row] < best[2]):
+                    best = (vertex_id, neighbor, float(weights[row]))
+        if best is not None:
+            self._link(*best)
+
+    def smaller_side(self, start, end):
+        """Вершины меньшей из двух частей разрезанного дерева.
+
+        Обе части обходятся поочерёдно по вершине, поэтому время
+        пропорционально размеру меньшей части.
+        """
+        sides = ({start}, {end})
+        queues = (deque([start]), deque([end]))
+        while True:
+            for side, queue in zip(sides, queues):
+                if not queue:
+                    return side
+                vertex_id = queue.popleft()
+                for neighbor in self.tree[vertex_id]:
+                    if neighbor not in side:
+                        side.add(neighbor)
+                        queue.append(neighbor)
+
+    def tree_path(self, start, end):
+        """Вершины пути по лесу от start до end или None, если они в разных деревьях"""
+        parents = {start: None}
+        queue = deque([start])
+        while queue:
+            vertex_id = queue.popleft()
+            if vertex_id == end:
+                path = [end]
+                while parents[path[-1]] is not None:
+                    path.append(parents[path[-1]])
+                return path
+            for neighbor in self.tree[vertex_id]:
+                if neighbor not in parents:
+                    parents[neighbor] = vertex_id
+                    queue.append(neighbor)
+        return None
+
+    def _link(self, start, end, weight):
+        self.tree[start][end] = self.tree[end][start] = weight
+        self.weight += weight
+        key = self.graph.edge_key(start, end)
+        if key in self._removed:
+            self._removed.discard(key)
+        else:
+            self._added.add(key)
+
+    def _cut(self, start, end):
+        self.weight -= self.tree[start].pop(end)
+        del self.tree[end][start]
+        key = self.graph.edge_key(start, end)
+        if key in self._added:
+            self._added.discard(key)
+        else:
+            self._removed.add(key)
+
+    def _flush(self):
+        added, removed = self._added, self._removed
+        self._added, self._removed = set(), set()
+        if self.on_change is not None and (added or removed):
+            self.on_change(added, removed)
@@ -0,0 +1,122 @@
+import numpy as np
+
+
+class StressEngine:
+    """Векторизованный расчёт итерации SacredAlgorithm на массивах NumPy.
+
+    Теоретические расстояния хранятся плотной матрицей n x n (mode="dense")
+    или списком пар вершин (mode="sparse"). В обоих режимах слагаемые
+    складываются в том же порядке, что и в поэлементной формуле
+    (по возрастанию j для каждой вершины i), поэтому координаты и ошибка
+    совпадают с ней до бита.
+
+    При normalized=True слагаемые вершины делятся на их число. Это нужно,
+    когда расстояния заданы для всех пар (кратчайшие пути): иначе шаг
+    растёт с числом вершин и при alpha порядка 1 раскладка расходится.
+    """
+
+    DENSE_MAX_VERTICES = 3000  # Больше - плотная матрица слишком велика
+    DENSE_MIN_DENSITY = 0.25  # Доля заданных пар, начиная с которой выгоднее плотный режим
+    BLOCK_SIZE = 256  # Строк матрицы за один проход в плотном режиме
+
+    def __init__(self, vertex_ids, distances, alpha=1.0, mode="auto", normalized=False):
+        """vertex_ids - id вершин в порядке строк массива координат,
+        distances - тройки (id начала, id конца, расстояние), как в SacredAlgorithm.d."""
+        self.vertex_ids = list(vertex_ids)
+        self.alpha = alpha
+        size = len(self.vertex_ids)
+        index = {vertex_id: i for i, vertex_id in enumerate(self.vertex_ids)}
+
+        error_pairs = []  # Все записи distances - для ошибки
+        targets = {}  # Первая запись для каждой пары - для обновления координат
+        for start, end, distance in distances:
+            i, j = index.get(start), index.get(end)
+            if i is None or j is None or i == j:
+                continue
+            error_pairs.append((i, j, distance))
+            targets.setdefault((min(i, j), max(i, j)), distance)
+
+        self.error_rows, self.error_cols, self.error_targets = self._pair_arrays(error_pairs)
+
+        # Направленные пары (i, j) в порядке суммирования поэлементной формулы
+        lower, upper, values = self._pair_arrays([(i, j, d) for (i, j), d in targets.items()])
+        rows, cols = np.concatenate((lower, upper)), np.concatenate((upper, lower))
+        order = np.lexsort((cols, rows))
+        self.rows, self.cols, self.targets = rows[order], cols[order], np.concatenate((values, values))[order]
+        # Множитель слагаемых каждой вершины; None - без нормировки
+        self.scale = 1 / np.maximum(np.bincount(self.rows, minlength=size), 1) if normalized else None
+
+        if mode == "auto":
+            dense = size <= self.DENSE_MAX_VERTICES and len(self.rows) >= self.DENSE_MIN_DENSITY * size * size
+            mode = "dense" if dense else "sparse"
+        if mode not in ("dense", "sparse"):
+            raise ValueError(f"Неизвестный режим StressEngine: {mode}")
+        self.mode = mode
+
+        self.target_matrix = None
+        if mode == "dense":
+            self.target_matrix = np.full((size, size), np.nan)  # nan - расстояние не задано
+            self.target_matrix[self.rows, self.cols] = self.targets
+
+    @staticmethod
+    def _pair_arrays(pairs):
+        if not pairs:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+        rows, cols, values = zip(*pairs)
+        return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64), np.array(values, dtype=np.float64)
+
+    @staticmethod
+    def euclidean_distances(positions):
+        """Расстояния между всеми парами i < j: (строки i, строки j, расстояния)"""
+        positions = np.asarray(positions, dtype=np.float64)
+        rows, cols = np.triu_indices(len(positions), 1)
+        delta = positions[cols] - positions[rows]
+        return rows, cols, np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1])
+
+    def error(self, positions):
+        """Ошибка sum (dij - dij_evklid)^2 по всем заданным теоретическим расстояниям"""
+        positions = np.asarray(positions, dtype=np.float64)
+        delta = positions[self.error_cols] - positions[self.error_rows]
+        distances = np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1])
+        terms = (self.error_targets - distances) ** 2
+        return float(np.cumsum(terms)[-1]) if len(terms) else 0
+
+    def step(self, positions):
+        """Новые координаты вершин (массив n x 2) после одной итерации"""
+        positions = np.asarray(positions, dtype=np.float64)
+        if self.mode == "dense":
+            return self._dense_step(positions)
+        return self._sparse_step(positions)
+
+    def _factors(self, targets, distances):
+        """alpha * (dij - dij_evklid) / dij_evklid; ноль для незаданных пар и совпадающих вершин"""
+        valid = ~np.isnan(targets) & (distances != 0)
+        factors = np.zeros_like(distances)
+        np.divide(targets - distances, distances, out=factors, where=valid)
+        return self.alpha * factors
+
+    def _sparse_step(self, positions):
+        delta = positions[self.rows] - positions[self.cols]
+        distances = np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1])
+        factors = self._factors(self.targets, distances)
+        if self.scale is not None:
+            factors *= self.scale[self.rows]
+        updated = positions.copy()
+        # add.at складывает последовательно в порядке пар - как цикл по j
+        np.add.at(updated, self.rows, factors[:, None] * delta)
+        return updated
+
+    def _dense_step(self, positions):
+        updated = np.empty_like(positions)
+        xs, ys = positions[:, 0], positions[:, 1]
+        for start in range(0, len(positions), self.BLOCK_SIZE):
+            block = slice(start, start + self.BLOCK_SIZE)
+            dx = xs[block, None] - xs[None, :]
+            dy = ys[block, None] - ys[None, :]
+            factors = self._factors(self.target_matrix[block], np.sqrt(dx * dx + dy * dy))
+            if self.scale is not None:
+                factors *= self.scale[block, None]
+            # cumsum складывает слева направо, начиная с текущей координаты
+            updated[block, 0] = np.cumsum(np.concatenate((xs[block, None], factors * dx), axis=1), axis=1)[:, -1]
+            updated[block, 1] = np.cumsum(np.concatenate((ys[block, None], factors * dy), axis=1), axis=1)[:, -1]
+        return updated
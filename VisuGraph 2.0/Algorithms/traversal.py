@@ -0,0 +1,65 @@
+from collections import deque
+
+
+def bfs_events(indptr, indices, edge_rows, source):
+    """Поиск в ширину по CSR-смежности; генератор событий (строка вершины, строка ребра).
+
+    Событие - посещение вершины по ребру дерева обхода; у начальной
+    вершины строка ребра равна -1. Каждая вершина и каждый элемент
+    смежности просматриваются один раз, поэтому время линейно.
+    """
+    visited = bytearray(len(indptr) - 1)
+    visited[source] = 1
+    yield source, -1
+    queue = deque([source])
+    while queue:
+        vertex = queue.popleft()
+        for k in range(indptr[vertex], indptr[vertex + 1]):
+            neighbor = indices[k]
+            if not visited[neighbor]:
+                visited[neighbor] = 1
+                yield neighbor, edge_rows[k]
+                queue.append(neighbor)
+
+
+def dfs_events(indptr, indices, edge_rows, source):
+    """Поиск в глубину по CSR-смежности; события те же, что у bfs_events.
+
+    Рекурсия заменена стеком, а для каждой вершины хранится позиция
+    следующего непросмотренного соседа - время линейно и на глубоких графах.
+    """
+    visited = bytearray(len(indptr) - 1)
+    cursor = list(indptr)  # Вершина -> следующий элемент её смежности
+    visited[source] = 1
+    yield source, -1
+    stack = [source]
+    while stack:
+        vertex = stack[-1]
+        k, end = cursor[vertex], indptr[vertex + 1]
+        while k < end and visited[indices[k]]:
+            k += 1
+        if k == end:
+            cursor[vertex] = k
+            stack.pop()
+            continue
+        cursor[vertex] = k + 1
+        neighbor = indices[k]
+        visited[neighbor] = 1
+        yield neighbor, edge_rows[k]
+        stack.append(neighbor)
+
+
+TRAVERSALS = {
+    "bfs": bfs_events,
+    "dfs": dfs_events,
+}
+
+
+def traversal_events(graph, source_id, order="bfs"):
+    """Поток событий обхода графа из вершины source_id; порядок "bfs" или "dfs".
+
+    Смежность берётся из хранилища графа (CSR кэшируется до изменения
+    структуры) и переводится в списки Python для быстрого обхода.
+    """
+    indptr, indices, edge_rows = graph.store.csr()
+    return TRAVERSALS[order](indptr.tolist(), indices.tolist(), edge_rows.tolist(), graph.vertex_row(source_id))
@@ -0,0 +1,72 @@
+from itertools import islice
+
+from PyQt5.QtCore import QTimer
+
+
+class TraversalAnimation:
+    """Анимация обхода на холсте: события берутся из генератора порциями по таймеру.
+
+    За кадр обрабатывается не больше events_per_frame событий, поэтому
+    цикл событий не блокируется на любом размере графа. Если структура
+    графа изменилась, анимация останавливается: строки событий устарели.
+    """
+
+    FRAME_INTERVAL = 33  # Период кадров, мс
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.events = None
+        self.events_per_frame = 1
+        self.version = None  # Версия хранилища графа при запуске
+        self.vertices = []  # Выделенные вершины
+        self.edges = []  # Выделенные рёбра
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.on_frame)
+
+    def start(self, events, steps_per_second):
+        """Запускает показ событий events со скоростью steps_per_second событий в секунду."""
+        self.stop()
+        self.clear_highlight()
+        self.events = events
+        interval = max(self.FRAME_INTERVAL, 1000 // max(steps_per_second, 1))
+        self.events_per_frame = max(1, round(steps_per_second * interval / 1000))
+        self.version = self.canvas.graph.store.version
+        self.timer.start(interval)
+
+    def stop(self):
+        self.timer.stop()
+        self.events = None
+
+    def on_frame(self):
+        store = self.canvas.graph.store
+        if store.version != self.version:
+            print("Обход остановлен: граф изменился")
+            self.stop()
+            return
+        batch = list(islice(self.events, self.events_per_frame))
+        for vertex_row, edge_row in batch:
+            self.highlight(store.vertex_views[vertex_row], self.vertices, self.canvas.apply_vertex_style)
+            if edge_row >= 0:
+                self.highlight(self.canvas.graph.edge(edge_row), self.edges, self.canvas.apply_edge_style)
+        if len(batch) < self.events_per_frame:
+            print(f"Обход завершён: посещено вершин: {len(self.vertices)}")
+            self.stop()
+
+    @staticmethod
+    def highlight(element, highlighted, apply_style):
+        element.set_highlighted(True)
+        apply_style(element)
+        highlighted.append(element)
+
+    def clear_highlight(self):
+        """Снимает выделение с элементов прошлого обхода, которые ещё есть в графе."""
+        graph = self.canvas.graph
+        for vertex in self.vertices:
+            if graph.vertices.get(vertex.id) is vertex:
+                vertex.set_highlighted(False)
+                self.canvas.apply_vertex_style(vertex)
+        for edge in self.edges:
+            if graph.get_edge(edge.start_vertex.id, edge.end_vertex.id) is edge:
+                edge.set_highlighted(False)
+                self.canvas.apply_edge_style(edge)
+        self.vertices, self.edges = [], []
@@ -0,0 +1,399 @@
+import math
+
+import numpy as np
+
+from PyQt5.QtCore import QLineF, QPointF, QRectF
+from PyQt5.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem
+
+from Core.graph import weight_value
+from Core.storage import GraphStore
+from Core.styles import StyleTable
+
+
+class EdgeBatch(QGraphicsItem):
+    """Все рёбра одного стиля в одном элементе сцены.
+
+    Рёбра задаются строками хранилища графа: концы и веса читаются из его
+    массивов, поэтому объекты Edge для отрисовки не нужны. Линии хранятся
+    списком QLineF (отрисовываются одним вызовом drawLines) и массивом
+    координат концов по слотам пакета; при перемещении вершин обновляются
+    только слоты их рёбер. Линии проводятся между центрами вершин и лежат
+    под ними. Рёбра разложены по ячейкам равномерных сеток: ребро попадает
+    в сетку, ячейка которой не меньше его габаритов (сторона ячейки
+    удваивается от уровня к уровню), и занимает в ней не больше четырёх
+    ячеек. Поэтому поиск ребра под курсором и отрисовка небольшой области
+    проверяют только рёбра соседних ячеек, а перемещение вершины
+    переиндексирует только её рёбра. Границы элемента при правках только
+    расширяются и точно пересчитываются в refresh().
+    """
+
+    HIT_TOLERANCE = 4  # Расстояние до линии, на котором ребро считается выбранным, в пикселях экрана
+    GRID_CELL = 100  # Сторона ячейки сетки нулевого уровня, в единицах сцены
+    GRID_QUERY_CELLS = 256  # Область больше этого числа ячеек проверяется по всем рёбрам сразу
+    LABEL_MARGIN = 40  # Насколько подпись может выступать за габариты ребра, в единицах сцены
+    ADD_BLOCK = 4096  # Рёбер, переводимых из массивов в объекты Python за раз
+
+    def __init__(self, style, qt_style, owner):
+        super().__init__()
+        self.style = style
+        self.qt_style = qt_style
+        self.owner = owner  # EdgeBatches: хранит слоты строк хранилища
+        self.store = owner.store
+        self.count = 0  # Занятые слоты 0..count-1
+        self.rows = np.empty(0, dtype=np.int64)  # Слот -> строка ребра в хранилище
+        self.lines = []  # Слот -> QLineF
+        self._coords = np.empty((0, 4))  # Слот -> (x1, y1, x2, y2)
+        self.grid = {}  # Ячейка (уровень, x, y) -> множество слотов, габариты рёбер которых её задевают
+        self.levels = {}  # Уровень сетки -> число рёбер на нём
+        self.unindexed = set()  # Слоты с бесконечными или нечисловыми координатами
+        self._bounds = QRectF()
+        self.setZValue(-1)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)  # Точная exposedRect в paint
+
+    @property
+    def coords(self):
+        """Координаты концов по занятым слотам, массив (count, 4) без копирования"""
+        return self._coords[:self.count]
+
+    def row_coords(self, rows):
+        """Координаты центров концов рёбер по строкам хранилища, массив (k, 4)"""
+        ends = self.store.edge_endpoints[rows]
+        positions = self.store.vertex_positions
+        return np.hstack((positions[ends[:, 0]], positions[ends[:, 1]]))
+
+    def add_rows(self, rows):
+        """Добавляет рёбра по строкам хранилища в конец пакета"""
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows):
+            return
+        coords = self.row_coords(rows)
+        first = self.count
+        self.count += len(rows)
+        self.rows = GraphStore._grown(self.rows, self.count)
+        self._coords = GraphStore._grown(self._coords, self.count)
+        self.rows[first:self.count] = rows
+        self._coords[first:self.count] = coords
+        self.owner.placed(rows, self, np.arange(first, self.count))
+        lines = self.lines
+        for block in range(0, len(rows), self.ADD_BLOCK):  # Списки Python - только для одного блока
+            for slot, (x1, y1, x2, y2) in enumerate(coords[block:block + self.ADD_BLOCK].tolist(), first + block):
+                lines.append(QLineF(x1, y1, x2, y2))
+                self._index(slot, x1, y1, x2, y2)
+        self._changed(coords)
+
+    def remove_rows(self, rows):
+        """Удаляет рёбра по строкам хранилища; на место удалённого слота переносится последний"""
+        slot_of = self.owner.slot_of
+        removed = []
+        for row in rows:
+            slot = int(slot_of[row])
+            removed.append(self._coords[slot].copy())
+            self._unindex(slot)
+            last = self.count - 1
+            if slot != last:
+                self._unindex(last)
+                moved = int(self.rows[last])
+                self.rows[slot] = moved
+                self.lines[slot] = self.lines[last]
+                self._coords[slot] = self._coords[last]
+                slot_of[moved] = slot
+                self._index(slot, *self._coords[slot].tolist())
+            self.lines.pop()
+            self.count = last
+        if removed:
+            self._changed(np.array(removed))
+
+    def patch_rows(self, rows):
+        """Пересчитывает линии только для указанных строк хранилища"""
+        rows = np.asarray(rows, dtype=np.int64)
+        slots = self.owner.slot_of[rows]
+        old = self._coords[slots]
+        coords = self.row_coords(rows)
+        for slot, (x1, y1, x2, y2) in zip(slots.tolist(), coords.tolist()):
+            self.lines[slot].setLine(x1, y1, x2, y2)
+            self._unindex(slot)
+            self._coords[slot] = x1, y1, x2, y2
+            self._index(slot, x1, y1, x2, y2)
+        self._changed(np.concatenate((old, coords)))
+
+    def refresh(self):
+        """Точно пересчитывает границы (толщина линии могла измениться) и перерисовывает пакет"""
+        self.prepareGeometryChange()
+        self._bounds = self._rect(self.coords) if self.count else QRectF()
+        self.update()
+
+    def refresh_label(self, slot):
+        """Перерисовывает подпись ребра после изменения веса"""
+        self.update(self._rect(self._coords[slot:slot + 1], self.LABEL_MARGIN))
+
+    def _rect(self, coords, extra=0):
+        """Габариты отрезков coords с запасом на толщину линии и extra"""
+        xs, ys = coords[:, 0::2], coords[:, 1::2]
+        margin = self.style.params["thickness"] + extra
+        return QRectF(xs.min() - margin, ys.min() - margin,
+                      xs.max() - xs.min() + 2 * margin, ys.max() - ys.min() + 2 * margin)
+
+    def _changed(self, coords):
+        """Расширяет границы до отрезков coords и перерисовывает только их область с подписями"""
+        rect = self._rect(coords)
+        bounds = self._bounds.united(rect) if not self._bounds.isNull() else rect
+        if bounds != self._bounds:
+            self.prepareGeometryChange()
+            self._bounds = bounds
+        self.update(self._rect(coords, self.LABEL_MARGIN))
+
+    def _cells(self, level, left, top, right, bottom, limit):
+        """Ячейки сетки уровня level, задевающие прямоугольник, или None, если их больше limit"""
+        if not all(map(math.isfinite, (left, top, right, bottom))):
+            return None
+        size = self.GRID_CELL * 2 ** level
+        x1, y1 = math.floor(left / size), math.floor(top / size)
+        x2, y2 = math.floor(right / size), math.floor(bottom / size)
+        if (x2 - x1 + 1) * (y2 - y1 + 1) > limit:
+            return None
+        return [(level, x, y) for x in range(x1, x2 + 1) for y in range(y1, y2 + 1)]
+
+    def _edge_cells(self, x1, y1, x2, y2):
+        """Ячейки ребра с концами (x1, y1), (x2, y2) или None, если координаты не конечны.
+
+        Зависит только от координат, поэтому ячейки не хранятся, а при
+        переиндексации вычисляются заново по старым координатам слота.
+        """
+        span = max(abs(x2 - x1), abs(y2 - y1))
+        if not math.isfinite(span):
+            return None
+        level = math.ceil(math.log2(span / self.GRID_CELL)) if span > self.GRID_CELL else 0
+        return self._cells(level, min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2), 4)
+
+    def _index(self, slot, x1, y1, x2, y2):
+        cells = self._edge_cells(x1, y1, x2, y2)
+        if cells is None:
+            self.unindexed.add(slot)
+            return
+        level = cells[0][0]
+        self.levels[level] = self.levels.get(level, 0) + 1
+        for cell in cells:
+            self.grid.setdefault(cell, set()).add(slot)
+
+    def _unindex(self, slot):
+        cells = self._edge_cells(*self._coords[slot].tolist())
+        if cells is None:
+            self.unindexed.discard(slot)
+            return
+        level = cells[0][0]
+        self.levels[level] -= 1
+        if not self.levels[level]:
+            del self.levels[level]
+        for cell in cells:
+            bucket = self.grid[cell]
+            bucket.discard(slot)
+            if not bucket:
+                del self.grid[cell]
+
+    def slots_near(self, left, top, right, bottom, limit):
+        """Слоты рёбер, габариты которых пересекают прямоугольник.
+
+        Небольшой прямоугольник проверяется по ячейкам сеток всех уровней,
+        а если он задевает больше limit ячеек - все рёбра сразу на массиве
+        координат.
+        """
+        grid = self.grid
+        candidates = set(self.unindexed)
+        for level in self.levels:
+            cells = self._cells(level, left, top, right, bottom, limit)
+            if cells is None:
+                slots = np.arange(self.count)
+                break
+            limit -= len(cells)
+            for cell in cells:
+                candidates.update(grid.get(cell, ()))
+        else:
+            slots = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        x1, y1, x2, y2 = self._coords[slots].T
+        return slots[(np.minimum(x1, x2) <= right) & (np.maximum(x1, x2) >= left) &
+                     (np.minimum(y1, y2) <= bottom) & (np.maximum(y1, y2) >= top)]
+
+    def boundingRect(self):
+        return self._bounds
+
+    def paint(self, painter, option, widget=None):
+        if not self.count:
+            return
+        lod = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        thin = lod < self.style.params["line_lod"]
+        painter.setPen(self.qt_style["thin_pen" if thin else "pen"])
+        area = option.exposedRect
+        labels = lod >= self.style.params["label_lod"]
+        # Подпись может выступать за габариты ребра, поэтому для подписей область шире
+        margin = self.LABEL_MARGIN if labels else 0
+        left, top, right, bottom = area.left() - margin, area.top() - margin, area.right() + margin, \
+            area.bottom() + margin
+        if area.contains(self._bounds):
+            painter.drawLines(self.lines)
+            slots = np.arange(self.count)
+        else:
+            slots = self.slots_near(left, top, right, bottom, self.GRID_QUERY_CELLS)
+            x1, y1, x2, y2 = self._coords[slots].T
+            visible = slots[(np.minimum(x1, x2) <= area.right()) & (np.maximum(x1, x2) >= area.left()) &
+                            (np.minimum(y1, y2) <= area.bottom()) & (np.maximum(y1, y2) >= area.top())]
+            lines = self.lines
+            painter.drawLines([lines[slot] for slot in visible.tolist()])
+
+        if not labels:
+            return
+        # Подписи только для рёбер, середина которых рядом с перерисовываемой областью
+        coords = self._coords[slots]
+        middle_x = (coords[:, 0] + coords[:, 2]) / 2
+        middle_y = (coords[:, 1] + coords[:, 3]) / 2
+        near = (middle_x >= left) & (middle_x <= right) & (middle_y >= top) & (middle_y <= bottom)
+        slots, middle_x, middle_y = slots[near], middle_x[near], middle_y[near]
+        painter.setPen(self.qt_style["text_pen"])
+        weights = self.store.edge_weights[self.rows[slots]]
+        for x, y, weight in zip(middle_x.tolist(), middle_y.tolist(), weights.tolist()):
+            painter.drawText(QPointF(x, y), str(weight_value(weight)))
+
+    def row_at(self, point, tolerance):
+        """Строка ребра, линия которого проходит ближе tolerance к точке point, или None"""
+        if not self.count:
+            return None
+        x, y = point.x(), point.y()
+        candidates = self.slots_near(x - tolerance, y - tolerance, x + tolerance, y + tolerance, self.GRID_QUERY_CELLS)
+        if not len(candidates):
+            return None
+        x1, y1, x2, y2 = self._coords[candidates].T
+        dx, dy = x2 - x1, y2 - y1
+        length = dx * dx + dy * dy
+        t = np.zeros_like(length)
+        np.divide((x - x1) * dx + (y - y1) * dy, length, out=t, where=length != 0)
+        t = np.clip(t, 0, 1)
+        px, py = x1 + t * dx - x, y1 + t * dy - y
+        distances = np.sqrt(px * px + py * py)
+        best = int(np.argmin(distances))
+        if distances[best] > tolerance:
+            return None
+        return int(self.rows[candidates[best]])
+
+
+class EdgeBatches:
+    """Пакетная отрисовка рёбер холста: по одному EdgeBatch на каждый стиль рёбер.
+
+    Пакеты ссылаются на рёбра по строкам хранилища; холст передаёт сюда
+    удаление строк (edge_row_removed), чтобы перенос последней строки на
+    место удалённой не сбивал соответствие. Рёбра без объекта Edge рисуются
+    стилем по умолчанию.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.store = canvas.graph.store
+        self.batches = {}  # Стиль -> EdgeBatch
+        self.batch_of = []  # Строка ребра -> EdgeBatch или None
+        self.slot_of = np.empty(0, dtype=np.int64)  # Строка ребра -> слот в её пакете
+
+    def _batch(self, style):
+        batch = self.batches.get(style)
+        if batch is None:
+            batch = EdgeBatch(style, self.canvas.edge_qt_style(style), self)
+            self.canvas.scene.addItem(batch)
+            self.batches[style] = batch
+        return batch
+
+    def _batch_of(self, row):
+        return self.batch_of[row] if row < len(self.batch_of) else None
+
+    def _rows(self, edges):
+        """Строки рёбер, ещё принадлежащих графу"""
+        return [edge._row for edge in edges if edge._store is self.store]
+
+    def placed(self, rows, batch, slots):
+        """Запоминает, что строки rows заняли слоты slots пакета batch"""
+        needed = int(rows.max()) + 1
+        if needed > len(self.batch_of):
+            self.batch_of.extend([None] * (needed - len(self.batch_of)))
+        self.slot_of = GraphStore._grown(self.slot_of, needed)
+        self.slot_of[rows] = slots
+        for row in rows.tolist():
+            self.batch_of[row] = batch
+
+    def add_rows(self, rows):
+        """Добавляет рёбра по строкам хранилища в пакеты их стилей"""
+        views = self.store.edge_views
+        default = self.store.edge_styles[StyleTable.DEFAULT]
+        by_style = {}
+        for row in np.asarray(rows, dtype=np.int64).tolist():
+            view = views[row]
+            by_style.setdefault(default if view is None else view.style, []).append(row)
+        for style, style_rows in by_style.items():
+            self._batch(style).add_rows(style_rows)
+
+    def add_edges(self, edges):
+        self.add_rows(self._rows(edges))
+
+    def _by_batch(self, rows):
+        by_batch = {}
+        for row in dict.fromkeys(rows):
+            batch = self._batch_of(row)
+            if batch is not None:
+                by_batch.setdefault(batch, []).append(row)
+        return by_batch
+
+    def remove_rows(self, rows):
+        for batch, batch_rows in self._by_batch(rows).items():
+            batch.remove_rows(batch_rows)
+            for row in batch_rows:
+                self.batch_of[row] = None
+
+    def remove_edges(self, edges):
+        """Убирает рёбра; уже удалённые из графа убраны в edge_row_removed"""
+        self.remove_rows(self._rows(edges))
+
+    def patch_rows(self, rows):
+        for batch, batch_rows in self._by_batch(rows).items():
+            batch.patch_rows(batch_rows)
+
+    def patch_edges(self, edges):
+        self.patch_rows(self._rows(edges))
+
+    def edge_row_removed(self, row, moved_from):
+        """Строка row удалена из хранилища, на её место перенесена строка moved_from (или None)"""
+        self.remove_rows([row])
+        batch = self._batch_of(moved_from) if moved_from is not None else None
+        if batch is not None:
+            slot = self.slot_of[moved_from]
+            batch.rows[slot] = row
+            self.slot_of[row] = slot
+            self.batch_of[row] = batch
+            self.batch_of[moved_from] = None
+        del self.batch_of[self.store.edge_count:]
+
+    def restyle(self, edge):
+        """Переносит ребро в пакет его текущего стиля"""
+        if edge._store is not self.store:
+            return
+        batch = self._batch_of(edge._row)
+        if batch is None or batch.style is not edge.style:
+            self.remove_rows([edge._row])
+            self._batch(edge.style).add_rows([edge._row])
+
+    def refresh_style(self, style):
+        """Перерисовывает пакет после изменения параметров стиля на месте"""
+        batch = self.batches.get(style)
+        if batch is not None:
+            batch.qt_style = self.canvas.edge_qt_style(style)
+            batch.refresh()
+
+    def refresh_labels(self, edge):
+        if edge._store is not self.store:
+            return
+        batch = self._batch_of(edge._row)
+        if batch is not None:
+            batch.refresh_label(int(self.slot_of[edge._row]))
+
+    def edge_at(self, point):
+        """Ребро под точкой сцены point или None; допуск пересчитывается из пикселей экрана"""
+        scale = self.canvas.transform().m11() or 1
+        for batch in self.batches.values():
+            row = batch.row_at(point, batch.HIT_TOLERANCE / scale)
+            if row is not None:
+                return self.canvas.graph.edge(row)
+        return None
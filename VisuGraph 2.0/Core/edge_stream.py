@@ -0,0 +1,178 @@
+import codecs
+import csv
+import json
+import os
+
+import numpy as np
+
+
+CHUNK_SIZE = 100000  # Рёбер в одном куске
+READ_SIZE = 1 << 20  # Байт за одно чтение файла
+
+# Расширение файла -> формат списка рёбер
+EDGE_FILE_FORMATS = {
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".csv": "csv",
+    ".json": "json",
+}
+
+
+def edge_file_format(file_path):
+    """Формат списка рёбер по расширению файла; по умолчанию JSON с ключом "edges"."""
+    return EDGE_FILE_FORMATS.get(os.path.splitext(file_path)[1].lower(), "json")
+
+
+class EdgeStreamReader:
+    """Потоковое чтение рёбер {"start", "end", "weight"} кусками ограниченного размера.
+
+    Поддерживаются JSON с ключом "edges" (массив разбирается по одному
+    элементу, без json.load всего файла), NDJSON (объект ребра на строке) и
+    CSV со столбцами start,end[,weight] и необязательным заголовком. Рёбра
+    без начала или конца пропускаются и учитываются в skipped; вес по
+    умолчанию 1. bytes_read и total_bytes позволяют показывать прогресс.
+    """
+
+    def __init__(self, file_path, chunk_size=CHUNK_SIZE, file_format=None):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.format = file_format or edge_file_format(file_path)
+        if self.format not in ("json", "ndjson", "csv"):
+            raise ValueError(f"Неизвестный формат списка рёбер: {self.format}")
+        self.total_bytes = os.path.getsize(file_path)
+        self.bytes_read = 0
+        self.edges_read = 0
+        self.skipped = 0  # Некорректные записи
+
+    def chunks(self):
+        """Генератор кусков (начала, концы, веса) - массивы длиной не больше chunk_size"""
+        records = {"json": self._json_records, "ndjson": self._ndjson_records, "csv": self._csv_records}[self.format]
+        starts, ends, weights = [], [], []
+        with open(self.file_path, "rb") as file:
+            for start, end, weight in records(file):
+                starts.append(start)
+                ends.append(end)
+                weights.append(weight)
+                if len(starts) == self.chunk_size:
+                    yield self._chunk(starts, ends, weights)
+                    starts, ends, weights = [], [], []
+        if starts:
+            yield self._chunk(starts, ends, weights)
+
+    def _chunk(self, starts, ends, weights):
+        self.edges_read += len(starts)
+        return (np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64),
+                np.array(weights, dtype=np.float64))
+
+    def _edge(self, start, end, weight):
+        """Кортеж ребра или None для некорректной записи"""
+        if start is None or end is None or start == "" or end == "":
+            self.skipped += 1
+            return None
+        try:
+            return int(start), int(end), float(1 if weight is None or weight == "" else weight)
+        except (TypeError, ValueError):
+            self.skipped += 1
+            return None
+
+    def _record_edge(self, record):
+        if not isinstance(record, dict):
+            self.skipped += 1
+            return None
+        return self._edge(record.get("start"), record.get("end"), record.get("weight", 1))
+
+    def _lines(self, file):
+        for line in file:
+            self.bytes_read += len(line)
+            yield line
+
+    def _ndjson_records(self, file):
+        for line in self._lines(file):
+            line = line.strip()
+            if not line:
+                continue
+            edge = self._record_edge(json.loads(line))
+            if edge is not None:
+                yield edge
+
+    def _csv_records(self, file):
+        rows = csv.reader(line.decode("utf-8-sig") for line in self._lines(file))
+        columns = (0, 1, 2)
+        first = True
+        for row in rows:
+            if not row:
+                continue
+            if first:
+                first = False
+                header = [name.strip().lower() for name in row]  # Заголовок задаёт порядок столбцов
+                if "start" in header and "end" in header:
+                    columns = (header.index("start"), header.index("end"),
+                               header.index("weight") if "weight" in header else len(header))
+                    continue
+            start, end, weight = (row[column] if column < len(row) else None for column in columns)
+            edge = self._edge(start, end, weight)
+            if edge is not None:
+                yield edge
+
+    def _read_text(self, file, decoder):
+        data = file.read(READ_SIZE)
+        self.bytes_read += len(data)
+        return decoder.decode(data, final=not data)
+
+    def _skip(self, file, decoder, buffer, position, skipped=" \t\r\n"):
+        """Пропускает символы skipped; возвращает (buffer, position), где position - первый другой символ или конец"""
+        while True:
+            while position < len(buffer) and buffer[position] in skipped:
+                position += 1
+            if position < len(buffer):
+                return buffer, position
+            block = self._read_text(file, decoder)
+            if not block:
+                return buffer, position
+            buffer, position = block, 0
+
+    def _expect(self, file, decoder, buffer, position, symbol):
+        buffer, position = self._skip(file, decoder, buffer, position)
+        if buffer[position:position + 1] != symbol:
+            raise ValueError(f'Некорректный JSON: после ключа "edges" ожидается "{symbol}".')
+        return buffer, position + 1
+
+    def _json_records(self, file):
+        key = '"edges"'
+        decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        objects = json.JSONDecoder()
+
+        buffer, position = "", 0
+        while True:
+            index = buffer.find(key, position)
+            if index < 0:
+                block = self._read_text(file, decoder)
+                if not block:
+                    raise ValueError('В файле нет ключа "edges".')
+                buffer, position = buffer[-(len(key) - 1):] + block, 0  # Ключ может быть разрезан границей блока
+                continue
+            buffer, position = self._skip(file, decoder, buffer, index + len(key))
+            if buffer[position:position + 1] == ":":  # Иначе это строка "edges", а не ключ
+                break
+        buffer, position = self._expect(file, decoder, buffer, position + 1, "[")
+
+        while True:
+            buffer, position = self._skip(file, decoder, buffer, position, " \t\r\n,")
+            if position == len(buffer):
+                raise ValueError('Некорректный JSON: массив "edges" не закрыт.')
+            if buffer[position] == "]":
+                return
+            while True:
+                try:
+                    record, position = objects.raw_decode(buffer, position)
+                    break
+                except json.JSONDecodeError:
+                    block = self._read_text(file, decoder)
+                    if not block:
+                        raise
+                    buffer, position = buffer[position:] + block, 0
+            edge = self._record_edge(record)
+            if edge is not None:
+                yield edge
+            if position > READ_SIZE:
+                buffer, position = buffer[position:], 0
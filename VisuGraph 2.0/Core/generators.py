@@ -0,0 +1,99 @@
+import numpy as np
+
+
+class GeneratedGraph:
+    """Сгенерированный неориентированный граф: вершины 1..size, рёбра без петель и повторов.
+
+    starts, ends и weights - массивы одинаковой длины; веса - целые от 1 до 10.
+    """
+
+    def __init__(self, name, size, starts, ends, weights):
+        self.name = name
+        self.size = int(size)
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def edges(self):
+        """Список рёбер {"start", "end", "weight"}, как в файлах списка рёбер"""
+        return [{"start": start, "end": end, "weight": int(weight)}
+                for start, end, weight in zip(self.starts.tolist(), self.ends.tolist(), self.weights.tolist())]
+
+
+def _graph(name, size, pairs, rng):
+    """Граф по парам строк вершин (с 0): петли и повторы пар отбрасываются"""
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    lower, upper = np.minimum(pairs[:, 0], pairs[:, 1]), np.maximum(pairs[:, 0], pairs[:, 1])
+    keys = np.unique(lower * size + upper)
+    weights = rng.integers(1, 11, len(keys))
+    return GeneratedGraph(name, size, keys // size + 1, keys % size + 1, weights)
+
+
+def grid_graph(rows, cols, seed=0):
+    """Решётка rows x cols"""
+    rng = np.random.default_rng(seed)
+    index = np.arange(rows * cols).reshape(rows, cols)
+    horizontal = np.stack((index[:, :-1].ravel(), index[:, 1:].ravel()), axis=1)
+    vertical = np.stack((index[:-1, :].ravel(), index[1:, :].ravel()), axis=1)
+    return _graph("grid", rows * cols, np.concatenate((horizontal, vertical)), rng)
+
+
+def erdos_renyi_graph(size, edge_count, seed=0):
+    """Случайный граф Эрдёша - Реньи G(n, m): edge_count различных случайных пар"""
+    rng = np.random.default_rng(seed)
+    edge_count = min(edge_count, size * (size - 1) // 2)
+    pairs = np.empty((0, 2), dtype=np.int64)
+    while True:
+        graph = _graph("erdos_renyi", size, pairs, rng)
+        if len(graph) >= edge_count:
+            break
+        extra = rng.integers(0, size, (2 * (edge_count - len(graph)) + 16, 2))
+        pairs = np.concatenate((np.stack((graph.starts - 1, graph.ends - 1), axis=1), extra))
+    keep = np.sort(rng.choice(len(graph), edge_count, replace=False))
+    return GeneratedGraph("erdos_renyi", size, graph.starts[keep], graph.ends[keep], graph.weights[keep])
+
+
+def barabasi_albert_graph(size, attach=3, seed=0):
+    """Граф Барабаши - Альберт: каждая новая вершина соединяется с attach вершинами пропорционально степени"""
+    rng = np.random.default_rng(seed)
+    attach = max(1, min(attach, size - 1))
+    pairs = [(i, j) for i in range(attach + 1) for j in range(i)]  # Начальная клика
+    repeated = [vertex for pair in pairs for vertex in pair]  # Вершина повторяется столько раз, какова её степень
+    for vertex in range(attach + 1, size):
+        targets = set()
+        while len(targets) < attach:
+            targets.add(repeated[int(rng.integers(len(repeated)))])
+        for target in targets:
+            pairs.append((vertex, target))
+            repeated.extend((vertex, target))
+    return _graph("barabasi_albert", size, pairs, rng)
+
+
+def random_tree(size, seed=0):
+    """Случайное дерево: предок каждой вершины выбирается среди предыдущих"""
+    rng = np.random.default_rng(seed)
+    children = np.arange(1, size)
+    parents = (rng.random(size - 1) * children).astype(np.int64)
+    return _graph("tree", size, np.stack((children, parents), axis=1), rng)
+
+
+def generated_graph(name, elements, seed=0):
+    """Граф вида name, в котором вершин и рёбер вместе примерно elements"""
+    if name == "grid":
+        side = max(2, int(round((elements / 3) ** 0.5)))  # В решётке рёбер почти вдвое больше, чем вершин
+        return grid_graph(side, side, seed)
+    if name == "erdos_renyi":
+        size = max(2, elements // 5)
+        return erdos_renyi_graph(size, 4 * size, seed)
+    if name == "barabasi_albert":
+        return barabasi_albert_graph(max(4, elements // 4), 3, seed)
+    if name == "tree":
+        return random_tree(max(2, elements // 2), seed)
+    raise ValueError(f"Неизвестный генератор графов: {name}")
+
+
+GENERATORS = ("grid", "erdos_renyi", "barabasi_albert", "tree")
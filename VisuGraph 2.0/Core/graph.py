@@ -1,143 +1,401 @@
+import numpy as np
+
+from Core.storage import GraphStore, pair_keys
+from Core.styles import StyleTable
+
+
+# Стили для вершин и рёбер, ещё не добавленных в граф
+DETACHED_VERTEX_STYLES = StyleTable.for_vertices()
+DETACHED_EDGE_STYLES = StyleTable.for_edges()
+
+
+def weight_value(weight):
+    """Вес для показа: целые веса без дробной части"""
+    weight = float(weight)
+    return int(weight) if weight.is_integer() else weight
+
+
 class Vertex:
+    """Вершина графа; после добавления в граф координаты хранятся в его GraphStore"""
+
+    __slots__ = ("id", "canvas", "is_highlighted", "item", "style_id", "highlighted_style_id",
+                 "_store", "_row", "_x", "_y")
+
     def __init__(self, id, x=0, y=0, canvas=None, is_highlighted=False):
         self.id = id  
-        self.x = x  
-        self.y = y 
+        self._store = None  # Хранилище графа, в который добавлена вершина
+        self._row = -1  # Строка вершины в хранилище
+        self._x = x  
+        self._y = y 
         self.canvas = canvas  
+        self.item = None  # Графический элемент вершины на холсте
         self.is_highlighted = is_highlighted  
-        self.default_params = {
-            "color": "white",
-            "border_color": "blue",
-            "border_width": 10,
-            "text_size": 20,
-            "text_color": "green",
-            "shape": "circle",
-            "size": 20
-        }
-        self.highlighted_params = {
-            "color": "#7FFFD4",
-            "border_color": "black",
-            "border_width": 3,
-            "text_size": 14,
-            "text_color": "white",
-            "shape": "circle",
-            "size": 25
-        }
-
-        self.update_params()
-    def update_params(self):
-        """Метод для применения параметров в зависимости от выделенности"""
-        if self.is_highlighted:
-            self.params = self.highlighted_params.copy()
+        self.style_id = StyleTable.DEFAULT  # Стиль в обычном состоянии
+        self.highlighted_style_id = StyleTable.HIGHLIGHTED  # Стиль в выделенном состоянии
+
+    @property
+    def x(self):
+        if self._store is None:
+            return self._x
+        return float(self._store.vertex_positions[self._row, 0])
+
+    @x.setter
+    def x(self, value):
+        if self._store is None:
+            self._x = value
+        else:
+            self._store.vertex_positions[self._row, 0] = value
+
+    @property
+    def y(self):
+        if self._store is None:
+            return self._y
+        return float(self._store.vertex_positions[self._row, 1])
+
+    @y.setter
+    def y(self, value):
+        if self._store is None:
+            self._y = value
         else:
-            self.params = self.default_params.copy()
+            self._store.vertex_positions[self._row, 1] = value
+
+    def _attach(self, store, row):
+        """Привязывает вершину к строке хранилища"""
+        self._store = store
+        self._row = row
+
+    def _detach(self):
+        """Отвязывает вершину от хранилища, сохраняя последние координаты"""
+        if self._store is not None:
+            self._x, self._y = self.x, self.y
+            self._store = None
+            self._row = -1
+
+    def _styles(self):
+        return self._store.vertex_styles if self._store is not None else DETACHED_VERTEX_STYLES
+
+    @property
+    def style(self):
+        """Общий стиль, применяемый к вершине сейчас"""
+        return self._styles().styles[self.highlighted_style_id if self.is_highlighted else self.style_id]
+
+    @property
+    def params(self):
+        return self.style.params
+
+    @property
+    def default_params(self):
+        return self._styles().styles[self.style_id].params
+
+    @property
+    def highlighted_params(self):
+        return self._styles().styles[self.highlighted_style_id].params
 
     def set_highlighted(self, is_highlighted):
         """Метод для изменения флага выделенности"""
         self.is_highlighted = is_highlighted
-        self.update_params()
+
+    def set_style(self, name):
+        """Назначает вершине именованный стиль для обычного состояния"""
+        self.style_id = self._styles().id_of(name)
 
     def update_custom_params(self, color=None, border_color=None, border_width=None, 
-                             text_size=None, text_color=None, shape=None, size=None):
+                             text_size=None, text_color=None, shape=None, size=None,
+                             label_lod=None, shape_lod=None):
         """Метод для изменения параметров вершины напрямую"""
-        target_params = self.highlighted_params if self.is_highlighted else self.default_params
-        if color:
-            target_params["color"] = color
-        if border_color:
-            target_params["border_color"] = border_color
-        if border_width:
-            target_params["border_width"] = border_width
-        if text_size:
-            target_params["text_size"] = text_size
-        if text_color:
-            target_params["text_color"] = text_color
-        if shape:
-            target_params["shape"] = shape
-        if size:
-            target_params["size"] = size
+        if self._store is None:
+            raise ValueError(f"Вершина {self.id} не добавлена в граф.")
+        styles = self._store.vertex_styles
+        overrides = dict(color=color, border_color=border_color, border_width=border_width,
+                         text_size=text_size, text_color=text_color, shape=shape, size=size,
+                         label_lod=label_lod, shape_lod=shape_lod)
+        if self.is_highlighted:
+            self.highlighted_style_id = styles.derive(self.highlighted_style_id, **overrides)
+        else:
+            self.style_id = styles.derive(self.style_id, **overrides)
 
 class Edge:
+    """Ребро графа; после добавления в граф концы и вес хранятся в его GraphStore"""
+
+    __slots__ = ("is_highlighted", "line_item", "text_item", "style_id", "highlighted_style_id",
+                 "_store", "_row", "_start_vertex", "_end_vertex", "_weight")
+
     def __init__(self, start_vertex, end_vertex, weight=1, is_highlighted=False):
-        self.start_vertex = start_vertex  
-        self.end_vertex = end_vertex  
-        self.weight = weight 
+        self._store = None  # Хранилище графа, в который добавлено ребро
+        self._row = -1  # Строка ребра в хранилище
+        self._start_vertex = start_vertex  
+        self._end_vertex = end_vertex  
+        self._weight = weight 
+        self.line_item = None  # Линия ребра на холсте
+        self.text_item = None  # Подпись веса ребра на холсте
         self.is_highlighted = is_highlighted  
-        self.default_params = {
-            "color": "#DB7093",
-            "text_size": 10,
-            "text_color": "green",
-            "style": "solid",
-            "thickness": 2
-        }
-        self.highlighted_params = {
-            "color": "red",
-            "text_size": 12,
-            "text_color": "green",
-            "style": "dashed",
-            "thickness": 3
-        }
-
-        self.update_params()
-
-    def update_params(self):
-        """Метод для применения параметров в зависимости от выделенности"""
-        if self.is_highlighted:
-            self.params = self.highlighted_params.copy()
+        self.style_id = StyleTable.DEFAULT  # Стиль в обычном состоянии
+        self.highlighted_style_id = StyleTable.HIGHLIGHTED  # Стиль в выделенном состоянии
+
+    @property
+    def start_vertex(self):
+        if self._store is None:
+            return self._start_vertex
+        return self._store.vertex_views[self._store.edge_endpoints[self._row, 0]]
+
+    @property
+    def end_vertex(self):
+        if self._store is None:
+            return self._end_vertex
+        return self._store.vertex_views[self._store.edge_endpoints[self._row, 1]]
+
+    @property
+    def weight(self):
+        if self._store is None:
+            return self._weight
+        return weight_value(self._store.edge_weights[self._row])
+
+    @weight.setter
+    def weight(self, value):
+        if self._store is None:
+            self._weight = value
         else:
-            self.params = self.default_params.copy()
+            self._store.edge_weights[self._row] = value
+
+    def _attach(self, store, row):
+        """Привязывает ребро к строке хранилища"""
+        self._store = store
+        self._row = row
+        self._start_vertex = self._end_vertex = self._weight = None
+
+    def _detach(self):
+        """Отвязывает ребро от хранилища, сохраняя последние концы и вес"""
+        if self._store is not None:
+            self._start_vertex, self._end_vertex, self._weight = self.start_vertex, self.end_vertex, self.weight
+            self._store = None
+            self._row = -1
+
+    def _styles(self):
+        return self._store.edge_styles if self._store is not None else DETACHED_EDGE_STYLES
+
+    @property
+    def style(self):
+        """Общий стиль, применяемый к ребру сейчас"""
+        return self._styles().styles[self.highlighted_style_id if self.is_highlighted else self.style_id]
+
+    @property
+    def params(self):
+        return self.style.params
+
+    @property
+    def default_params(self):
+        return self._styles().styles[self.style_id].params
+
+    @property
+    def highlighted_params(self):
+        return self._styles().styles[self.highlighted_style_id].params
 
     def set_highlighted(self, is_highlighted):
         """Метод для изменения флага выделенности"""
         self.is_highlighted = is_highlighted
-        self.update_params()
 
-    def update_custom_params(self, color=None, text_size=None, style=None, thickness=None):
+    def set_style(self, name):
+        """Назначает ребру именованный стиль для обычного состояния"""
+        self.style_id = self._styles().id_of(name)
+
+    def update_custom_params(self, color=None, text_size=None, style=None, thickness=None, text_color=None,
+                             label_lod=None, line_lod=None):
         """Метод для изменения параметров ребра напрямую"""
-        target_params = self.highlighted_params if self.is_highlighted else self.default_params
-        if color:
-            target_params["color"] = color
-        if text_size:
-            target_params["text_size"] = text_size
-        if style:
-            target_params["style"] = style
-        if thickness:
-            target_params["thickness"] = thickness
+        if self._store is None:
+            raise ValueError("Ребро не добавлено в граф.")
+        styles = self._store.edge_styles
+        overrides = dict(color=color, text_size=text_size, style=style, thickness=thickness, text_color=text_color,
+                         label_lod=label_lod, line_lod=line_lod)
+        if self.is_highlighted:
+            self.highlighted_style_id = styles.derive(self.highlighted_style_id, **overrides)
+        else:
+            self.style_id = styles.derive(self.style_id, **overrides)
 
 
 class Graph:
+    """Граф поверх GraphStore.
+
+    Объекты Vertex есть у всех вершин, а объекты Edge создаются по запросу
+    (edge, get_edge, incident_edges) и дальше переиспользуются; рёбра,
+    добавленные массивами через add_edges, до запроса хранятся только в
+    массивах хранилища.
+    """
+
     def __init__(self):
+        self.store = GraphStore()  # Колоночное хранилище координат, концов и весов
         self.vertices = {}  
-        self.edges = []  
+
+    @property
+    def edges(self):
+        """Все рёбра графа по строкам хранилища (создаёт недостающие объекты Edge)"""
+        return [self.edge(row) for row in range(self.store.edge_count)]
+
+    def edge_views(self):
+        """Уже созданные объекты Edge; у остальных рёбер стиль по умолчанию и нет элементов холста"""
+        return [edge for edge in self.store.edge_views if edge is not None]
+
+    def edge(self, row):
+        """Объект Edge для строки хранилища; создаётся при первом запросе"""
+        view = self.store.edge_views[row]
+        if view is None:
+            view = Edge(None, None)
+            view._attach(self.store, row)
+            self.store.edge_views[row] = view
+        return view
+
+    @staticmethod
+    def edge_key(start_id, end_id):
+        """Ключ неориентированной пары вершин"""
+        return (start_id, end_id) if start_id <= end_id else (end_id, start_id)
+
+    def reserve(self, vertices=0, edges=0):
+        """Заранее выделяет в хранилище место ещё под vertices вершин и edges рёбер"""
+        self.store.reserve(self.store.vertex_count + vertices, self.store.edge_count + edges)
 
     def add_vertex(self, vertex):
-        """Добавление вершины в граф"""
+        """Добавление вершины в граф или замена вершины с тем же id"""
+        existing_vertex = self.vertices.get(vertex.id)
+        if existing_vertex is vertex:
+            return
+        if vertex._store is not None:
+            raise ValueError(f"Вершина {vertex.id} уже принадлежит другому графу.")
+        if existing_vertex is not None:
+            row = existing_vertex._row
+            existing_vertex._detach()
+            self.store.replace_vertex_view(row, vertex, vertex._x, vertex._y)
+        else:
+            row = self.store.append_vertex(vertex, vertex.id, vertex._x, vertex._y)
+        vertex._attach(self.store, row)
         self.vertices[vertex.id] = vertex
 
+    def vertex_row(self, vertex_id):
+        """Строка вершины в хранилище (номер вершины в массивах и CSR-смежности)"""
+        return self.vertices[vertex_id]._row
+
+    def get_edge(self, start_id, end_id):
+        """Ребро между двумя вершинами или None"""
+        start, end = self.vertices.get(start_id), self.vertices.get(end_id)
+        if start is None or end is None:
+            return None
+        row = self.store.find_edge(start._row, end._row)
+        return self.edge(row) if row >= 0 else None
+
+    def incident_rows(self, vertex_id):
+        """Строки рёбер, инцидентных вершине"""
+        vertex = self.vertices.get(vertex_id)
+        return self.store.incident_rows(vertex._row) if vertex is not None else []
+
+    def incident_edges(self, vertex_id):
+        """Рёбра, инцидентные вершине"""
+        return [self.edge(row) for row in self.incident_rows(vertex_id)]
+
+    def neighbors(self, vertex_id):
+        """Пары (id соседа, строка ребра) для рёбер вершины; объекты Edge не создаются"""
+        store = self.store
+        pairs = []
+        for row in self.incident_rows(vertex_id):
+            start, end = store.edge_endpoints[row].tolist()
+            start_id = int(store.vertex_ids[start])
+            pairs.append((int(store.vertex_ids[end]) if start_id == vertex_id else start_id, row))
+        return pairs
+
     def add_edge(self, start_vertex, end_vertex, weight=1):
         """Добавление ребра в граф или замена существующего"""
-        existing_edge = None
-        for edge in self.edges:
-            if (edge.start_vertex == start_vertex and edge.end_vertex == end_vertex) or \
-               (edge.start_vertex == end_vertex and edge.end_vertex == start_vertex):
-                existing_edge = edge
-                break
+        existing_edge = self.get_edge(start_vertex.id, end_vertex.id)
         if existing_edge:
             existing_edge.weight = weight
-            existing_edge.update_params()  
-        else:
-            new_edge = Edge(start_vertex, end_vertex, weight)
-            self.edges.append(new_edge)
+            return existing_edge
+        start_vertex = self.vertices.get(start_vertex.id) or self._added(start_vertex)
+        end_vertex = self.vertices.get(end_vertex.id) or self._added(end_vertex)
+        new_edge = Edge(start_vertex, end_vertex, weight)
+        row = self.store.append_edge(new_edge, start_vertex._row, end_vertex._row, weight)
+        new_edge._attach(self.store, row)
+        return new_edge
+
+    def add_edges(self, start_ids, end_ids, weights):
+        """Добавляет рёбра между уже существующими вершинами массивами, без объектов Edge.
+
+        Результат тот же, что у add_edge по очереди: повторная пара только
+        меняет вес (остаётся последний). Возвращает (строки новых рёбер,
+        строки уже существовавших рёбер, у которых изменился вес).
+        """
+        ids, inverse = np.unique(np.concatenate((start_ids, end_ids)), return_inverse=True)
+        vertex_rows = np.array([self.vertices[vertex_id]._row for vertex_id in ids.tolist()], dtype=np.int64)
+        start_rows, end_rows = np.split(vertex_rows[inverse], 2)
+        weights = np.asarray(weights, dtype=np.float64)
+
+        keys = pair_keys(start_rows, end_rows)
+        unique_keys, first = np.unique(keys, return_index=True)
+        _, last = np.unique(keys[::-1], return_index=True)
+        last = len(keys) - 1 - last  # Для каждой пары - её последнее вхождение
+
+        found = self.store.find_edges(unique_keys)
+        existing = found >= 0
+        reweighted = found[existing]
+        self.store.edge_weights[reweighted] = weights[last[existing]]
+
+        new = np.sort(first[~existing])  # Новые рёбра - в порядке первого вхождения и с его направлением
+        new_last = last[~existing][np.argsort(first[~existing])]
+        row = self.store.append_edges(start_rows[new], end_rows[new], weights[new_last])
+        return np.arange(row, row + len(new)), reweighted
+
+    def _added(self, vertex):
+        """Добавляет вершину в граф и возвращает её"""
+        self.add_vertex(vertex)
+        return vertex
+
+    def remove_edge(self, edge):
+        """Удаление ребра из графа"""
+        if edge._store is not self.store or self.store.edge_views[edge._row] is not edge:
+            return
+        row = edge._row
+        edge._detach()
+        self.store.remove_edge_row(row)
+
+    def remove_vertex(self, vertex_id):
+        """Удаление вершины вместе с инцидентными рёбрами, возвращает удалённые рёбра"""
+        removed_edges = self.incident_edges(vertex_id)
+        for edge in removed_edges:
+            self.remove_edge(edge)
+        vertex = self.vertices.pop(vertex_id, None)
+        if vertex is not None:
+            row = vertex._row
+            vertex._detach()
+            self.store.remove_vertex_row(row)
+        return removed_edges
+
+    def clear(self):
+        """Удаление всех вершин и рёбер"""
+        for edge in self.edge_views():
+            edge._detach()
+        for vertex in self.store.vertex_views:
+            vertex._detach()
+        self.store.clear()
+        self.vertices.clear()
+
+    @property
+    def vertex_styles(self):
+        return self.store.vertex_styles
+
+    @property
+    def edge_styles(self):
+        return self.store.edge_styles
 
     def update_global_vertex_params(self, color=None, border_color=None, border_width=None, 
-                                    text_size=None, text_color=None, shape=None, size=None, is_highlighted=False):
-        """Обновление глобальных параметров для всех вершин"""
-        for vertex in self.vertices.values():
-            if vertex.is_highlighted == is_highlighted:  
-                vertex.update_custom_params(color, border_color, border_width, text_size, text_color, shape, size)
-
-    def update_global_edge_params(self, color=None, text_size=None, style=None, thickness=None, is_highlighted=False):
-        """Обновление глобальных параметров для всех рёбер"""
-        for edge in self.edges:
-            if edge.is_highlighted == is_highlighted:  
-                edge.update_custom_params(color, text_size, style, thickness)
+                                    text_size=None, text_color=None, shape=None, size=None,
+                                    label_lod=None, shape_lod=None, is_highlighted=False):
+        """Обновление глобальных параметров для всех вершин, возвращает id изменённого стиля"""
+        style_id = StyleTable.HIGHLIGHTED if is_highlighted else StyleTable.DEFAULT
+        self.vertex_styles.update(style_id, color=color, border_color=border_color, border_width=border_width,
+                                  text_size=text_size, text_color=text_color, shape=shape, size=size,
+                                  label_lod=label_lod, shape_lod=shape_lod)
+        return style_id
+
+    def update_global_edge_params(self, color=None, text_size=None, style=None, thickness=None,
+                                  text_color=None, label_lod=None, line_lod=None, is_highlighted=False):
+        """Обновление глобальных параметров для всех рёбер, возвращает id изменённого стиля"""
+        style_id = StyleTable.HIGHLIGHTED if is_highlighted else StyleTable.DEFAULT
+        self.edge_styles.update(style_id, color=color, text_size=text_size, style=style,
+                                thickness=thickness, text_color=text_color, label_lod=label_lod, line_lod=line_lod)
+        return style_id
 
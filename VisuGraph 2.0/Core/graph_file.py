@@ -0,0 +1,200 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+from Core.graph import Vertex
+from Core.styles import StyleTable
+
+
+BINARY_EXTENSION = ".vgraph"
+MAGIC = b"VGRAPH01"
+ALIGNMENT = 64  # Выравнивание массивов в двоичном файле, байт
+
+# Имя массива -> тип элементов в двоичном файле (little-endian)
+ARRAY_DTYPES = {
+    "vertex_ids": "<i8",
+    "vertex_positions": "<f8",
+    "vertex_styles": "<i4",
+    "edge_endpoints": "<i8",
+    "edge_weights": "<f8",
+    "edge_styles": "<i4",
+}
+
+
+class GraphData:
+    """Граф в виде массивов: общий вид для JSON и двоичного формата файла.
+
+    edge_endpoints содержит номера строк вершин (не id); vertex_styles и
+    edge_styles - номера наборов параметров в vertex_params и edge_params,
+    где каждый различный набор хранится один раз.
+    """
+
+    def __init__(self, vertex_ids, vertex_positions, vertex_styles, vertex_params,
+                 edge_endpoints, edge_weights, edge_styles, edge_params):
+        self.vertex_ids = vertex_ids
+        self.vertex_positions = vertex_positions
+        self.vertex_styles = vertex_styles
+        self.vertex_params = vertex_params
+        self.edge_endpoints = edge_endpoints
+        self.edge_weights = edge_weights
+        self.edge_styles = edge_styles
+        self.edge_params = edge_params
+
+    def arrays(self):
+        return {name: getattr(self, name) for name in ARRAY_DTYPES}
+
+
+class ParamsTable:
+    """Дедупликация наборов параметров: одинаковые словари получают один номер"""
+
+    def __init__(self):
+        self.params = []
+        self._index = {}
+
+    def index(self, params):
+        key = tuple(sorted(params.items()))
+        if key not in self._index:
+            self._index[key] = len(self.params)
+            self.params.append(dict(params))
+        return self._index[key]
+
+
+def is_binary_graph_file(file_path):
+    return os.path.splitext(file_path)[1].lower() == BINARY_EXTENSION
+
+
+def graph_data(graph):
+    """GraphData по графу; координаты, концы и веса берутся из хранилища без обхода элементов"""
+    store = graph.store
+    vertex_table, edge_table = ParamsTable(), ParamsTable()
+    vertex_styles = [vertex_table.index(vertex.default_params) for vertex in store.vertex_views]
+    default_style = edge_table.index(store.edge_styles[StyleTable.DEFAULT].params)  # Рёбра без объекта Edge
+    edge_styles = [edge_table.index(edge.default_params) if edge is not None else default_style
+                   for edge in store.edge_views]
+    return GraphData(store.ids(), store.positions(), np.array(vertex_styles, dtype=np.int32), vertex_table.params,
+                     store.endpoints(), store.weights(), np.array(edge_styles, dtype=np.int32), edge_table.params)
+
+
+def fill_graph(graph, data):
+    """Добавляет в граф вершины и рёбра из GraphData; возвращает (вершины, рёбра) в порядке строк"""
+    graph.reserve(len(data.vertex_ids), len(data.edge_weights))
+    vertex_style_ids = [graph.vertex_styles.derive(StyleTable.DEFAULT, **params) for params in data.vertex_params]
+    edge_style_ids = [graph.edge_styles.derive(StyleTable.DEFAULT, **params) for params in data.edge_params]
+
+    vertices = []
+    for vertex_id, (x, y), style in zip(data.vertex_ids.tolist(), data.vertex_positions.tolist(),
+                                        data.vertex_styles.tolist()):
+        vertex = Vertex(vertex_id, x=x, y=y)
+        graph.add_vertex(vertex)
+        vertex.style_id = vertex_style_ids[style]
+        vertices.append(vertex)
+
+    edges = []
+    for (start, end), weight, style in zip(data.edge_endpoints.tolist(), data.edge_weights.tolist(),
+                                           data.edge_styles.tolist()):
+        edge = graph.add_edge(vertices[start], vertices[end], weight=weight)
+        edge.style_id = edge_style_ids[style]
+        edges.append(edge)
+    return vertices, edges
+
+
+def save_json(data, file_path):
+    """Сохраняет граф в прежнем JSON-формате: параметры повторяются у каждого элемента"""
+    vertex_ids = data.vertex_ids.tolist()
+    document = {
+        "vertices": [
+            {
+                "id": vertex_id,
+                "params": data.vertex_params[style],
+                "position": {"x": x, "y": y}
+            }
+            for vertex_id, (x, y), style in zip(vertex_ids, data.vertex_positions.tolist(),
+                                                data.vertex_styles.tolist())
+        ],
+        "edges": [
+            {
+                "start": vertex_ids[start],
+                "end": vertex_ids[end],
+                "weight": int(weight) if weight.is_integer() else weight,
+                "params": data.edge_params[style]
+            }
+            for (start, end), weight, style in zip(data.edge_endpoints.tolist(), data.edge_weights.tolist(),
+                                                   data.edge_styles.tolist())
+        ]
+    }
+    with open(file_path, "w", encoding="utf-8") as file:
+        json.dump(document, file, ensure_ascii=False, indent=4)
+
+
+def load_json(file_path):
+    """Читает граф из JSON-формата в GraphData"""
+    with open(file_path, "r", encoding="utf-8") as file:
+        document = json.load(file)
+
+    vertex_table, edge_table = ParamsTable(), ParamsTable()
+    vertices = document.get("vertices", [])
+    rows = {vertex["id"]: row for row, vertex in enumerate(vertices)}
+    edges = document.get("edges", [])
+    return GraphData(
+        np.array([vertex["id"] for vertex in vertices], dtype=np.int64),
+        np.array([(vertex["position"]["x"], vertex["position"]["y"]) for vertex in vertices],
+                 dtype=np.float64).reshape(-1, 2),
+        np.array([vertex_table.index(vertex["params"]) for vertex in vertices], dtype=np.int32),
+        vertex_table.params,
+        np.array([(rows[edge["start"]], rows[edge["end"]]) for edge in edges], dtype=np.int64).reshape(-1, 2),
+        np.array([edge["weight"] for edge in edges], dtype=np.float64),
+        np.array([edge_table.index(edge["params"]) for edge in edges], dtype=np.int32),
+        edge_table.params,
+    )
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def save_binary(data, file_path):
+    """Сохраняет граф в двоичном формате.
+
+    Файл: MAGIC, длина заголовка (uint64), JSON-заголовок с таблицами
+    стилей и описанием массивов, затем сами массивы, выровненные по
+    ALIGNMENT байт - их можно отобразить в память без разбора.
+    """
+    arrays = {name: np.ascontiguousarray(array, dtype=ARRAY_DTYPES[name]) for name, array in data.arrays().items()}
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        layout[name] = {"dtype": ARRAY_DTYPES[name], "shape": list(array.shape), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps({"arrays": layout, "vertex_params": data.vertex_params, "edge_params": data.edge_params},
+                        ensure_ascii=False).encode("utf-8")
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+
+    with open(file_path, "wb") as file:
+        file.write(MAGIC)
+        file.write(struct.pack("<Q", len(header)))
+        file.write(header)
+        for name, array in arrays.items():
+            file.seek(data_start + layout[name]["offset"])
+            array.tofile(file)
+        file.truncate(data_start + offset)
+
+
+def load_binary(file_path):
+    """Читает граф из двоичного формата; массивы отображаются в память только для чтения"""
+    with open(file_path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Файл не является двоичным графом VisuGraph.")
+        header_size, = struct.unpack("<Q", file.read(8))
+        header = json.loads(file.read(header_size).decode("utf-8"))
+    data_start = _aligned(len(MAGIC) + 8 + header_size)
+
+    arrays = {}
+    for name, info in header["arrays"].items():
+        shape = tuple(info["shape"])
+        if np.prod(shape) == 0:
+            arrays[name] = np.empty(shape, dtype=info["dtype"])  # Пустой участок файла отобразить нельзя
+        else:
+            arrays[name] = np.memmap(file_path, dtype=info["dtype"], mode="r",
+                                     offset=data_start + info["offset"], shape=shape)
+    return GraphData(vertex_params=header["vertex_params"], edge_params=header["edge_params"], **arrays)
@@ -0,0 +1,235 @@
+import json
+import os
+import shutil
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from Core.graph_file import BINARY_EXTENSION, graph_data, load_binary, save_binary
+
+
+JOURNAL_DIR = os.path.join(os.path.expanduser("~"), ".visugraph", "sessions")
+COMPACT_EVERY = 1000  # Записей журнала между снимками графа
+
+# Операция -> обратная ей; у пар add/remove одинаковые поля, у move и reweight меняются местами from и to
+INVERSE_OPERATIONS = {
+    "add_vertex": "remove_vertex",
+    "remove_vertex": "add_vertex",
+    "add_edge": "remove_edge",
+    "remove_edge": "add_edge",
+    "move_vertex": "move_vertex",
+    "reweight_edge": "reweight_edge",
+}
+
+
+def inverse_operation(operation):
+    """Операция, отменяющая operation"""
+    inverse = dict(operation, op=INVERSE_OPERATIONS[operation["op"]])
+    if "from" in operation:
+        inverse["from"], inverse["to"] = operation["to"], operation["from"]
+    return inverse
+
+
+def _lock(file):
+    """Блокирует открытый файл без ожидания; False, если он заблокирован другим процессом.
+
+    Блокировку снимает система при завершении процесса, в том числе аварийном.
+    """
+    try:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _owned(lock_file):
+    """Записал ли владелец в заблокированный им файл lock свой pid.
+
+    Каталог с пустым lock только создаётся: его владелец ещё не успел
+    взять блокировку, поэтому он не считается брошенным.
+    """
+    return os.path.getsize(lock_file.name) > 0
+
+
+def _session_paths(session_dir):
+    """Пути журнала, снимка и отметки о сохранении в каталоге сеанса"""
+    return (os.path.join(session_dir, "journal.ndjson"), os.path.join(session_dir, "snapshot" + BINARY_EXTENSION),
+            os.path.join(session_dir, "saved"))
+
+
+def _remove_session(session_dir, lock_file):
+    lock_file.close()
+    shutil.rmtree(session_dir, ignore_errors=True)
+
+
+class EditJournal:
+    """Журнал правок графа, в который записи только дописываются.
+
+    Каждая правка холста - одна строка JSON (операции см. в
+    INVERSE_OPERATIONS), поэтому автосохранение стоит столько же, сколько
+    сама правка. Раз в compact_every записей граф сохраняется снимком в
+    двоичном формате, а журнал очищается. При запуске состояние
+    восстанавливается из снимка и записей после него. Отмена и повтор
+    дописывают в журнал обратную или исходную операцию, так что повторное
+    применение журнала всегда даёт текущий граф.
+
+    Каждое окно пишет в свой каталог сеанса внутри directory и держит в
+    нём заблокированный файл lock, в который после блокировки записан pid
+    владельца. Каталог, блокировку которого удаётся взять и в lock которого
+    есть pid, остался от завершившегося запуска; работа в нём не сохранена,
+    если там нет отметки saved (граф сохранён или загружен из файла и с
+    тех пор не менялся) и есть непустой снимок или записи. Снимок пустого
+    графа не пишется. При штатном закрытии (close) каталог удаляется.
+    """
+
+    def __init__(self, directory=JOURNAL_DIR, compact_every=COMPACT_EVERY):
+        self.directory = directory
+        self.session_dir = os.path.join(directory, uuid.uuid4().hex)
+        os.makedirs(self.session_dir)
+        self._lock_file = open(os.path.join(self.session_dir, "lock"), "a")
+        if not _lock(self._lock_file):
+            self._lock_file.close()
+            raise OSError(f"Журнал правок: не удалось заблокировать каталог сеанса {self.session_dir}")
+        self._lock_file.write(str(os.getpid()))
+        self._lock_file.flush()  # Только теперь другие окна могут счесть каталог брошенным
+        self.journal_path, self.snapshot_path, self.saved_path = _session_paths(self.session_dir)
+        self.compact_every = compact_every
+        self.records = 0  # Записей после последнего снимка
+        self.undo_stack = []
+        self.redo_stack = []
+        self.saved = False  # Есть ли отметка saved
+        self.orphan = None  # (каталог, заблокированный файл lock) сеанса, найденного has_unsaved_work
+        self._file = None
+
+    def has_unsaved_work(self):
+        """Ищет сеанс завершившегося запуска с несохранённой работой.
+
+        Сохранённые и пустые сеансы по пути удаляются; сеансы других
+        открытых окон (их lock заблокирован или ещё пуст) не трогаются.
+        """
+        for name in sorted(os.listdir(self.directory)):
+            session_dir = os.path.join(self.directory, name)
+            if session_dir == self.session_dir or not os.path.isdir(session_dir):
+                continue
+            lock_file = open(os.path.join(session_dir, "lock"), "a")
+            if not _lock(lock_file) or not _owned(lock_file):
+                lock_file.close()
+                continue
+            journal_path, snapshot_path, saved_path = _session_paths(session_dir)
+            if not os.path.exists(saved_path) and (os.path.exists(snapshot_path) or (
+                    os.path.exists(journal_path) and os.path.getsize(journal_path) > 0)):
+                self.orphan = (session_dir, lock_file)
+                return True
+            _remove_session(session_dir, lock_file)
+        return False
+
+    def recover(self):
+        """Снимок (GraphData или None) и операции, записанные после него, из сеанса, найденного has_unsaved_work.
+
+        Последняя строка может быть оборвана при аварийном завершении - такие строки пропускаются.
+        """
+        journal_path, snapshot_path, _ = _session_paths(self.orphan[0])
+        data = load_binary(snapshot_path) if os.path.exists(snapshot_path) else None
+        operations = []
+        if os.path.exists(journal_path):
+            with open(journal_path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        operations.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        print("Журнал правок: пропущена повреждённая запись")
+        return data, operations
+
+    def discard_orphan(self):
+        """Удаляет сеанс, найденный has_unsaved_work: он восстановлен или от него отказались"""
+        if self.orphan is not None:
+            _remove_session(*self.orphan)
+            self.orphan = None
+
+    def mark_saved(self):
+        """Отмечает, что граф сохранён в файл: до следующей правки восстанавливать нечего"""
+        open(self.saved_path, "w").close()
+        self.saved = True
+
+    def _mark_unsaved(self):
+        if self.saved:
+            if os.path.exists(self.saved_path):
+                os.remove(self.saved_path)
+            self.saved = False
+
+    def record(self, operation):
+        """Записывает новую правку; история повтора при этом сбрасывается"""
+        self._append(operation)
+        self.undo_stack.append(operation)
+        self.redo_stack.clear()
+
+    def undo(self):
+        """Операция, которую нужно применить для отмены последней правки, или None"""
+        if not self.undo_stack:
+            return None
+        operation = self.undo_stack.pop()
+        self.redo_stack.append(operation)
+        inverse = inverse_operation(operation)
+        self._append(inverse)
+        return inverse
+
+    def redo(self):
+        """Операция, которую нужно применить для повтора отменённой правки, или None"""
+        if not self.redo_stack:
+            return None
+        operation = self.redo_stack.pop()
+        self.undo_stack.append(operation)
+        self._append(operation)
+        return operation
+
+    def needs_compaction(self):
+        return self.records >= self.compact_every
+
+    def compact(self, graph, clear_history=False):
+        """Сохраняет снимок графа и очищает журнал.
+
+        clear_history=True сбрасывает отмену и повтор - после загрузки
+        или очистки графа старые правки к нему не относятся, а сам граф
+        считается несохранённым, пока не вызван mark_saved.
+        """
+        if clear_history:
+            self._mark_unsaved()
+        if graph.vertices:
+            temporary_path = self.snapshot_path + ".tmp"
+            save_binary(graph_data(graph), temporary_path)
+            os.replace(temporary_path, self.snapshot_path)  # Снимок заменяется целиком или не заменяется вовсе
+        elif os.path.exists(self.snapshot_path):
+            os.remove(self.snapshot_path)  # Пустой граф - это отсутствие снимка
+        self._close_file()
+        open(self.journal_path, "w", encoding="utf-8").close()
+        self.records = 0
+        if clear_history:
+            self.undo_stack.clear()
+            self.redo_stack.clear()
+
+    def _append(self, operation):
+        self._mark_unsaved()
+        if self._file is None:
+            self._file = open(self.journal_path, "a", encoding="utf-8")
+        self._file.write(json.dumps(operation, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()  # Запись переживает аварийное завершение программы
+        self.records += 1
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        """Штатное завершение: каталог сеанса со снимком и журналом удаляется"""
+        self._close_file()
+        self.discard_orphan()
+        _remove_session(self.session_dir, self._lock_file)
@@ -0,0 +1,81 @@
+from PyQt5.QtCore import QRectF, Qt, QTimer
+from PyQt5.QtGui import QColor, QPainter, QPen, QPixmap
+from PyQt5.QtWidgets import QWidget
+
+
+class MiniMap(QWidget):
+    """Обзорная карта сцены в углу холста.
+
+    Сцена рисуется в маленький QPixmap не чаще раза в REFRESH_DELAY мс
+    после изменений; при прокрутке и масштабировании перерисовывается
+    только рамка видимой области поверх готового изображения. Щелчок по
+    карте переносит холст в выбранную точку.
+    """
+
+    WIDTH = 200
+    HEIGHT = 150
+    MARGIN = 10  # Отступ от края холста
+    REFRESH_DELAY = 1000  # Не чаще раза в секунду: отрисовка большой сцены дорога
+
+    def __init__(self, canvas):
+        super().__init__(canvas)
+        self.canvas = canvas
+        self.pixmap = QPixmap(self.WIDTH, self.HEIGHT)
+        self.source = QRectF()  # Область сцены, изображённая на карте
+        self.target = QRectF()  # Где она лежит внутри карты (с сохранением пропорций)
+        self.setFixedSize(self.WIDTH, self.HEIGHT)
+        self.setCursor(Qt.PointingHandCursor)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.timeout.connect(self.refresh)
+        canvas.scene.changed.connect(self.schedule_refresh)
+        canvas.horizontalScrollBar().valueChanged.connect(self.update)
+        canvas.verticalScrollBar().valueChanged.connect(self.update)
+        self.refresh()
+
+    def schedule_refresh(self, *args):
+        if not self.refresh_timer.isActive():
+            self.refresh_timer.start(self.REFRESH_DELAY)
+
+    def refresh(self):
+        """Заново рисует сцену в уменьшенное изображение"""
+        self.pixmap.fill(QColor(255, 255, 255, 200))
+        self.source = self.canvas.scene.itemsBoundingRect()
+        if not self.source.isEmpty():
+            scale = min(self.WIDTH / self.source.width(), self.HEIGHT / self.source.height())
+            width, height = self.source.width() * scale, self.source.height() * scale
+            self.target = QRectF((self.WIDTH - width) / 2, (self.HEIGHT - height) / 2, width, height)
+            painter = QPainter(self.pixmap)
+            self.canvas.scene.render(painter, self.target, self.source)
+            painter.end()
+        self.update()
+
+    def scene_to_map(self, rect):
+        scale = self.target.width() / self.source.width()
+        return QRectF(self.target.left() + (rect.left() - self.source.left()) * scale,
+                      self.target.top() + (rect.top() - self.source.top()) * scale,
+                      rect.width() * scale, rect.height() * scale)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self.pixmap)
+        painter.setPen(QPen(Qt.darkGray))
+        painter.drawRect(0, 0, self.WIDTH - 1, self.HEIGHT - 1)
+        if not self.source.isEmpty():
+            painter.setPen(QPen(Qt.red, 1))
+            painter.drawRect(self.scene_to_map(self.canvas.visible_scene_rect()))
+
+    def mousePressEvent(self, event):
+        if self.source.isEmpty() or not self.target.contains(event.pos()):
+            return
+        scale = self.source.width() / self.target.width()
+        self.canvas.centerOn(self.source.left() + (event.pos().x() - self.target.left()) * scale,
+                             self.source.top() + (event.pos().y() - self.target.top()) * scale)
+
+    mouseMoveEvent = mousePressEvent
+
+    def reposition(self):
+        """Прижимает карту к правому нижнему углу холста"""
+        viewport = self.canvas.viewport().geometry()
+        self.move(viewport.right() - self.WIDTH - self.MARGIN, viewport.bottom() - self.HEIGHT - self.MARGIN)
@@ -0,0 +1,384 @@
+import numpy as np
+
+from Core.styles import StyleTable
+
+EMPTY, DELETED = -1, -2  # Свободная и освобождённая ячейка таблицы пар
+UNLINKED = -2  # Вторая половина петли не входит ни в один список
+GOLDEN = 0x9E3779B97F4A7C15  # Множитель фибоначчиева хеширования
+
+
+def pair_keys(start_rows, end_rows):
+    """Ключи неориентированных пар строк вершин (int64): меньшая строка в старших 32 битах"""
+    lower, upper = np.minimum(start_rows, end_rows), np.maximum(start_rows, end_rows)
+    return (lower.astype(np.int64) << 32) | upper.astype(np.int64)
+
+
+class GraphStore:
+    """Колоночное хранилище графа: id, координаты, концы и веса рёбер в типизированных массивах.
+
+    Вершины и рёбра занимают плотные строки 0..count-1; при удалении на место
+    удалённой строки переносится последняя, поэтому срезы массивов можно
+    напрямую отдавать алгоритмам без копирования.
+
+    Ребро по паре вершин находится по хеш-таблице с открытой адресацией на
+    массивах, рёбра вершины - по её списку полурёбер (полуребро 2 * строка +
+    сторона, следующее - в half_next). Объекты Edge создаются только по
+    запросу (Graph.edge): в edge_views у остальных строк None, поэтому
+    рёбра, добавленные append_edges, занимают лишь строки массивов.
+    """
+
+    MAX_LOAD = 0.5  # Наибольшая доля занятых ячеек таблицы пар
+
+    def __init__(self, capacity=16):
+        self.vertex_count = 0
+        self.edge_count = 0
+        self.vertex_ids = np.empty(capacity, dtype=np.int64)
+        self.vertex_positions = np.empty((capacity, 2), dtype=np.float64)
+        self.vertex_heads = np.empty(capacity, dtype=np.int64)  # Первое полуребро списка вершины, -1 - нет рёбер
+        self.edge_endpoints = np.empty((capacity, 2), dtype=np.int64)  # Строки вершин-концов
+        self.edge_weights = np.empty(capacity, dtype=np.float64)
+        self.half_next = np.empty(2 * capacity, dtype=np.int64)  # Следующее полуребро той же вершины, -1 - конец
+        self.vertex_views = []  # Строка -> объект Vertex
+        self.edge_views = []  # Строка -> объект Edge или None, если он ещё не создан
+        self.vertex_styles = StyleTable.for_vertices()  # Общие стили, на которые ссылаются вершины
+        self.edge_styles = StyleTable.for_edges()  # Общие стили, на которые ссылаются рёбра
+        self.edge_listeners = []  # Вызываются как listener(удалённая строка, перенесённая на неё строка или None)
+        self.version = 0  # Увеличивается при любом структурном изменении
+        self._reset_table(capacity)
+        self._csr = None
+        self._csr_version = -1
+
+    @staticmethod
+    def _grown(array, needed):
+        """Возвращает массив с ёмкостью не меньше needed (удвоение)"""
+        if needed <= len(array):
+            return array
+        capacity = max(needed, 2 * len(array))
+        grown = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def reserve(self, vertices=0, edges=0):
+        """Заранее выделяет место под указанное число вершин и рёбер"""
+        self.vertex_ids = self._grown(self.vertex_ids, vertices)
+        self.vertex_positions = self._grown(self.vertex_positions, vertices)
+        self.vertex_heads = self._grown(self.vertex_heads, vertices)
+        self.edge_endpoints = self._grown(self.edge_endpoints, edges)
+        self.edge_weights = self._grown(self.edge_weights, edges)
+        self.half_next = self._grown(self.half_next, 2 * edges)
+
+    # Таблица пар: ключ пары строк вершин -> строка ребра
+
+    def _reset_table(self, size):
+        capacity = 16
+        while capacity * self.MAX_LOAD < size:
+            capacity *= 2
+        self._table_keys = np.full(capacity, EMPTY, dtype=np.int64)
+        self._table_rows = np.empty(capacity, dtype=np.int64)
+        self._table_bits = capacity.bit_length() - 1
+        self._table_used = 0  # Занятые и освобождённые ячейки
+
+    def _hashes(self, keys):
+        return ((keys.astype(np.uint64) * np.uint64(GOLDEN)) >> np.uint64(64 - self._table_bits)).astype(np.int64)
+
+    def _hash(self, key):
+        return ((key * GOLDEN) & 0xFFFFFFFFFFFFFFFF) >> (64 - self._table_bits)
+
+    def _reserve_table(self, added):
+        """Перестраивает таблицу, если после added вставок она заполнится больше MAX_LOAD"""
+        if (self._table_used + added) <= len(self._table_keys) * self.MAX_LOAD:
+            return
+        rows = np.arange(self.edge_count)
+        self._reset_table(2 * (self.edge_count + added))
+        self._insert_keys(self.edge_keys(rows), rows)
+
+    def _insert_keys(self, keys, rows):
+        """Вставляет ключи, которых ещё нет в таблице; место уже зарезервировано"""
+        table_keys, table_rows = self._table_keys, self._table_rows
+        mask = len(table_keys) - 1
+        slots = self._hashes(keys)
+        pending = np.arange(len(keys))
+        while len(pending):
+            candidate = slots[pending]
+            free = table_keys[candidate] < 0
+            # Из претендентов на одну свободную ячейку её занимает первый, остальные идут дальше
+            free_slots, first = np.unique(candidate[free], return_index=True)
+            winners = pending[free][first]
+            self._table_used += int(np.count_nonzero(table_keys[free_slots] == EMPTY))
+            table_keys[free_slots] = keys[winners]
+            table_rows[free_slots] = rows[winners]
+            placed = np.zeros(len(keys), dtype=bool)
+            placed[winners] = True
+            pending = pending[~placed[pending]]
+            slots[pending] = (slots[pending] + 1) & mask
+
+    def _find_slot(self, key):
+        """Ячейка таблицы с ключом key или None"""
+        table_keys = self._table_keys
+        mask = len(table_keys) - 1
+        slot = self._hash(key)
+        while True:
+            current = table_keys[slot]
+            if current == key:
+                return slot
+            if current == EMPTY:
+                return None
+            slot = (slot + 1) & mask
+
+    def _insert_key(self, key, row):
+        """Вставляет один новый ключ; место резервирует вызывающий код (_reserve_table)"""
+        table_keys = self._table_keys
+        mask = len(table_keys) - 1
+        slot = self._hash(key)
+        while table_keys[slot] >= 0:
+            slot = (slot + 1) & mask
+        if table_keys[slot] == EMPTY:
+            self._table_used += 1
+        table_keys[slot] = key
+        self._table_rows[slot] = row
+
+    def _delete_key(self, key):
+        self._table_keys[self._find_slot(key)] = DELETED
+
+    def edge_keys(self, rows):
+        """Ключи пар вершин рёбер в строках rows"""
+        endpoints = self.edge_endpoints[rows]
+        return pair_keys(endpoints[:, 0], endpoints[:, 1])
+
+    def find_edge(self, start_row, end_row):
+        """Строка ребра между двумя строками вершин или -1"""
+        lower, upper = sorted((int(start_row), int(end_row)))
+        slot = self._find_slot((lower << 32) | upper)
+        return -1 if slot is None else int(self._table_rows[slot])
+
+    def find_edges(self, keys):
+        """Строки рёбер для массива ключей пар (-1 - ребра нет)"""
+        table_keys, table_rows = self._table_keys, self._table_rows
+        mask = len(table_keys) - 1
+        found = np.full(len(keys), -1, dtype=np.int64)
+        slots = self._hashes(keys)
+        pending = np.arange(len(keys))
+        while len(pending):
+            current = table_keys[slots[pending]]
+            hit = current == keys[pending]
+            found[pending[hit]] = table_rows[slots[pending[hit]]]
+            pending = pending[~hit & (current != EMPTY)]
+            slots[pending] = (slots[pending] + 1) & mask
+        return found
+
+    # Списки полурёбер вершин
+
+    def incident_rows(self, vertex_row):
+        """Строки рёбер вершины (петля - один раз)"""
+        rows = []
+        half, half_next = int(self.vertex_heads[vertex_row]), self.half_next
+        while half >= 0:
+            rows.append(half >> 1)
+            half = int(half_next[half])
+        return rows
+
+    def _link(self, rows):
+        """Добавляет полурёбра строк rows в начало списков их вершин"""
+        ends = self.edge_endpoints[rows]
+        loops = ends[:, 0] == ends[:, 1]
+        self.half_next[2 * rows[loops] + 1] = UNLINKED
+        halves = np.concatenate((2 * rows, 2 * rows[~loops] + 1))
+        owners = np.concatenate((ends[:, 0], ends[~loops, 1]))
+        order = np.argsort(owners, kind="stable")
+        halves, owners = halves[order], owners[order]
+        # Полурёбра одной вершины образуют цепочку, последнее ссылается на прежнее начало списка
+        last = np.ones(len(owners), dtype=bool)
+        last[:-1] = owners[1:] != owners[:-1]
+        following = np.empty_like(halves)
+        following[:-1] = halves[1:]
+        following[last] = self.vertex_heads[owners[last]]
+        self.half_next[halves] = following
+        first = np.ones(len(owners), dtype=bool)
+        first[1:] = last[:-1]
+        self.vertex_heads[owners[first]] = halves[first]
+
+    def _relink(self, half, replacement):
+        """Заменяет в списке вершины полуребро half на replacement (None - исключает его)"""
+        owner = int(self.edge_endpoints[half >> 1, half & 1])
+        following = int(self.half_next[half])
+        target = following if replacement is None else replacement
+        current = int(self.vertex_heads[owner])
+        if current == half:
+            self.vertex_heads[owner] = target
+        else:
+            while int(self.half_next[current]) != half:
+                current = int(self.half_next[current])
+            self.half_next[current] = target
+        if replacement is not None:
+            self.half_next[replacement] = following
+
+    def _linked_halves(self, row):
+        return [half for half in (2 * row, 2 * row + 1) if self.half_next[half] != UNLINKED]
+
+    # Вершины
+
+    def append_vertex(self, view, vertex_id, x, y):
+        """Добавляет строку вершины, возвращает её номер"""
+        row = self.vertex_count
+        self.reserve(vertices=row + 1)
+        self.vertex_ids[row] = vertex_id
+        self.vertex_positions[row] = (x, y)
+        self.vertex_heads[row] = -1
+        self.vertex_views.append(view)
+        self.vertex_count += 1
+        self.version += 1
+        return row
+
+    def replace_vertex_view(self, row, view, x, y):
+        """Передаёт строку вершины новому объекту Vertex с тем же id"""
+        self.vertex_positions[row] = (x, y)
+        self.vertex_views[row] = view
+
+    def remove_vertex_row(self, row):
+        """Удаляет строку вершины без рёбер; возвращает перенесённый на её место объект или None.
+
+        Концы рёбер перенесённой вершины и их ключи в таблице пар
+        исправляются здесь же.
+        """
+        if self.vertex_heads[row] >= 0:
+            raise ValueError("Сначала нужно удалить рёбра вершины.")
+        last = self.vertex_count - 1
+        moved = None
+        if row != last:
+            self.vertex_ids[row] = self.vertex_ids[last]
+            self.vertex_positions[row] = self.vertex_positions[last]
+            self.vertex_heads[row] = self.vertex_heads[last]
+            moved = self.vertex_views[last]
+            self.vertex_views[row] = moved
+            moved._row = row
+            edge_rows = self.incident_rows(row)
+            self._reserve_table(len(edge_rows))
+            for edge_row in edge_rows:
+                self._delete_key(int(self.edge_keys([edge_row])[0]))
+                endpoints = self.edge_endpoints[edge_row]
+                endpoints[endpoints == last] = row
+                self._insert_key(int(self.edge_keys([edge_row])[0]), edge_row)
+        self.vertex_views.pop()
+        self.vertex_count -= 1
+        self.version += 1
+        return moved
+
+    # Рёбра
+
+    def append_edge(self, view, start_row, end_row, weight):
+        """Добавляет строку ребра, возвращает её номер"""
+        row = self.edge_count
+        self.reserve(edges=row + 1)
+        self.edge_endpoints[row] = (start_row, end_row)
+        self.edge_weights[row] = weight
+        self.edge_views.append(view)
+        self.half_next[2 * row] = self.vertex_heads[start_row]
+        self.vertex_heads[start_row] = 2 * row
+        if start_row == end_row:
+            self.half_next[2 * row + 1] = UNLINKED
+        else:
+            self.half_next[2 * row + 1] = self.vertex_heads[end_row]
+            self.vertex_heads[end_row] = 2 * row + 1
+        self._reserve_table(1)
+        lower, upper = sorted((int(start_row), int(end_row)))
+        self._insert_key((lower << 32) | upper, row)
+        self.edge_count += 1
+        self.version += 1
+        return row
+
+    def append_edges(self, start_rows, end_rows, weights):
+        """Добавляет рёбра массивами за один шаг; возвращает номер первой строки.
+
+        Пары вершин должны быть новыми и различными. Объекты Edge для этих
+        строк не создаются.
+        """
+        first, count = self.edge_count, len(start_rows)
+        if not count:
+            return first
+        self.reserve(edges=first + count)
+        rows = np.arange(first, first + count)
+        self.edge_endpoints[rows, 0] = start_rows
+        self.edge_endpoints[rows, 1] = end_rows
+        self.edge_weights[rows] = weights
+        self.edge_views.extend([None] * count)
+        self._link(rows)
+        self._reserve_table(count)
+        self._insert_keys(pair_keys(np.asarray(start_rows), np.asarray(end_rows)), rows)
+        self.edge_count += count
+        self.version += 1
+        return first
+
+    def remove_edge_row(self, row):
+        """Удаляет строку ребра; возвращает перенесённый на её место объект или None"""
+        for half in self._linked_halves(row):
+            self._relink(half, None)
+        self._delete_key(int(self.edge_keys([row])[0]))
+        last = self.edge_count - 1
+        moved = None
+        if row != last:
+            self.edge_endpoints[row] = self.edge_endpoints[last]
+            self.edge_weights[row] = self.edge_weights[last]
+            self.half_next[2 * row + 1] = UNLINKED
+            for half in self._linked_halves(last):
+                self._relink(half, 2 * row + (half & 1))
+            self._table_rows[self._find_slot(int(self.edge_keys([row])[0]))] = row
+            moved = self.edge_views[last]
+            self.edge_views[row] = moved
+            if moved is not None:
+                moved._row = row
+        self.edge_views.pop()
+        self.edge_count -= 1
+        self.version += 1
+        for listener in self.edge_listeners:
+            listener(row, last if row != last else None)
+        return moved
+
+    def clear(self):
+        """Удаляет все строки, сохраняя выделенную память"""
+        self.vertex_count = 0
+        self.edge_count = 0
+        self.vertex_views = []
+        self.edge_views = []
+        self._reset_table(0)
+        self.version += 1
+
+    def ids(self):
+        """id вершин по строкам (без копирования)"""
+        return self.vertex_ids[:self.vertex_count]
+
+    def positions(self):
+        """Координаты вершин по строкам, массив (n, 2) без копирования"""
+        return self.vertex_positions[:self.vertex_count]
+
+    def endpoints(self):
+        """Строки концов рёбер, массив (m, 2) без копирования"""
+        return self.edge_endpoints[:self.edge_count]
+
+    def weights(self):
+        """Веса рёбер по строкам (без копирования)"""
+        return self.edge_weights[:self.edge_count]
+
+    def csr(self):
+        """Неориентированная смежность в формате CSR: (indptr, indices, edge_rows).
+
+        Соседи вершины в строке v - indices[indptr[v]:indptr[v + 1]], а
+        edge_rows - строки соответствующих рёбер (для весов и объектов Edge).
+        Строится по требованию и кэшируется до следующего структурного изменения.
+        """
+        if self._csr is not None and self._csr_version == self.version:
+            return self._csr
+
+        ends = self.endpoints()
+        edge_rows = np.arange(self.edge_count)
+        reverse = ends[:, 0] != ends[:, 1]  # Петли учитываются один раз
+        sources = np.concatenate((ends[:, 0], ends[reverse, 1]))
+        targets = np.concatenate((ends[:, 1], ends[reverse, 0]))
+        rows = np.concatenate((edge_rows, edge_rows[reverse]))
+
+        order = np.argsort(sources, kind="stable")
+        indptr = np.zeros(self.vertex_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=self.vertex_count), out=indptr[1:])
+
+        self._csr = (indptr, targets[order], rows[order])
+        self._csr_version = self.version
+        return self._csr
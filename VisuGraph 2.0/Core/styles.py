@@ -0,0 +1,166 @@
+from types import MappingProxyType
+
+# Пороги детализации (label_lod, shape_lod, line_lod) - масштаб отображения,
+# ниже которого подпись скрывается, вершина рисуется точкой, а ребро -
+# тонкой линией. Задаются для каждого стиля, как и остальные параметры.
+
+VERTEX_DEFAULT_PARAMS = {
+    "color": "white",
+    "border_color": "blue",
+    "border_width": 10,
+    "text_size": 20,
+    "text_color": "green",
+    "shape": "circle",
+    "size": 20,
+    "label_lod": 0.6,
+    "shape_lod": 0.25
+}
+
+VERTEX_HIGHLIGHTED_PARAMS = {
+    "color": "#7FFFD4",
+    "border_color": "black",
+    "border_width": 3,
+    "text_size": 14,
+    "text_color": "white",
+    "shape": "circle",
+    "size": 25,
+    "label_lod": 0.6,
+    "shape_lod": 0.25
+}
+
+EDGE_DEFAULT_PARAMS = {
+    "color": "#DB7093",
+    "text_size": 10,
+    "text_color": "green",
+    "style": "solid",
+    "thickness": 2,
+    "label_lod": 0.9,
+    "line_lod": 0.4
+}
+
+EDGE_HIGHLIGHTED_PARAMS = {
+    "color": "red",
+    "text_size": 12,
+    "text_color": "green",
+    "style": "dashed",
+    "thickness": 3,
+    "label_lod": 0.9,
+    "line_lod": 0.4
+}
+
+
+class Style:
+    """Общий набор параметров отрисовки, на который элементы ссылаются по id.
+
+    У стиля, полученного StyleTable.derive, base - id исходного стиля, а
+    overrides - параметры, которые в нём заменены; остальные параметры
+    берутся из base и меняются вместе с ним.
+    """
+
+    __slots__ = ("id", "name", "_params", "params", "qt_cache", "base", "overrides")
+
+    def __init__(self, style_id, name, params, base=None, overrides=None):
+        self.id = style_id
+        self.name = name
+        self._params = dict(params)
+        self.params = MappingProxyType(self._params)  # Только для чтения: стиль разделяется элементами
+        self.qt_cache = {}  # Готовые QColor/QPen/QBrush, заполняет холст
+        self.base = base  # id исходного стиля или None
+        self.overrides = overrides or {}  # Параметры, заменённые относительно base
+
+
+class StyleTable:
+    """Таблица стилей одного вида элементов (вершин или рёбер).
+
+    Стили с id DEFAULT и HIGHLIGHTED есть в каждой таблице; остальные -
+    пользовательские классы, именованные или полученные из
+    update_custom_params. Полученный стиль помнит исходный и заменённые
+    параметры, поэтому изменение исходного стиля (update) доходит и до
+    него, кроме заменённых параметров; одинаковые замены одного стиля
+    хранятся один раз. В переопределениях параметров None означает "не
+    менять"; ноль и пустая строка - обычные значения (например, порог
+    детализации 0 - рисовать всегда).
+    """
+
+    DEFAULT = 0
+    HIGHLIGHTED = 1
+
+    def __init__(self, default_params, highlighted_params):
+        self.styles = []  # id -> Style
+        self.names = {}  # Имя -> id
+        self._derived = {}  # (id исходного стиля, заменённые параметры) -> id
+        self.add("default", default_params)
+        self.add("highlighted", highlighted_params)
+
+    @classmethod
+    def for_vertices(cls):
+        return cls(VERTEX_DEFAULT_PARAMS, VERTEX_HIGHLIGHTED_PARAMS)
+
+    @classmethod
+    def for_edges(cls):
+        return cls(EDGE_DEFAULT_PARAMS, EDGE_HIGHLIGHTED_PARAMS)
+
+    def __getitem__(self, style_id):
+        return self.styles[style_id]
+
+    def add(self, name, params, base=None, overrides=None):
+        """Регистрирует новый стиль и возвращает его id"""
+        if name is not None and name in self.names:
+            raise ValueError(f"Стиль '{name}' уже существует.")
+        style = Style(len(self.styles), name, params, base, overrides)
+        self.styles.append(style)
+        if name is not None:
+            self.names[name] = style.id
+        return style.id
+
+    def add_class(self, name, base_id=DEFAULT, **overrides):
+        """Регистрирует именованный пользовательский класс на основе стиля base_id"""
+        params = dict(self.styles[base_id].params)
+        params.update((param, value) for param, value in overrides.items() if value is not None)
+        return self.add(name, params)
+
+    def id_of(self, name):
+        """id стиля по имени"""
+        return self.names[name]
+
+    def derive(self, style_id, **overrides):
+        """id стиля, равного style_id с заменёнными параметрами (существующий или новый).
+
+        Замены накапливаются относительно исходного стиля; параметры, равные
+        его значениям, не запоминаются, поэтому без настоящих замен
+        возвращается сам исходный стиль.
+        """
+        style = self.styles[style_id]
+        base_id = style_id if style.base is None else style.base
+        base = self.styles[base_id]
+        changed = dict(style.overrides)
+        changed.update((param, value) for param, value in overrides.items() if value is not None)
+        changed = {param: value for param, value in changed.items() if base.params.get(param) != value}
+        if not changed:
+            return base_id
+        key = (base_id, tuple(sorted(changed.items())))
+        derived_id = self._derived.get(key)
+        if derived_id is None:
+            derived_id = self._derived[key] = self.add(None, {**base.params, **changed}, base_id, changed)
+        return derived_id
+
+    def dependents(self, style_id):
+        """id стилей, полученных из style_id через derive"""
+        return [style.id for style in self.styles if style.base == style_id]
+
+    def update(self, style_id, **overrides):
+        """Изменяет общий стиль на месте: все ссылающиеся элементы и полученные из него стили видят новые параметры"""
+        style = self.styles[style_id]
+        changed = {param: value for param, value in overrides.items() if value is not None}
+        if style.base is not None:
+            del self._derived[(style.base, tuple(sorted(style.overrides.items())))]
+            style.overrides.update(changed)
+            self._derived.setdefault((style.base, tuple(sorted(style.overrides.items()))), style_id)
+        style._params.update(changed)
+        style.qt_cache.clear()
+        for derived_id in self.dependents(style_id):
+            derived = self.styles[derived_id]
+            derived._params.update(style._params)
+            derived._params.update(derived.overrides)
+            derived.qt_cache.clear()
+        return style
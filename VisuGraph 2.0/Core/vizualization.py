@@ -1,40 +1,154 @@
+import math
+
 from PyQt5 import QtCore, QtGui, QtWidgets
-from PyQt5.QtCore import Qt, QPointF
+from PyQt5.QtCore import Qt, QPointF, QTimer, pyqtSignal
 from PyQt5.QtGui import QColor, QPen, QBrush, QTransform
-from PyQt5.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsEllipseItem, QGraphicsTextItem, QGraphicsLineItem
-from Core.graph import Graph, Vertex, Edge
+from PyQt5.QtWidgets import (QGraphicsView, QGraphicsScene, QGraphicsEllipseItem, QGraphicsLineItem,
+                             QGraphicsSimpleTextItem, QStyleOptionGraphicsItem)
+from Core.edge_batch import EdgeBatch, EdgeBatches
+from Core.graph import Graph, Vertex
+from Core.minimap import MiniMap
+
+# Соответствие стиля линии из параметров ребра стилю пера Qt
+LINE_STYLES = {
+    "solid": Qt.SolidLine,
+    "dashed": Qt.DashLine,
+    "dotted": Qt.DotLine,
+}
+
+
+def level_of_detail(painter):
+    """Масштаб, с которым элемент сейчас выводится на экран (1 - без масштабирования)."""
+    return QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+
+
+class LodTextItem(QGraphicsSimpleTextItem):
+    """Подпись, которая не рисуется при масштабе меньше label_lod своего стиля."""
+
+    def __init__(self, text, style, parent=None):
+        super().__init__(text, parent)
+        self.style = style
+        self._half_size = None  # Половина размеров текста; измеряется заново только после setText
+
+    def setText(self, text):
+        super().setText(text)
+        self._half_size = None
+
+    def center_at(self, x, y):
+        """Ставит подпись центром в точку (x, y)."""
+        if self._half_size is None:
+            rect = self.boundingRect()
+            self._half_size = (rect.width() / 2, rect.height() / 2)
+        self.setPos(x - self._half_size[0], y - self._half_size[1])
+
+    def paint(self, painter, option, widget=None):
+        if level_of_detail(painter) < self.style.params["label_lod"]:
+            return
+        super().paint(painter, option, widget)
+
+
+class LodLineItem(QGraphicsLineItem):
+    """Линия ребра; при масштабе меньше line_lod стиля рисуется тонким пером без узора."""
+
+    def __init__(self, style, *args):
+        super().__init__(*args)
+        self.style = style
+
+    def paint(self, painter, option, widget=None):
+        thin_pen = self.style.qt_cache.get("thin_pen")
+        if thin_pen is not None and level_of_detail(painter) < self.style.params["line_lod"]:
+            painter.setPen(thin_pen)
+            painter.drawLine(self.line())
+            return
+        super().paint(painter, option, widget)
+
 
 class CustomEllipse(QGraphicsEllipseItem):
-    """Класс для вершины, который обновляет рёбра при перемещении."""
+    """Класс для вершины, который обновляет рёбра при перемещении.
+
+    При масштабе меньше shape_lod стиля вершина рисуется залитым квадратом без контура.
+    """
 
-    def __init__(self, vertex_id, canvas, *args, **kwargs):
+    def __init__(self, vertex_id, canvas, style, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.vertex_id = vertex_id
+        self.vertex = None  # Vertex графа; задаётся при создании элемента холстом
         self.canvas = canvas
+        self.style = style
+        self.drag_origin = None  # Центр вершины в начале перетаскивания
         self.setFlag(QGraphicsEllipseItem.ItemIsMovable)
         self.setFlag(QGraphicsEllipseItem.ItemSendsGeometryChanges)
 
+    def paint(self, painter, option, widget=None):
+        if level_of_detail(painter) < self.style.params["shape_lod"]:
+            painter.fillRect(self.rect(), self.brush())
+            return
+        super().paint(painter, option, widget)
+
     def itemChange(self, change, value):
         """Отслеживает изменения позиции элемента."""
-        if change == QGraphicsEllipseItem.ItemPositionChange:
-            self.canvas.update_edges(self.vertex_id)  
-            self.canvas.save_vertex_position(self.vertex_id, value)
-            vertex = self.canvas.graph.vertices[self.vertex_id]
-            vertex.x, vertex.y = value.x(), value.y()
+        if change == QGraphicsEllipseItem.ItemPositionHasChanged and not self.canvas.moving_vertices:
+            # В графе хранится центр вершины, а не смещение элемента; value - новое смещение
+            self.canvas.save_vertex_position(self.vertex, value + self.rect().center())
+            self.canvas.update_edges(self.vertex_id)
         return super().itemChange(change, value)
 
+    def mousePressEvent(self, event):
+        self.drag_origin = (self.vertex.x, self.vertex.y)
+        super().mousePressEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        """Перетаскивание записывается в журнал одной операцией."""
+        super().mouseReleaseEvent(event)
+        position = (self.vertex.x, self.vertex.y)
+        if self.drag_origin is not None and position != self.drag_origin:
+            self.canvas.record({"op": "move_vertex", "id": self.vertex_id,
+                                "from": list(self.drag_origin), "to": list(position)})
+        self.drag_origin = None
+
 
 class Canvas(QGraphicsView):
-    """Класс для визуализации графа."""
+    """Класс для визуализации графа.
+
+    Колесо мыши масштабирует холст относительно курсора; холст сдвигается
+    перетаскиванием фона левой кнопкой (вне режима редактирования) или
+    средней кнопкой, клавиша F показывает граф целиком. Рисуются и
+    проверяются на попадание только элементы видимой области - их находит
+    BSP-индекс сцены, глубина которого подбирается по числу элементов.
+    """
+
+    ZOOM_STEP = 1.25  # Изменение масштаба за один шаг колеса
+    MIN_ZOOM = 0.005
+    MAX_ZOOM = 50
+    BSP_LEAF_ITEMS = 16  # Желаемое число элементов в листе BSP-дерева
+    MAX_BSP_DEPTH = 20
+    EDGE_UPDATE_INTERVAL = 16  # Рёбра перемещаемых вершин пересчитываются не чаще раза за кадр, мс
+
+    batched_edges_changed = pyqtSignal(bool)  # Включена или выключена пакетная отрисовка рёбер
 
     def __init__(self, graph, parent=None):
         super().__init__(parent)
         self.graph = graph  
         self.scene = QGraphicsScene(self)
         self.setScene(self.scene)
+        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+        self.setResizeAnchor(QGraphicsView.AnchorViewCenter)
+        self.setDragMode(QGraphicsView.ScrollHandDrag)
+        self.setOptimizationFlag(QGraphicsView.DontAdjustForAntialiasing)
+        self.pan_origin = None  # Точка нажатия средней кнопки при сдвиге холста
+        self.pending_vertices = set()  # Вершины, рёбра которых ждут пересчёта
+        self.edge_timer = QTimer(self)
+        self.edge_timer.setSingleShot(True)
+        self.edge_timer.timeout.connect(self.flush_edge_updates)
+        self.minimap = MiniMap(self)
         self.graph_changing_mode = False  
         self.available_ids = []  
         self.selected_vertices = []  
+        self.moving_vertices = False  # Идёт пакетное перемещение через move_vertices
+        self.edge_batches = None  # Пакетная отрисовка рёбер (EdgeBatches) или None - элемент на ребро
+        self.journal = None  # Журнал правок (EditJournal) или None
+        self.edit_listeners = []  # Вызываются с каждой применённой операцией журнала и с reweight_edges раскладки
+        self.graph.store.edge_listeners.append(self.edge_row_removed)
         self.canvas_width = self.width() 
         self.canvas_height = self.height()  
     
@@ -43,6 +157,7 @@ class Canvas(QGraphicsView):
         super().resizeEvent(event)  
         self.canvas_width = self.width()
         self.canvas_height = self.height()
+        self.minimap.reposition()
 
     def get_canvas_size(self):
         """Возвращает актуальные размеры текущего холста (ширина и высота)."""
@@ -51,9 +166,77 @@ class Canvas(QGraphicsView):
     def enable_graph_changing_mode(self, enabled):
         """Включает или выключает режим редактирования графа."""
         self.graph_changing_mode = enabled
+        # В режиме редактирования левая кнопка нужна вершинам, холст сдвигается средней
+        self.setDragMode(QGraphicsView.NoDrag if enabled else QGraphicsView.ScrollHandDrag)
+
+    def zoom(self):
+        """Текущий масштаб холста (1 - без масштабирования)."""
+        return self.transform().m11()
+
+    def wheelEvent(self, event):
+        """Масштабирует холст относительно точки под курсором."""
+        factor = self.ZOOM_STEP ** (event.angleDelta().y() / 120)
+        zoom = min(max(self.zoom() * factor, self.MIN_ZOOM), self.MAX_ZOOM)
+        if zoom != self.zoom():
+            factor = zoom / self.zoom()
+            self.scale(factor, factor)
+            self.minimap.update()
+        event.accept()
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_F:
+            self.fit_to_view()
+        else:
+            super().keyPressEvent(event)
+
+    def fit_to_view(self):
+        """Масштабирует холст так, чтобы граф был виден целиком."""
+        rect = self.scene.itemsBoundingRect()
+        if rect.isEmpty():
+            return
+        self.fitInView(rect, Qt.KeepAspectRatio)
+        zoom = min(max(self.zoom(), self.MIN_ZOOM), self.MAX_ZOOM)
+        if zoom != self.zoom():
+            self.scale(zoom / self.zoom(), zoom / self.zoom())
+        self.minimap.update()
+
+    def visible_scene_rect(self):
+        """Видимая часть сцены в координатах сцены."""
+        return self.mapToScene(self.viewport().rect()).boundingRect()
+
+    def tune_index(self):
+        """Подбирает глубину BSP-дерева по числу элементов сцены."""
+        items = 2 * self.graph.store.vertex_count  # Вершина и подпись
+        if self.edge_batches is None:
+            items += 2 * self.graph.store.edge_count  # Линия и подпись
+        depth = math.ceil(math.log2(max(items / self.BSP_LEAF_ITEMS, 2)))
+        self.scene.setBspTreeDepth(min(depth, self.MAX_BSP_DEPTH))
+
+    def mouseMoveEvent(self, event):
+        if self.pan_origin is not None:
+            delta = event.pos() - self.pan_origin
+            self.pan_origin = event.pos()
+            self.horizontalScrollBar().setValue(self.horizontalScrollBar().value() - delta.x())
+            self.verticalScrollBar().setValue(self.verticalScrollBar().value() - delta.y())
+            event.accept()
+            return
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.MiddleButton and self.pan_origin is not None:
+            self.pan_origin = None
+            self.viewport().unsetCursor()
+            event.accept()
+            return
+        super().mouseReleaseEvent(event)
 
     def mousePressEvent(self, event):
         """Обрабатывает нажатия мыши на холсте."""
+        if event.button() == Qt.MiddleButton:
+            self.pan_origin = event.pos()
+            self.viewport().setCursor(Qt.ClosedHandCursor)
+            event.accept()
+            return
         if not self.graph_changing_mode:
             super().mousePressEvent(event)  
             return
@@ -68,6 +251,8 @@ class Canvas(QGraphicsView):
                 self.delete_vertex(item)
             elif isinstance(item, QGraphicsLineItem):
                 self.delete_edge(item)
+            elif isinstance(item, EdgeBatch):
+                self.delete_batched_edge(position)
         elif event.button() == Qt.RightButton and event.modifiers() == Qt.ControlModifier:
             self.create_vertex(position)
         else:
@@ -78,14 +263,14 @@ class Canvas(QGraphicsView):
         vertex_id = item.data(0)
         if vertex_id in self.graph.vertices:
             vertex = self.graph.vertices[vertex_id]
-            item.setBrush(QBrush(QColor(vertex.highlighted_params["color"])))
+            item.setBrush(self.vertex_qt_style(self.graph.vertex_styles[vertex.highlighted_style_id])["brush"])
             self.selected_vertices.append(vertex_id)
 
             if len(self.selected_vertices) == 2:
                 self.create_edge(self.selected_vertices[0], self.selected_vertices[1])
                 for vid in self.selected_vertices:
-                    vertex_item = self.graph.vertices[vid].item
-                    vertex_item.setBrush(QBrush(QColor(self.graph.vertices[vid].default_params["color"])))
+                    selected = self.graph.vertices[vid]
+                    selected.item.setBrush(self.vertex_qt_style(self.graph.vertex_styles[selected.style_id])["brush"])
                 self.selected_vertices = []
 
     def create_edge(self, start_id, end_id):
@@ -93,197 +278,424 @@ class Canvas(QGraphicsView):
         weight, ok = self.request_edge_weight()
         if not ok:
             return
-
-        start_vertex = self.graph.vertices[start_id]
-        end_vertex = self.graph.vertices[end_id]
-
-        existing_edge = None
-        for edge in self.graph.edges:
-            if (edge.start_vertex == start_vertex and edge.end_vertex == end_vertex) or \
-               (edge.start_vertex == end_vertex and edge.end_vertex == start_vertex):
-                existing_edge = edge
-                break
-        
-        if existing_edge:
-            existing_edge.weight = weight  
-            self.update_edge_visual(existing_edge) 
-        else:
-            edge = Edge(start_vertex, end_vertex, weight=weight)
-            self.graph.edges.append(edge)
-            self.create_edge_visual(edge)
+        self.create_edge_special(start_id, end_id, weight)
 
     def update_edge_visual(self, edge):
         """Обновляет визуальное представление существующего рёбер.""" 
-        start_pos = self.get_circle_edge_position(edge.start_vertex.item, edge.end_vertex.item)
-        end_pos = self.get_circle_edge_position(edge.end_vertex.item, edge.start_vertex.item)
+        self.set_edge_label(edge, edge.weight)
+        self.update_edge_geometry(edge)
+
+    def set_edge_label(self, edge, weight):
+        """Меняет текст подписи ребра."""
+        if edge.text_item is not None:
+            edge.text_item.setText(str(weight))
+        elif self.edge_batches is not None:
+            self.edge_batches.refresh_labels(edge)
+
+    def update_edge_geometry(self, edge):
+        """Пересчитывает положение линии и подписи ребра по текущим позициям вершин."""
+        if self.edge_batches is not None:
+            self.edge_batches.patch_edges([edge])
+            return
+        start_pos = self.get_circle_edge_position(edge.start_vertex, edge.end_vertex)
+        end_pos = self.get_circle_edge_position(edge.end_vertex, edge.start_vertex)
 
-        if hasattr(edge, 'line_item'):
+        if edge.line_item is not None:
             edge.line_item.setLine(start_pos.x(), start_pos.y(), end_pos.x(), end_pos.y())
 
-        if hasattr(edge, 'text_item'):
-            mid_point = (start_pos + end_pos) / 2
-            edge.text_item.setPos(mid_point.x() - edge.text_item.boundingRect().width() / 2,
-                                  mid_point.y() - edge.text_item.boundingRect().height() / 2)
-            edge.text_item.setPlainText(str(edge.weight))  
+        if edge.text_item is not None:
+            edge.text_item.center_at((start_pos.x() + end_pos.x()) / 2, (start_pos.y() + end_pos.y()) / 2)
+
+    def update_edge_geometries(self, edges):
+        """Пересчитывает положение линий и подписей нескольких рёбер."""
+        if self.edge_batches is not None:
+            self.edge_batches.patch_edges(list(edges))
+            return
+        for edge in edges:
+            self.update_edge_geometry(edge)
+
+    def update_edge_rows(self, rows):
+        """Пересчитывает рёбра по строкам хранилища; пакеты обходятся без объектов Edge."""
+        if self.edge_batches is not None:
+            self.edge_batches.patch_rows(rows)
+            return
+        for row in rows:
+            self.update_edge_geometry(self.graph.edge(row))
 
     def create_edge_visual(self, edge):
         """Создаёт визуальное представление ребра.""" 
-        start_pos = self.get_circle_edge_position(edge.start_vertex.item, edge.end_vertex.item)
-        end_pos = self.get_circle_edge_position(edge.end_vertex.item, edge.start_vertex.item)
+        if self.edge_batches is not None:
+            self.edge_batches.add_edges([edge])
+            return
+        start_pos = self.get_circle_edge_position(edge.start_vertex, edge.end_vertex)
+        end_pos = self.get_circle_edge_position(edge.end_vertex, edge.start_vertex)
 
-        pen = QPen(QColor(edge.default_params["color"]), edge.default_params["thickness"])
-        line_item = QGraphicsLineItem(start_pos.x(), start_pos.y(), end_pos.x(), end_pos.y())
-        line_item.setPen(pen)
+        qt_style = self.edge_qt_style(edge.style)
+        line_item = LodLineItem(edge.style, start_pos.x(), start_pos.y(), end_pos.x(), end_pos.y())
+        line_item.setPen(qt_style["pen"])
+        line_item.setData(0, (edge.start_vertex.id, edge.end_vertex.id))
         self.scene.addItem(line_item)
 
-        mid_point = (start_pos + end_pos) / 2
-        text = QGraphicsTextItem(str(edge.weight))
-        text.setDefaultTextColor(QColor(edge.default_params.get("text_color", "black")))
-        text.setPos(mid_point.x() - text.boundingRect().width() / 2, mid_point.y() - text.boundingRect().height() / 2)
+        text = LodTextItem(str(edge.weight), edge.style)  # Без документа QTextDocument - дешевле для тысяч подписей
+        text.setBrush(qt_style["text_brush"])
+        text.center_at((start_pos.x() + end_pos.x()) / 2, (start_pos.y() + end_pos.y()) / 2)
         self.scene.addItem(text)
 
         edge.line_item = line_item  
         edge.text_item = text  
 
+    def add_visuals(self, vertices, edges, edge_rows=()):
+        """Создаёт элементы для множества вершин и рёбер за один проход.
+
+        Рёбра задаются объектами edges и/или строками хранилища edge_rows
+        (при пакетной отрисовке для строк объекты Edge не создаются). На
+        время вставки индекс сцены и перерисовка отключены; индекс строится
+        один раз в конце.
+        """
+        self.scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+        self.viewport().setUpdatesEnabled(False)
+        try:
+            for vertex in vertices:
+                self.create_vertex_visual(vertex)
+            if self.edge_batches is not None:
+                self.edge_batches.add_edges(list(edges))
+                self.edge_batches.add_rows(edge_rows)
+            else:
+                for edge in list(edges) + [self.graph.edge(row) for row in edge_rows]:
+                    self.create_edge_visual(edge)
+        finally:
+            self.scene.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
+            self.tune_index()
+            self.viewport().setUpdatesEnabled(True)
+        self.update()
+
+    def remove_edge_visuals(self, edges):
+        """Убирает рёбра с холста; пакеты сами убирают рёбра, уже удалённые из графа."""
+        if self.edge_batches is not None:
+            self.edge_batches.remove_edges(edges)
+            return
+        for edge in edges:
+            if edge.line_item is not None:
+                self.scene.removeItem(edge.line_item)
+                self.scene.removeItem(edge.text_item)
+                edge.line_item = edge.text_item = None
+
+    def set_batched_edges(self, enabled):
+        """Переключает отрисовку рёбер: по элементу на ребро или одним элементом на стиль."""
+        if enabled == (self.edge_batches is not None):
+            return
+        if self.edge_batches is not None:
+            for batch in self.edge_batches.batches.values():
+                self.scene.removeItem(batch)
+        else:
+            self.remove_edge_visuals(self.graph.edge_views())
+        self.edge_batches = EdgeBatches(self) if enabled else None
+        self.add_visuals([], [], range(self.graph.store.edge_count))
+        self.batched_edges_changed.emit(enabled)
+
+    def edge_row_removed(self, row, moved_from):
+        """Слушатель хранилища: пакеты ссылаются на рёбра по строкам."""
+        if self.edge_batches is not None:
+            self.edge_batches.edge_row_removed(row, moved_from)
+
+    def clear_scene(self):
+        """Удаляет все элементы холста."""
+        self.scene.clear()
+        self.pending_vertices.clear()
+        if self.edge_batches is not None:
+            self.edge_batches = EdgeBatches(self)
+        self.update()
+
     def create_edge_special(self, start_id, end_id, weight):
         """Создаёт или обновляет ребро между двумя вершинами."""
-        
-        existing_edge = None
-        for edge in self.graph.edges:
-            if (edge.start_vertex.id == start_id and edge.end_vertex.id == end_id) or \
-            (edge.start_vertex.id == end_id and edge.end_vertex.id == start_id):
-                existing_edge = edge
-                break
+        existing_edge = self.graph.get_edge(start_id, end_id)
 
         if existing_edge:
-            existing_edge.weight = weight
-            self.update_edge_visual(existing_edge)  
+            self.execute({"op": "reweight_edge", "start": start_id, "end": end_id,
+                          "from": existing_edge.weight, "to": weight})
             print(f"Обновлено ребро между вершинами {start_id} и {end_id} с новым весом {weight}")
         else:
-            start_vertex = self.graph.vertices[start_id]
-            end_vertex = self.graph.vertices[end_id]
-            edge = Edge(start_vertex, end_vertex, weight=weight)
-            self.graph.edges.append(edge)
-            self.create_edge_visual(edge)  
-
-    def get_circle_edge_position(self, source_item, target_item):
-        """Вычисляет точку пересечения рёбер с краем круга вершины.""" 
-        source_center = source_item.sceneBoundingRect().center()
-        target_center = target_item.sceneBoundingRect().center()
-
-        dx = target_center.x() - source_center.x()
-        dy = target_center.y() - source_center.y()
-        distance = (dx ** 2 + dy ** 2) ** 0.5
+            self.execute({"op": "add_edge", "start": start_id, "end": end_id, "weight": weight})
+
+    def get_circle_edge_position(self, source, target):
+        """Вычисляет точку пересечения ребра с краем круга вершины source.
 
-        radius = source_item.rect().width() / 2 
+        Центры берутся из графа, а не из геометрии элементов сцены.
+        """
+        source_x, source_y = source.x, source.y
+        dx = target.x - source_x
+        dy = target.y - source_y
+        distance = (dx ** 2 + dy ** 2) ** 0.5
 
         if distance == 0:
-            return source_center
+            return QPointF(source_x, source_y)
 
+        radius = source.item.rect().width() / 2
         offset_x = radius * dx / distance
         offset_y = radius * dy / distance
 
-        return QPointF(source_center.x() + offset_x, source_center.y() + offset_y)
+        return QPointF(source_x + offset_x, source_y + offset_y)
 
     def update_edges(self, vertex_id):
-        """Обновляет все рёбра, связанные с вершиной.""" 
-        vertex = self.graph.vertices[vertex_id]
-        for edge in self.graph.edges:
-            if edge.start_vertex == vertex or edge.end_vertex == vertex:
-                start_pos = self.get_circle_edge_position(edge.start_vertex.item, edge.end_vertex.item)
-                end_pos = self.get_circle_edge_position(edge.end_vertex.item, edge.start_vertex.item)
-
-                if hasattr(edge, 'line_item'):
-                    edge.line_item.setLine(start_pos.x(), start_pos.y(), end_pos.x(), end_pos.y())
-
-                if hasattr(edge, 'text_item'):
-                    mid_point = (start_pos + end_pos) / 2
-                    edge.text_item.setPos(mid_point.x() - edge.text_item.boundingRect().width() / 2,
-                                        mid_point.y() - edge.text_item.boundingRect().height() / 2)
-
-    def save_vertex_position(self, vertex_id, position):
-        """Сохраняет новые координаты вершины после её перемещения.""" 
-        if vertex_id in self.graph.vertices:
-            vertex = self.graph.vertices[vertex_id]
-            vertex.x, vertex.y = position.x(), position.y()
-
+        """Помечает рёбра вершины для пересчёта в ближайшем кадре.
+
+        При перетаскивании позиция меняется на каждое движение мыши; рёбра
+        всех помеченных вершин пересчитываются один раз по таймеру.
+        """
+        self.pending_vertices.add(vertex_id)
+        if not self.edge_timer.isActive():
+            self.edge_timer.start(self.EDGE_UPDATE_INTERVAL)
+
+    def flush_edge_updates(self):
+        """Пересчитывает рёбра помеченных вершин; общее ребро - один раз."""
+        touched_rows = {}
+        for vertex_id in self.pending_vertices:
+            touched_rows.update(dict.fromkeys(self.graph.incident_rows(vertex_id)))
+        self.pending_vertices.clear()
+        self.update_edge_rows(list(touched_rows))
+
+    def move_vertices(self, vertices, positions):
+        """Переносит уже созданные элементы вершин в новые координаты центров.
+
+        Элементы не пересоздаются; каждое инцидентное ребро пересчитывается
+        один раз после перемещения всех вершин.
+        """
+        self.moving_vertices = True
+        touched_rows = {}
+        try:
+            for vertex, (x, y) in zip(vertices, positions):
+                center = vertex.item.rect().center()
+                vertex.item.setPos(x - center.x(), y - center.y())
+                vertex.x, vertex.y = x, y
+                touched_rows.update(dict.fromkeys(self.graph.incident_rows(vertex.id)))
+        finally:
+            self.moving_vertices = False
+        self.update_edge_rows(list(touched_rows))
+
+    def save_vertex_position(self, vertex, position):
+        """Сохраняет новые координаты центра вершины после её перемещения.""" 
+        vertex.x, vertex.y = position.x(), position.y()
 
     def create_vertex(self, position):
         """Создаёт вершину на холсте.""" 
         if self.available_ids:
-            vertex_id = self.available_ids.pop(0)
+            vertex_id = self.available_ids[0]
         else:
             vertex_id = len(self.graph.vertices) + 1
-
-        vertex = Vertex(vertex_id, x=position.x(), y=position.y())
-        self.graph.add_vertex(vertex)
-
-        color = QColor(vertex.default_params["color"])
-        radius = vertex.default_params["size"]
-        x, y = position.x(), position.y()
-
-        ellipse = CustomEllipse(vertex_id, self, x - radius, y - radius, radius * 2, radius * 2)
-        ellipse.setBrush(QBrush(color))
-        ellipse.setData(0, vertex_id)
-
-        text = QGraphicsTextItem(str(vertex_id))
-        text.setParentItem(ellipse)
-        text.setDefaultTextColor(QColor(vertex.default_params["text_color"]))
-        text.setPos(
-            ellipse.rect().center().x() - text.boundingRect().width() / 2,
-            ellipse.rect().center().y() - text.boundingRect().height() / 2,
-        )
-
-        self.scene.addItem(ellipse)
-        self.graph.vertices[vertex_id].item = ellipse
+        self.execute({"op": "add_vertex", "id": vertex_id, "x": position.x(), "y": position.y(), "edges": []})
     
     def create_vertex_visual(self, vertex):
         """Создаёт визуальное представление вершины на холсте.""" 
-        color = QColor(vertex.default_params["color"])
-        radius = vertex.default_params["size"]
+        qt_style = self.vertex_qt_style(vertex.style)
+        radius = vertex.params["size"]
         x, y = vertex.x, vertex.y
 
-        ellipse = CustomEllipse(vertex.id, self, x - radius, y - radius, radius * 2, radius * 2)
-        ellipse.setBrush(QBrush(color))
+        ellipse = CustomEllipse(vertex.id, self, vertex.style, x - radius, y - radius, radius * 2, radius * 2)
+        ellipse.setBrush(qt_style["brush"])
         ellipse.setData(0, vertex.id)
 
-        text = QGraphicsTextItem(str(vertex.id))
-        text.setParentItem(ellipse)
-        text.setDefaultTextColor(QColor(vertex.default_params["text_color"]))
-        text.setPos(
-            ellipse.rect().center().x() - text.boundingRect().width() / 2,
-            ellipse.rect().center().y() - text.boundingRect().height() / 2,
-        )
+        text = LodTextItem(str(vertex.id), vertex.style, ellipse)
+        text.setBrush(qt_style["text_brush"])
+        text.center_at(x, y)
+        ellipse.label = text
+        ellipse.vertex = vertex
 
         self.scene.addItem(ellipse)
-        self.graph.vertices[vertex.id].item = ellipse
+        vertex.item = ellipse
+
+    def vertex_qt_style(self, style):
+        """Кисть и цвет текста для стиля вершин; создаются один раз на стиль."""
+        cache = style.qt_cache
+        if not cache:
+            cache["brush"] = QBrush(QColor(style.params["color"]))
+            cache["text_brush"] = QBrush(QColor(style.params["text_color"]))
+        return cache
+
+    def edge_qt_style(self, style):
+        """Перо и цвет текста для стиля рёбер; создаются один раз на стиль."""
+        cache = style.qt_cache
+        if not cache:
+            pen = QPen(QColor(style.params["color"]), style.params["thickness"])
+            pen.setStyle(LINE_STYLES.get(style.params["style"], Qt.SolidLine))
+            cache["pen"] = pen
+            cache["thin_pen"] = QPen(QColor(style.params["color"]), 0)  # Косметическое перо толщиной 1 пиксель
+            cache["text_pen"] = QPen(QColor(style.params.get("text_color", "black")))  # Подписи пакетных рёбер
+            cache["text_brush"] = QBrush(QColor(style.params.get("text_color", "black")))
+        return cache
+
+    def apply_vertex_style(self, vertex):
+        """Применяет текущий стиль вершины к её графическому элементу."""
+        item = vertex.item
+        qt_style = self.vertex_qt_style(vertex.style)
+        item.style = item.label.style = vertex.style
+        item.setBrush(qt_style["brush"])
+        radius = vertex.params["size"]
+        if item.rect().width() != radius * 2:
+            center = item.rect().center()
+            item.setRect(center.x() - radius, center.y() - radius, radius * 2, radius * 2)
+            item.label.center_at(center.x(), center.y())
+            self.update_edges(vertex.id)
+        item.label.setBrush(qt_style["text_brush"])
+
+    def apply_edge_style(self, edge):
+        """Применяет текущий стиль ребра к его линии и подписи."""
+        if self.edge_batches is not None:
+            self.edge_batches.restyle(edge)
+            return
+        qt_style = self.edge_qt_style(edge.style)
+        edge.line_item.style = edge.text_item.style = edge.style
+        edge.line_item.setPen(qt_style["pen"])
+        edge.text_item.setBrush(qt_style["text_brush"])
+
+    def repaint_vertex_style(self, style_id):
+        """Перерисовывает за один проход только вершины, использующие стиль style_id или полученные из него."""
+        style_ids = {style_id, *self.graph.vertex_styles.dependents(style_id)}
+        self.viewport().setUpdatesEnabled(False)
+        for vertex in self.graph.vertices.values():
+            current_id = vertex.highlighted_style_id if vertex.is_highlighted else vertex.style_id
+            if current_id in style_ids and vertex.item is not None:
+                self.apply_vertex_style(vertex)
+        self.viewport().setUpdatesEnabled(True)
+        self.update()
+
+    def repaint_edge_style(self, style_id):
+        """Перерисовывает за один проход только рёбра, использующие стиль style_id или полученные из него."""
+        style_ids = {style_id, *self.graph.edge_styles.dependents(style_id)}
+        self.viewport().setUpdatesEnabled(False)
+        for edge in self.graph.edge_views():
+            current_id = edge.highlighted_style_id if edge.is_highlighted else edge.style_id
+            if current_id in style_ids and edge.line_item is not None:
+                self.apply_edge_style(edge)
+        if self.edge_batches is not None:
+            for current_id in style_ids:
+                self.edge_batches.refresh_style(self.graph.edge_styles[current_id])
+        self.viewport().setUpdatesEnabled(True)
+        self.update()
+
+    def update_global_vertex_params(self, is_highlighted=False, **params):
+        """Меняет общий стиль вершин и перерисовывает вершины, которые на него ссылаются."""
+        style_id = self.graph.update_global_vertex_params(is_highlighted=is_highlighted, **params)
+        self.repaint_vertex_style(style_id)
+
+    def update_global_edge_params(self, is_highlighted=False, **params):
+        """Меняет общий стиль рёбер и перерисовывает рёбра, которые на него ссылаются."""
+        style_id = self.graph.update_global_edge_params(is_highlighted=is_highlighted, **params)
+        self.repaint_edge_style(style_id)
 
     def delete_vertex(self, item):
         """Удаляет вершину по правому клику с Alt.""" 
         vertex_id = item.data(0)
         if vertex_id in self.graph.vertices:
-            edges_to_remove = [edge for edge in self.graph.edges
-                               if edge.start_vertex.id == vertex_id or edge.end_vertex.id == vertex_id]
-            for edge in edges_to_remove:
-                self.scene.removeItem(edge.line_item)
-                self.scene.removeItem(edge.text_item)
-                self.graph.edges.remove(edge)
-
-            del self.graph.vertices[vertex_id]
-            self.scene.removeItem(item)
-            self.available_ids.append(vertex_id)
-            self.available_ids.sort()
-            self.update()
+            vertex = self.graph.vertices[vertex_id]
+            edges = [[edge.start_vertex.id, edge.end_vertex.id, edge.weight]
+                     for edge in self.graph.incident_edges(vertex_id)]
+            self.execute({"op": "remove_vertex", "id": vertex_id, "x": vertex.x, "y": vertex.y, "edges": edges})
 
     def delete_edge(self, item):
         """Удаляет ребро по правому клику с Alt.""" 
-        for edge in self.graph.edges:
-            if edge.line_item == item:
-                self.scene.removeItem(edge.line_item)
-                self.scene.removeItem(edge.text_item)
-                self.graph.edges.remove(edge)
-                self.update()
-                break
+        endpoints = item.data(0)
+        if not endpoints:
+            return
+        edge = self.graph.get_edge(*endpoints)
+        if edge and edge.line_item == item:
+            self.execute(self.remove_edge_operation(edge))
+
+    def delete_batched_edge(self, position):
+        """Удаляет ребро пакетной отрисовки, ближайшее к точке сцены position."""
+        edge = self.edge_batches.edge_at(position)
+        if edge is not None:
+            self.execute(self.remove_edge_operation(edge))
+
+    @staticmethod
+    def remove_edge_operation(edge):
+        return {"op": "remove_edge", "start": edge.start_vertex.id, "end": edge.end_vertex.id, "weight": edge.weight}
+
+    def execute(self, operation):
+        """Выполняет правку и записывает её в журнал."""
+        self.apply_operation(operation)
+        self.record(operation)
+
+    def record(self, operation):
+        """Записывает уже выполненную правку в журнал; журнал периодически сжимается в снимок."""
+        if self.journal is None:
+            return
+        self.journal.record(operation)
+        if self.journal.needs_compaction():
+            self.journal.compact(self.graph)
+
+    def checkpoint(self):
+        """Сохраняет снимок графа после загрузки или очистки; прежние правки больше не отменяются."""
+        if self.journal is not None:
+            self.journal.compact(self.graph, clear_history=True)
+        self.notify_edit({"op": "reset"})  # Граф заменён целиком
+
+    def notify_edit(self, operation):
+        for listener in self.edit_listeners:
+            listener(operation)
+
+    def undo(self):
+        """Отменяет последнюю правку."""
+        if self.journal is not None:
+            operation = self.journal.undo()
+            if operation is not None:
+                self.apply_operation(operation)
+
+    def redo(self):
+        """Повторяет отменённую правку."""
+        if self.journal is not None:
+            operation = self.journal.redo()
+            if operation is not None:
+                self.apply_operation(operation)
+
+    def apply_operation(self, operation):
+        """Применяет операцию журнала к графу и холсту, ничего не записывая."""
+        kind = operation["op"]
+        if kind == "add_vertex":
+            vertex_id = operation["id"]
+            vertex = Vertex(vertex_id, x=operation["x"], y=operation["y"])
+            self.graph.add_vertex(vertex)
+            self.create_vertex_visual(vertex)
+            if vertex_id in self.available_ids:
+                self.available_ids.remove(vertex_id)
+            for start_id, end_id, weight in operation.get("edges", ()):
+                self.apply_operation({"op": "add_edge", "start": start_id, "end": end_id, "weight": weight})
+        elif kind == "remove_vertex":
+            vertex_id = operation["id"]
+            vertex = self.graph.vertices.get(vertex_id)
+            if vertex is not None:
+                item = vertex.item
+                self.remove_edge_visuals(self.graph.remove_vertex(vertex_id))
+                if item is not None:
+                    self.scene.removeItem(item)
+                self.available_ids.append(vertex_id)
+                self.available_ids.sort()
+        elif kind == "move_vertex":
+            vertex = self.graph.vertices.get(operation["id"])
+            if vertex is not None:
+                self.move_vertices([vertex], [operation["to"]])
+        elif kind == "add_edge":
+            edge = self.graph.get_edge(operation["start"], operation["end"])
+            if edge is not None:
+                edge.weight = operation["weight"]
+                self.update_edge_visual(edge)
+            else:
+                edge = self.graph.add_edge(self.graph.vertices[operation["start"]],
+                                           self.graph.vertices[operation["end"]], weight=operation["weight"])
+                self.create_edge_visual(edge)
+        elif kind == "remove_edge":
+            edge = self.graph.get_edge(operation["start"], operation["end"])
+            if edge is not None:
+                self.remove_edge_visuals([edge])
+                self.graph.remove_edge(edge)
+        elif kind == "reweight_edge":
+            edge = self.graph.get_edge(operation["start"], operation["end"])
+            if edge is not None:
+                edge.weight = operation["to"]
+                self.update_edge_visual(edge)
+        else:
+            raise ValueError(f"Неизвестная операция журнала: {kind}")
+        self.notify_edit(operation)
+        self.update()
 
     def request_edge_weight(self):
         """Запрашивает у пользователя вес рёбер.""" 
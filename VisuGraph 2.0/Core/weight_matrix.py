@@ -0,0 +1,302 @@
+import json
+import os
+
+import numpy as np
+
+
+MATRIX_FILE_FILTER = "Matrix Files (*.json *.npz);;JSON Files (*.json);;NumPy Files (*.npz);;All Files (*)"
+MAX_EXAMPLES = 10  # Нарушений каждого вида, сохраняемых в отчёте проверки
+BLOCK_ROWS = 1024  # Строк плотной матрицы, проверяемых за раз: ограничивает временную память
+
+
+def dense_array(matrix):
+    """Плотная матрица в виде массива float64 (n, n); None становится nan.
+
+    Если матрица не квадратная или содержит не числа, выбрасывает ValueError.
+    """
+    try:
+        array = np.asarray(matrix, dtype=np.float64)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Ошибка: матрица должна быть квадратной таблицей чисел ({e}).")
+    if array.ndim != 2 or array.shape[0] != array.shape[1]:
+        raise ValueError(f"Ошибка: матрица должна быть квадратной таблицей чисел, получен размер {array.shape}.")
+    return array
+
+
+class MatrixReport:
+    """Результат проверки матрицы: число нарушений каждого вида и первые из них.
+
+    Отсутствующие элементы (None или nan) нарушениями не считаются.
+    """
+
+    MESSAGES = {
+        "shape": "{value}",
+        "index": "Ошибка: индекс [{i}][{j}] вне матрицы размера {size}.",
+        "diagonal": "Ошибка: элемент на главной диагонали matrix[{i}][{j}] должен быть 0.",
+        "negative": "Ошибка: отрицательное значение matrix[{i}][{j}]={value}. Элементы должны быть >= 0.",
+        "symmetry": "Ошибка: матрица не симметрична на позициях [{i}][{j}] и [{j}][{i}].",
+        "column": "Ошибка: в столбце {j} матрицы инцидентности {value} ненулевых элементов вместо 2.",
+        "weight": "Ошибка: отрицательный вес {value} у ребра из столбца {j}.",
+        "weight_key": "Ошибка: ключ весов {value!r} не является номером столбца.",
+        "weight_value": "Ошибка: вес {value!r} у ребра из столбца {j} не является числом.",
+    }
+
+    def __init__(self, size, max_examples=MAX_EXAMPLES):
+        self.size = size
+        self.max_examples = max_examples
+        self.counts = dict.fromkeys(self.MESSAGES, 0)
+        self.examples = {kind: [] for kind in self.MESSAGES}  # Вид -> [(i, j, значение)]
+
+    def add(self, kind, rows, cols, values):
+        """Учитывает нарушения вида kind в позициях (rows[k], cols[k]) со значениями values[k]"""
+        rows, cols, values = np.asarray(rows), np.asarray(cols), np.asarray(values)
+        self.counts[kind] += len(rows)
+        free = self.max_examples - len(self.examples[kind])
+        if free > 0:
+            self.examples[kind].extend(zip(rows[:free].tolist(), cols[:free].tolist(), values[:free].tolist()))
+
+    @property
+    def valid(self):
+        return not any(self.counts.values())
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def messages(self):
+        """Тексты сохранённых нарушений по порядку видов"""
+        return [self.MESSAGES[kind].format(i=i, j=j, value=value, size=self.size)
+                for kind, examples in self.examples.items() for i, j, value in examples]
+
+    def summary(self):
+        """Текст отчёта для показа пользователю"""
+        if self.valid:
+            return "Матрица корректна."
+        lines = self.messages()
+        if self.total > len(lines):
+            lines.append(f"... всего нарушений: {self.total}")
+        return "\n".join(lines)
+
+    def raise_for_errors(self):
+        """Выбрасывает ValueError с первым нарушением, если они есть"""
+        if self.valid:
+            return
+        message = self.messages()[0]
+        if self.total > 1:
+            message += f" Всего нарушений: {self.total}."
+        raise ValueError(message)
+
+
+class SparseMatrix:
+    """Разреженная симметричная матрица весов размера size x size в формате COO.
+
+    Хранятся только заданные элементы (индексы с 0, как в плотной матрице);
+    отсутствующие элементы соответствуют None плотного формата, диагональ
+    считается нулевой. Элемент можно задать в любой половине матрицы, а
+    если заданы обе, значения должны совпадать. Память пропорциональна
+    числу рёбер.
+    """
+
+    def __init__(self, size, rows, cols, values):
+        self.size = int(size)
+        self.rows = np.asarray(rows, dtype=np.int64).reshape(-1)
+        self.cols = np.asarray(cols, dtype=np.int64).reshape(-1)
+        self.values = np.asarray(values, dtype=np.float64).reshape(-1)
+        if not len(self.rows) == len(self.cols) == len(self.values):
+            raise ValueError("Ошибка: длины массивов rows, cols и values разреженной матрицы различаются.")
+        present = ~np.isnan(self.values)  # nan - как None в плотной матрице
+        self.rows, self.cols, self.values = self.rows[present], self.cols[present], self.values[present]
+
+    def __len__(self):
+        return self.size
+
+    @classmethod
+    def from_dense(cls, matrix):
+        """Разреженная матрица по плотной (список списков с None или массив с nan для отсутствующих элементов)"""
+        array = dense_array(matrix)
+        rows, cols = np.nonzero(~np.isnan(array))
+        return cls(len(array), rows, cols, array[rows, cols])
+
+    @classmethod
+    def from_csr(cls, size, indptr, indices, values):
+        indptr = np.asarray(indptr, dtype=np.int64)
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        return cls(size, rows, indices, values)
+
+    @classmethod
+    def from_edges(cls, size, edges):
+        """Матрица по рёбрам (id начала, id конца, вес) с id вершин от 1"""
+        rows, cols, values = [], [], []
+        for start, end, weight in edges:
+            rows.append(start - 1)
+            cols.append(end - 1)
+            values.append(weight)
+        return cls(size, rows, cols, values)
+
+    def pairs(self):
+        """Неориентированные пары i < j без повторов: (i, j, значения), упорядочены по (i, j)"""
+        off_diagonal = self.rows != self.cols
+        lower = np.minimum(self.rows, self.cols)[off_diagonal]
+        upper = np.maximum(self.rows, self.cols)[off_diagonal]
+        size = max(self.size, 1)
+        keys, first = np.unique(lower * size + upper, return_index=True)
+        return keys // size, keys % size, self.values[off_diagonal][first]
+
+    def check(self, max_examples=MAX_EXAMPLES):
+        """Проверяет матрицу и возвращает MatrixReport"""
+        report = MatrixReport(self.size, max_examples)
+        outside = (self.rows < 0) | (self.rows >= self.size) | (self.cols < 0) | (self.cols >= self.size)
+        report.add("index", self.rows[outside], self.cols[outside], self.values[outside])
+        rows, cols, values = self.rows[~outside], self.cols[~outside], self.values[~outside]
+
+        diagonal = (rows == cols) & (values != 0)
+        report.add("diagonal", rows[diagonal], cols[diagonal], values[diagonal])
+
+        negative = values < 0
+        report.add("negative", rows[negative], cols[negative], values[negative])
+
+        keys = np.minimum(rows, cols) * self.size + np.maximum(rows, cols)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys, sorted_values = keys[order], values[order]
+        conflict = order[1:][(sorted_keys[1:] == sorted_keys[:-1]) & (sorted_values[1:] != sorted_values[:-1])]
+        report.add("symmetry", rows[conflict], cols[conflict], values[conflict])
+        return report
+
+    def validate(self):
+        """Проверяет матрицу; при ошибке выбрасывает ValueError"""
+        self.check().raise_for_errors()
+
+    def edges(self):
+        """Список рёбер {"start", "end", "weight"} (вершины с 1) в том же порядке, что и для плотной матрицы"""
+        lower, upper, values = self.pairs()
+        return [{"start": i + 1, "end": j + 1, "weight": int(value) if value.is_integer() else value}
+                for i, j, value in zip(lower.tolist(), upper.tolist(), values.tolist())]
+
+    def to_dict(self):
+        """JSON-представление COO; хранится только верхний треугольник"""
+        lower, upper, values = self.pairs()
+        return {
+            "format": "coo",
+            "size": self.size,
+            "rows": lower.tolist(),
+            "cols": upper.tolist(),
+            "values": [int(value) if value.is_integer() else value for value in values.tolist()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Матрица по JSON-представлению COO или CSR"""
+        matrix_format = data.get("format", "coo")
+        if matrix_format == "coo":
+            return cls(data["size"], data["rows"], data["cols"], data["values"])
+        if matrix_format == "csr":
+            return cls.from_csr(data["size"], data["indptr"], data["indices"], data["values"])
+        raise ValueError(f"Неизвестный формат разреженной матрицы: {matrix_format}")
+
+
+def check_weight_matrix(matrix, max_examples=MAX_EXAMPLES):
+    """Проверяет плотную или разреженную матрицу весов без обращения к интерфейсу; возвращает MatrixReport.
+
+    Плотная матрица проверяется блоками по BLOCK_ROWS строк: каждая
+    симметричная пара сравнивается один раз (в верхнем треугольнике).
+    """
+    if isinstance(matrix, SparseMatrix):
+        return matrix.check(max_examples)
+    try:
+        array = dense_array(matrix)
+    except ValueError as e:
+        report = MatrixReport(len(matrix), max_examples)
+        report.add("shape", [0], [0], [str(e)])
+        return report
+
+    size = len(array)
+    report = MatrixReport(size, max_examples)
+    diagonal = np.diagonal(array)
+    wrong = np.flatnonzero(~np.isnan(diagonal) & (diagonal != 0))
+    report.add("diagonal", wrong, wrong, diagonal[wrong])
+
+    columns = np.arange(size)
+    for start in range(0, size, BLOCK_ROWS):
+        block = array[start:start + BLOCK_ROWS]
+        rows, cols = np.nonzero(block < 0)  # nan < 0 - ложь
+        report.add("negative", rows + start, cols, block[rows, cols])
+
+        mirrored = array[:, start:start + BLOCK_ROWS].T
+        upper = columns[None, :] > (start + np.arange(len(block)))[:, None]
+        differs = upper & (block != mirrored) & ~np.isnan(block) & ~np.isnan(mirrored)
+        rows, cols = np.nonzero(differs)
+        report.add("symmetry", rows + start, cols, block[rows, cols])
+    return report
+
+
+def check_incidence_matrix(matrix, weights=None, max_examples=MAX_EXAMPLES):
+    """Проверяет матрицу инцидентности (вершины x рёбра) и веса рёбер {номер столбца: вес}; возвращает MatrixReport"""
+    try:
+        array = np.asarray(matrix, dtype=np.float64)
+        if array.ndim != 2:
+            raise ValueError(f"получен размер {array.shape}")
+    except (TypeError, ValueError) as e:
+        report = MatrixReport(len(matrix), max_examples)
+        report.add("shape", [0], [0], [f"Ошибка: матрица инцидентности должна быть таблицей чисел ({e})."])
+        return report
+
+    report = MatrixReport(len(array), max_examples)
+    nonzero = np.count_nonzero(np.nan_to_num(array), axis=0)
+    wrong = np.flatnonzero(nonzero != 2)
+    report.add("column", np.zeros_like(wrong), wrong, nonzero[wrong])
+
+    if weights:
+        columns, values = [], []
+        for column, value in weights.items():
+            try:
+                column = int(column)
+            except (TypeError, ValueError):
+                report.add("weight_key", [0], [0], [column])
+                continue
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                report.add("weight_value", [0], [column], [value])
+                continue
+            columns.append(column)
+            values.append(value)
+        columns, values = np.array(columns, dtype=np.int64), np.array(values, dtype=np.float64)
+        negative = values < 0
+        report.add("weight", np.zeros(int(negative.sum()), dtype=np.int64), columns[negative], values[negative])
+    return report
+
+
+def as_sparse(matrix):
+    """SparseMatrix для плотной или уже разреженной матрицы"""
+    return matrix if isinstance(matrix, SparseMatrix) else SparseMatrix.from_dense(matrix)
+
+
+def load_weight_matrix(file_path):
+    """Читает матрицу смежности: плотную или разреженную из JSON (ключ "adjacency_matrix") или из .npz.
+
+    Плотная матрица возвращается списком списков, разреженная - SparseMatrix.
+    """
+    if os.path.splitext(file_path)[1].lower() == ".npz":
+        with np.load(file_path) as data:
+            if "indptr" in data:
+                return SparseMatrix.from_csr(data["size"], data["indptr"], data["indices"], data["values"])
+            return SparseMatrix(data["size"], data["rows"], data["cols"], data["values"])
+
+    with open(file_path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    matrix = data.get("adjacency_matrix")
+    if not matrix:
+        raise ValueError("Матрица смежности отсутствует в файле.")
+    if isinstance(matrix, dict):
+        return SparseMatrix.from_dict(matrix)
+    return matrix
+
+
+def save_weight_matrix(matrix, file_path):
+    """Сохраняет разреженную матрицу в .npz или в JSON с ключом "adjacency_matrix"."""
+    if os.path.splitext(file_path)[1].lower() == ".npz":
+        lower, upper, values = matrix.pairs()
+        np.savez_compressed(file_path, size=matrix.size, rows=lower, cols=upper, values=values)
+        return
+    with open(file_path, "w", encoding="utf-8") as file:
+        json.dump({"adjacency_matrix": matrix.to_dict()}, file, ensure_ascii=False)
@@ -1,92 +1,119 @@
 from PyQt5 import QtWidgets
 import json
+import numpy as np
 from PyQt5.QtGui import QColor, QPen, QBrush
-from PyQt5.QtWidgets import QFileDialog, QGraphicsTextItem, QGraphicsLineItem, QMessageBox
-from PyQt5.QtCore import QPointF
+from PyQt5.QtWidgets import QApplication, QFileDialog, QGraphicsTextItem, QGraphicsLineItem, QMessageBox, QProgressDialog
+from PyQt5.QtCore import QPointF, Qt
+from Core.edge_stream import EdgeStreamReader
 from Core.graph import Vertex, Edge
 from Core.vizualization import CustomEllipse, Canvas
+from Core.weight_matrix import (MATRIX_FILE_FILTER, SparseMatrix, as_sparse, check_incidence_matrix,
+                                check_weight_matrix, dense_array, load_weight_matrix)
 from GUI.functionals.work_window_functional import WorkWindowFunctional
 
+PROGRESS_STEPS = 1000  # Деления индикатора загрузки
+PROGRESS_DELAY = 500  # Индикатор появляется, только если загрузка длится дольше, мс
+BATCHED_EDGES = 10000  # Начиная с этого числа рёбер загрузка списка рёбер включает пакетную отрисовку
+
 
 def create_graph_from_edge_list(canvas, functional_instance, file_path=None):
+    """
+    Создаёт граф по списку рёбер: JSON с ключом "edges", NDJSON или CSV.
+    Файл читается потоково и граф строится кусками, поэтому память на разбор
+    не зависит от размера файла. Рёбра куска добавляются в хранилище графа
+    массивами, без объектов Edge; большой граф сразу рисуется пакетами.
+    """
     functional_instance.clear_graph()  
 
     if not file_path:
         file_path, _ = QFileDialog.getOpenFileName(
-            None, "Выберите JSON файл", "", "JSON Files (*.json);;All Files (*)"
+            None, "Выберите файл со списком рёбер", "",
+            "Edge lists (*.json *.ndjson *.jsonl *.csv);;All Files (*)"
         )
         if not file_path:
             return  
 
     try:
-        with open(file_path, "r") as file:
-            data = json.load(file)
-
-        for edge in data.get("edges", []):
-            start = edge.get("start")
-            end = edge.get("end")
-            weight = edge.get("weight", 1) 
-
-            if start is None or end is None:
-                QMessageBox.warning(None, "Ошибка", f"Некорректный формат JSON: {edge}")
-                continue
-
-            if start not in canvas.graph.vertices:
-                vertex_start = Vertex(start, x=100 + start * 10, y=100)
-                canvas.graph.add_vertex(vertex_start) 
-                canvas.create_vertex_visual(vertex_start)  
-            if end not in canvas.graph.vertices:
-                vertex_end = Vertex(end, x=100 + end * 10, y=200)
-                canvas.graph.add_vertex(vertex_end) 
-                canvas.create_vertex_visual(vertex_end)  
-
-            canvas.create_edge_special(start, end, weight)  
-
-    except (json.JSONDecodeError, IOError):
-        QMessageBox.critical(None, "Ошибка", "Не удалось загрузить файл JSON.")
+        reader = EdgeStreamReader(file_path)
+        progress = QProgressDialog("Загрузка рёбер...", "Отмена", 0, PROGRESS_STEPS)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(PROGRESS_DELAY)
+        graph = canvas.graph
+
+        for starts, ends, weights in reader.chunks():
+            # Новые вершины - в порядке первого появления; впервые встреченная началом ребра - в верхнем ряду
+            ids, first = np.unique(np.column_stack((starts, ends)).ravel(), return_index=True)
+            new_vertices = []
+            for vertex_id, position in sorted(zip(ids.tolist(), first.tolist()), key=lambda pair: pair[1]):
+                if vertex_id not in graph.vertices:
+                    vertex = Vertex(vertex_id, x=100 + vertex_id * 10, y=200 if position % 2 else 100)
+                    graph.add_vertex(vertex)
+                    new_vertices.append(vertex)
+
+            new_rows, reweighted_rows = graph.add_edges(starts, ends, weights)
+            for row in reweighted_rows.tolist():
+                edge = graph.edge(row)
+                canvas.set_edge_label(edge, edge.weight)  # Концы те же - меняется только подпись
+            if graph.store.edge_count >= BATCHED_EDGES:
+                canvas.set_batched_edges(True)  # Без объектов Edge и элементов сцены на каждое ребро
+            canvas.add_visuals(new_vertices, [], new_rows)
+
+            progress.setLabelText(f"Загружено рёбер: {reader.edges_read}")
+            progress.setValue(PROGRESS_STEPS * reader.bytes_read // max(reader.total_bytes, 1))
+            QApplication.processEvents()
+            if progress.wasCanceled():
+                break
+        progress.close()
+        canvas.checkpoint()
+
+        if reader.skipped:
+            QMessageBox.warning(None, "Ошибка", f"Пропущено некорректных рёбер: {reader.skipped}")
+
+    except (json.JSONDecodeError, ValueError, IOError) as e:
+        QMessageBox.critical(None, "Ошибка", f"Не удалось загрузить список рёбер: {e}")
 
 
 def create_graph_from_adjacency_matrix(canvas, functional_instance, file_path=None):
     """
-    Создаёт граф на основе матрицы смежности, загруженной из файла JSON.
+    Создаёт граф на основе матрицы смежности из JSON (плотной или разреженной) или .npz.
     Строки и колонки матрицы - это номера вершин (начиная с 1), а значения - веса рёбер.
     """
     functional_instance.clear_graph()  
 
     if not file_path:
         file_path, _ = QFileDialog.getOpenFileName(
-            None, "Выберите JSON файл", "", "JSON Files (*.json);;All Files (*)"
+            None, "Выберите файл с матрицей смежности", "", MATRIX_FILE_FILTER
         )
         if not file_path:
             return  
 
     try:
-        with open(file_path, "r") as file:
-            data = json.load(file)
-
-        adjacency_matrix = data.get("adjacency_matrix", [])
-        if not adjacency_matrix:
-            QMessageBox.warning(None, "Ошибка", "Матрица смежности отсутствует.")
+        adjacency_matrix = load_weight_matrix(file_path)
+        if not isinstance(adjacency_matrix, SparseMatrix):
+            adjacency_matrix = dense_array(adjacency_matrix)
+        report = check_weight_matrix(adjacency_matrix)
+        if not report.valid:
+            QMessageBox.warning(None, "Ошибка", report.summary())
             return
+        adjacency_matrix = as_sparse(adjacency_matrix)
 
+        vertices = []
         for i in range(len(adjacency_matrix)):
-            vertex_id = i + 1 
-            if vertex_id not in canvas.graph.vertices:  
-                vertex = Vertex(vertex_id, x=100 + i * 50, y=100)
-                canvas.graph.add_vertex(vertex) 
-                canvas.create_vertex_visual(vertex)  
+            vertex = Vertex(i + 1, x=100 + i * 50, y=100)
+            canvas.graph.add_vertex(vertex) 
+            vertices.append(vertex)
 
-        for i, row in enumerate(adjacency_matrix):
-            for j, value in enumerate(row):
-                if value != 0:
-                    start_id = i + 1  
-                    end_id = j + 1  
-                    weight = value  
-
-                    canvas.create_edge_special(start_id, end_id, weight)  
+        edges = [
+            canvas.graph.add_edge(vertices[edge["start"] - 1], vertices[edge["end"] - 1], weight=edge["weight"])
+            for edge in adjacency_matrix.edges() if edge["weight"] != 0
+        ]
+        canvas.add_visuals(vertices, edges)
+        canvas.checkpoint()
 
     except (json.JSONDecodeError, IOError):
         QMessageBox.critical(None, "Ошибка", "Не удалось загрузить файл JSON.")
+    except ValueError as e:
+        QMessageBox.warning(None, "Ошибка", str(e))
 
 def create_graph_from_incidence_matrix(canvas, functional_instance, file_path=None):
     """
@@ -110,23 +137,31 @@ def create_graph_from_incidence_matrix(canvas, functional_instance, file_path=No
             return
 
         weights = data.get("weights", {})
+        report = check_incidence_matrix(incidence_matrix, weights)
+        if any(report.counts[kind] for kind in ("shape", "weight", "weight_key", "weight_value")):
+            QMessageBox.warning(None, "Ошибка", report.summary())
+            return
+        if not report.valid:  # Некорректные столбцы пропускаются, остальные рёбра строятся
+            QMessageBox.warning(None, "Ошибка", report.summary())
 
+        vertices = []
         for i in range(len(incidence_matrix)):
-            vertex_id = i + 1 
-            if vertex_id not in canvas.graph.vertices:  
-                vertex = Vertex(vertex_id, x=100 + i * 50, y=100)  
-                canvas.graph.add_vertex(vertex)  
-                canvas.create_vertex_visual(vertex)  
+            vertex = Vertex(i + 1, x=100 + i * 50, y=100)  
+            canvas.graph.add_vertex(vertex)  
+            vertices.append(vertex)
 
+        edges = {}  # Повторное ребро заменяет вес уже созданного
         for j, column in enumerate(zip(*incidence_matrix)):  
-            nodes = [i + 1 for i, value in enumerate(column) if value != 0]  
+            nodes = [i for i, value in enumerate(column) if value != 0]  
 
             if len(nodes) != 2:
-                QMessageBox.warning(None, "Ошибка", f"Некорректная колонка {j} в матрице инцидентности.")
                 continue
             start, end = nodes[0], nodes[1]  
             weight = weights.get(str(j), 1)  
-            canvas.create_edge_special(start, end, weight)
+            edge = canvas.graph.add_edge(vertices[start], vertices[end], weight=weight)
+            edges[edge] = None
+        canvas.add_visuals(vertices, edges)
+        canvas.checkpoint()
 
     except (json.JSONDecodeError, IOError):
         QMessageBox.critical(None, "Ошибка", "Не удалось загрузить файл JSON.")
@@ -1,6 +1,6 @@
 from PyQt5 import QtWidgets
 from GUI.windows.start_window import Ui_start_window
-from GUI.windows.work_window import Ui_WorkWindow
+from GUI.windows.work_window import Ui_WorkWindow, WorkWindow
 from GUI.windows.settings_window import Ui_SettingsWindow
 
 class StartWindowFunctional:
@@ -15,7 +15,7 @@ class StartWindowFunctional:
 
     def open_work_window(self):
         """Открывает окно для работы с графом."""
-        self.work_window = QtWidgets.QMainWindow()
+        self.work_window = WorkWindow()
         self.ui_work = Ui_WorkWindow()
         self.ui_work.setupUi(self.work_window)
         self.work_window.show()
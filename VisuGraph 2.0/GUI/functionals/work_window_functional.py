@@ -1,10 +1,19 @@
 from PyQt5 import QtWidgets
-import json
+import time
 from PyQt5.QtGui import QColor, QPen, QBrush
 from PyQt5.QtWidgets import QFileDialog, QGraphicsTextItem, QGraphicsLineItem, QMessageBox, QLabel, QDockWidget
 from PyQt5.QtCore import QPointF, Qt
-from Core.graph import Vertex, Edge
+from Algorithms.shortest_paths import PathHighlight, ShortestPathCache
+from Algorithms.spanning_tree import MinimumSpanningForest
+from Algorithms.traversal import traversal_events
+from Algorithms.traversal_animation import TraversalAnimation
+from Core.journal import EditJournal
+from Core.graph_file import fill_graph, graph_data, is_binary_graph_file, load_binary, load_json, save_binary, save_json
 from Core.vizualization import CustomEllipse, Canvas  
+from Core.weight_matrix import SparseMatrix, save_weight_matrix
+
+GRAPH_FILE_FILTER = "JSON Files (*.json);;VisuGraph Binary (*.vgraph)"
+
 
 class WorkWindowFunctional:
     def __init__(self, main_window, ui, canvas):
@@ -31,130 +40,128 @@ class WorkWindowFunctional:
         self.ui.load_graph_action.triggered.connect(self.load_graph)
         self.ui.clear_graph_action.triggered.connect(self.clear_graph)
         self.ui.graph_changing_mode_action.toggled.connect(self.toggle_graph_changing_mode)
+        self.ui.batched_edges_action.toggled.connect(self.canvas.set_batched_edges)
+        self.canvas.batched_edges_changed.connect(self.ui.batched_edges_action.setChecked)
+        self.ui.undo_action.triggered.connect(self.canvas.undo)
+        self.ui.redo_action.triggered.connect(self.canvas.redo)
 
         self.ui.bfs_action.triggered.connect(self.run_bfs)
         self.ui.dfs_action.triggered.connect(self.run_dfs)
         self.ui.dijkstra_action.triggered.connect(self.run_dijkstra)
         self.ui.prim_action.triggered.connect(self.run_prim)
 
+        self.traversal = TraversalAnimation(self.canvas)
+        self.shortest_paths = ShortestPathCache(self.canvas.graph)
+        self.path_highlight = PathHighlight(self.canvas)
+        self.canvas.edit_listeners.append(self.shortest_paths.on_edit)
+        self.spanning_forest = None  # Показываемый минимальный остовный лес или None
+        self.canvas.journal = EditJournal()
+        self.main_window.closing.connect(self.canvas.journal.close)  # Любое закрытие окна удаляет каталог сеанса
+        self.recover_journal()
+
+    def recover_journal(self):
+        """Предлагает восстановить граф из журнала правок, оставшегося от прошлого запуска.
+
+        Журнал прошлого запуска удаляется при любом ответе; восстановленный граф пишется уже в журнал этого окна.
+        """
+        journal = self.canvas.journal
+        if not journal.has_unsaved_work():
+            return
+        answer = QMessageBox.question(
+            self.main_window, "Восстановление", "Найдена несохранённая работа. Восстановить её?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes
+        )
+        if answer == QMessageBox.Yes:
+            try:
+                data, operations = journal.recover()
+                if data is not None:
+                    vertices, edges = fill_graph(self.canvas.graph, data)
+                    del data  # Снимок отображён в память; его каталог удаляется ниже
+                    self.canvas.add_visuals(vertices, edges)
+                for operation in operations:
+                    self.canvas.apply_operation(operation)
+                print(f"Граф восстановлен: применено правок из журнала: {len(operations)}")
+            except Exception as e:
+                print("Ошибка при восстановлении графа:", e)
+                self.canvas.graph.clear()
+                self.canvas.clear_scene()
+        journal.discard_orphan()
+        self.canvas.checkpoint()
+
     def return_to_start_window(self):
         """Возвращает пользователя в стартовое окно."""
         from GUI.functionals.start_window_functional import StartWindowFunctional
         self.start_window = QtWidgets.QMainWindow()
         self.start_window_functional = StartWindowFunctional(self.start_window)
         self.start_window.show()
-        self.main_window.close()
+        self.main_window.close()  # Журнал правок закрывается по сигналу closing
 
     def save_weight_matrix(self):
-        """Сохранение графа как матрицы весов с нулями на главной диагонали и None для отсутствующих рёбер."""
+        """Сохранение графа как разреженной матрицы весов (JSON в формате COO или .npz)."""
         file_path, _ = QFileDialog.getSaveFileName(
-            self.main_window, "Сохранить матрицу весов", "", "JSON Files (*.json)"
+            self.main_window, "Сохранить матрицу весов", "", "JSON Files (*.json);;NumPy Files (*.npz)"
         )
         if not file_path:
             return
-        size = len(self.canvas.graph.vertices)
-        weight_matrix = [[0 if i == j else None for j in range(size)] for i in range(size)]
-
-        for edge in self.canvas.graph.edges:
-            start_idx = edge.start_vertex.id - 1
-            end_idx = edge.end_vertex.id - 1
-            weight_matrix[start_idx][end_idx] = edge.weight
-            weight_matrix[end_idx][start_idx] = edge.weight  
+        size = max(self.canvas.graph.vertices, default=0)
+        store = self.canvas.graph.store
+        ends = store.ids()[store.endpoints()]  # Массивы хранилища: объекты Edge не создаются
+        matrix = SparseMatrix(size, ends[:, 0] - 1, ends[:, 1] - 1, store.weights())
 
         try:
-            with open(file_path, "w", encoding="utf-8") as file:
-                json.dump({"adjacency_matrix": weight_matrix}, file, ensure_ascii=False, indent=4)
+            save_weight_matrix(matrix, file_path)
             print(f"Матрица весов сохранена в файл: {file_path}")
         except Exception as e:
             print("Ошибка при сохранении матрицы весов:", e)
 
     def save_graph(self):
-        """Сохранение графа."""
+        """Сохранение графа в JSON или в двоичный формат (*.vgraph)."""
         file_path, _ = QFileDialog.getSaveFileName(
-            self.main_window, "Сохранить граф", "", "JSON Files (*.json)"
+            self.main_window, "Сохранить граф", "", GRAPH_FILE_FILTER
         )
         if not file_path:
             return
 
-        data = {
-            "vertices": [
-                {
-                    "id": vertex_id,
-                    "params": vertex.default_params,
-                    "position": {
-                        "x": vertex.x,
-                        "y": vertex.y
-                    }
-                }
-                for vertex_id, vertex in self.canvas.graph.vertices.items()
-            ],
-            "edges": [
-                {
-                    "start": edge.start_vertex.id,
-                    "end": edge.end_vertex.id,
-                    "weight": edge.weight,
-                    "params": edge.default_params
-                }
-                for edge in self.canvas.graph.edges
-            ]
-        }
-
         try:
-            with open(file_path, "w", encoding="utf-8") as file:
-                json.dump(data, file, ensure_ascii=False, indent=4)
-            print("Граф успешно сохранён в файл:", file_path)
+            started = time.perf_counter()
+            data = graph_data(self.canvas.graph)
+            if is_binary_graph_file(file_path):
+                save_binary(data, file_path)
+            else:
+                save_json(data, file_path)
+            self.canvas.journal.mark_saved()
+            print(f"Граф успешно сохранён в файл: {file_path} ({time.perf_counter() - started:.3f} с)")
         except Exception as e:
             print("Ошибка при сохранении графа:", e)
 
     def load_graph(self):
-        """Загрузка графа."""
+        """Загрузка графа из JSON или из двоичного формата (*.vgraph)."""
         file_path, _ = QFileDialog.getOpenFileName(
-            self.main_window, "Загрузить граф", "", "JSON Files (*.json)"
+            self.main_window, "Загрузить граф", "", GRAPH_FILE_FILTER
         )
         if not file_path:
             return
 
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                data = json.load(file)
+            started = time.perf_counter()
+            data = load_binary(file_path) if is_binary_graph_file(file_path) else load_json(file_path)
+            loaded = time.perf_counter()
 
             self.clear_graph() 
-
-            for vertex_data in data.get("vertices", []):
-                vertex_id = vertex_data["id"]
-                position = vertex_data["position"]
-                params = vertex_data["params"]
-
-                vertex = Vertex(vertex_id, x=position["x"], y=position["y"])
-                vertex.default_params.update(params)
-                self.canvas.graph.add_vertex(vertex)
-
-                self.canvas.create_vertex_visual(vertex)
-
-            for edge_data in data.get("edges", []):
-                start_id = edge_data["start"]
-                end_id = edge_data["end"]
-                weight = edge_data["weight"]
-                params = edge_data["params"]
-
-                start_vertex = self.canvas.graph.vertices[start_id]
-                end_vertex = self.canvas.graph.vertices[end_id]
-                edge = Edge(start_vertex, end_vertex, weight=weight)
-                edge.default_params.update(params)
-                self.canvas.graph.edges.append(edge)
-
-                self.canvas.create_edge_visual(edge)
-            self.canvas.update()  
-            print("Граф успешно загружен из файла:", file_path)
+            vertices, edges = fill_graph(self.canvas.graph, data)
+            self.canvas.add_visuals(vertices, edges)
+            self.canvas.checkpoint()
+            self.canvas.journal.mark_saved()
+            print(f"Граф успешно загружен из файла: {file_path} "
+                  f"(чтение {loaded - started:.3f} с, построение {time.perf_counter() - loaded:.3f} с)")
         except Exception as e:
             print("Ошибка при загрузке графа:", e)
 
     def clear_graph(self):
         """Очистка графа."""
-        self.canvas.graph.vertices.clear() 
-        self.canvas.graph.edges.clear()  
-        self.canvas.scene.clear()  
-        self.canvas.update()  
+        self.canvas.graph.clear() 
+        self.canvas.clear_scene()  
+        self.canvas.checkpoint()
 
     def toggle_graph_changing_mode(self, active):
         """Переключает режим редактирования графа с обновлением текста кнопки и подсказки."""
@@ -187,18 +194,109 @@ class WorkWindowFunctional:
             "- Зажатая ЛКМ - перемещение вершины\n"
         )
 
+    def request_start_vertex(self, title):
+        """Запрашивает номер начальной вершины; возвращает id или None."""
+        vertices = self.canvas.graph.vertices
+        if not vertices:
+            QMessageBox.warning(self.main_window, "Ошибка", "Граф пуст.")
+            return None
+        vertex_id, ok = QtWidgets.QInputDialog.getInt(
+            self.main_window, title, "Начальная вершина:", min(vertices), min(vertices), max(vertices), 1
+        )
+        if not ok:
+            return None
+        if vertex_id not in vertices:
+            QMessageBox.warning(self.main_window, "Ошибка", f"Вершины {vertex_id} нет в графе.")
+            return None
+        return vertex_id
+
+    def run_traversal(self, order, title):
+        """Запускает обход и его анимацию на холсте."""
+        vertex_id = self.request_start_vertex(title)
+        if vertex_id is None:
+            return
+        speed, ok = QtWidgets.QInputDialog.getInt(
+            self.main_window, title, "Шагов в секунду:", 20, 1, 1000000, 10
+        )
+        if not ok:
+            return
+        self.path_highlight.show([])
+        self.stop_spanning_forest()
+        print(f"Запущен {title} из вершины {vertex_id}")
+        self.traversal.start(traversal_events(self.canvas.graph, vertex_id, order), speed)
+
     def run_bfs(self):
         """Выполнение алгоритма поиска в ширину."""
-        print("Запущен алгоритм поиска в ширину (BFS)")
+        self.run_traversal("bfs", "Поиск в ширину (BFS)")
 
     def run_dfs(self):
         """Выполнение алгоритма поиска в глубину."""
-        print("Запущен алгоритм поиска в глубину (DFS)")
+        self.run_traversal("dfs", "Поиск в глубину (DFS)")
 
     def run_dijkstra(self):
-        """Выполнение алгоритма Дейкстры."""
-        print("Запущен алгоритм Дейкстры")
+        """Выполнение алгоритма Дейкстры: кратчайший путь между двумя вершинами."""
+        source_id = self.request_start_vertex("Алгоритм Дейкстры")
+        if source_id is None:
+            return
+        vertices = self.canvas.graph.vertices
+        target_id, ok = QtWidgets.QInputDialog.getInt(
+            self.main_window, "Алгоритм Дейкстры", "Конечная вершина:", max(vertices), min(vertices), max(vertices), 1
+        )
+        if not ok:
+            return
+        if target_id not in vertices:
+            QMessageBox.warning(self.main_window, "Ошибка", f"Вершины {target_id} нет в графе.")
+            return
+
+        self.traversal.stop()
+        self.traversal.clear_highlight()
+        self.stop_spanning_forest()
+        started = time.perf_counter()
+        try:
+            distance, path = self.shortest_paths.path(source_id, target_id)
+        except ValueError as e:
+            self.path_highlight.show([])
+            QMessageBox.warning(self.main_window, "Ошибка", str(e))
+            return
+        elapsed = time.perf_counter() - started
+        if path is None:
+            self.path_highlight.show([])
+            QMessageBox.information(self.main_window, "Алгоритм Дейкстры",
+                                    f"Вершина {target_id} недостижима из вершины {source_id}.")
+            return
+        self.path_highlight.show(path)
+        print(f"Алгоритм Дейкстры: путь {' -> '.join(map(str, path))}, длина {distance:g} ({elapsed:.3f} с)")
 
     def run_prim(self):
-        """Выполнение алгоритма Прима."""
-        print("Запущен алгоритм Прима")
+        """Выполнение алгоритма Прима: остовный лес выделяется и обновляется при правках графа."""
+        if not self.canvas.graph.vertices:
+            QMessageBox.warning(self.main_window, "Ошибка", "Граф пуст.")
+            return
+        self.traversal.stop()
+        self.traversal.clear_highlight()
+        self.path_highlight.show([])
+        self.stop_spanning_forest()
+
+        started = time.perf_counter()
+        self.spanning_forest = MinimumSpanningForest(self.canvas.graph, on_change=self.update_spanning_forest)
+        self.canvas.edit_listeners.append(self.on_spanning_forest_edit)
+        print(f"Алгоритм Прима: вес остовного леса {self.spanning_forest.weight:g} "
+              f"({time.perf_counter() - started:.3f} с)")
+
+    def on_spanning_forest_edit(self, operation):
+        self.spanning_forest.on_edit(operation)
+        print(f"Алгоритм Прима: вес остовного леса {self.spanning_forest.weight:g}")
+
+    def update_spanning_forest(self, added, removed):
+        """Перерисовывает только рёбра, вошедшие в лес или покинувшие его."""
+        for keys, highlighted in ((removed, False), (added, True)):
+            for key in keys:
+                self.path_highlight.set_edge(key, highlighted)
+
+    def stop_spanning_forest(self):
+        """Прекращает поддержку остовного леса и снимает его выделение."""
+        if self.spanning_forest is None:
+            return
+        self.canvas.edit_listeners.remove(self.on_spanning_forest_edit)
+        self.update_spanning_forest(set(), self.spanning_forest.edge_keys())
+        self.spanning_forest = None
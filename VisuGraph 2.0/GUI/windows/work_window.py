@@ -9,6 +9,16 @@ from GUI.creating.creating_graph import (
     create_graph_from_incidence_matrix,
 )
 
+class WorkWindow(QtWidgets.QMainWindow):
+    """Окно работы с графом; сообщает о закрытии, чтобы журнал правок закрылся штатно."""
+
+    closing = QtCore.pyqtSignal()
+
+    def closeEvent(self, event):
+        self.closing.emit()
+        super().closeEvent(event)
+
+
 class Ui_WorkWindow(object):
     def setupUi(self, MainWindow):
         MainWindow.setObjectName("MainWindow")
@@ -50,17 +60,28 @@ class Ui_WorkWindow(object):
         self.load_graph_action = QtWidgets.QAction("Загрузить граф", MainWindow)
         self.clear_graph_action = QtWidgets.QAction("Очистить", MainWindow)
         self.return_to_menu_action = QtWidgets.QAction("В главное меню", MainWindow)
+        self.undo_action = QtWidgets.QAction("Отменить", MainWindow)
+        self.undo_action.setShortcut(QtGui.QKeySequence.Undo)
+        self.redo_action = QtWidgets.QAction("Повторить", MainWindow)
+        self.redo_action.setShortcut(QtGui.QKeySequence.Redo)
 
         self.action_menu.addAction(self.save_graph_action)
         self.action_menu.addAction(self.save_weight_matrix_action)
         self.action_menu.addAction(self.load_graph_action)
         self.action_menu.addAction(self.clear_graph_action)
+        self.action_menu.addAction(self.undo_action)
+        self.action_menu.addAction(self.redo_action)
         self.action_menu.addAction(self.return_to_menu_action)
 
         self.graph_changing_mode_action = QtWidgets.QAction("Режим редактирования графа ❌", MainWindow)
         self.graph_changing_mode_action.setCheckable(True)
         self.graph_changing_mode_action.setObjectName("graph_changing_mode_action")
 
+        self.batched_edges_action = QtWidgets.QAction("Пакетная отрисовка рёбер", MainWindow)
+        self.batched_edges_action.setCheckable(True)
+        self.batched_edges_action.setObjectName("batched_edges_action")
+        self.action_menu.addAction(self.batched_edges_action)
+
         self.algorithms_menu = QtWidgets.QMenu(self.menubar)
         self.algorithms_menu.setTitle("Алгоритмы")
         self.algorithms_menu.setObjectName("algorithms_menu")
@@ -70,6 +91,9 @@ class Ui_WorkWindow(object):
         self.dijkstra_action = QtWidgets.QAction("Алгоритм Дейкстры", MainWindow)
         self.prim_action = QtWidgets.QAction("Алгоритм Прима", MainWindow)
         self.sacred_algorithm_action = QtWidgets.QAction("Sacred Algorithm", MainWindow)  
+        self.sacred_pause_action = QtWidgets.QAction("Пауза", MainWindow)
+        self.sacred_resume_action = QtWidgets.QAction("Продолжить", MainWindow)
+        self.sacred_cancel_action = QtWidgets.QAction("Остановить", MainWindow)
 
         self.algorithms_menu.addAction(self.bfs_action)
         self.algorithms_menu.addAction(self.dfs_action)
@@ -77,7 +101,15 @@ class Ui_WorkWindow(object):
         self.algorithms_menu.addAction(self.prim_action)
         self.algorithms_menu.addAction(self.sacred_algorithm_action)
 
+        self.sacred_control_menu = self.algorithms_menu.addMenu("Управление Sacred Algorithm")
+        self.sacred_control_menu.addAction(self.sacred_pause_action)
+        self.sacred_control_menu.addAction(self.sacred_resume_action)
+        self.sacred_control_menu.addAction(self.sacred_cancel_action)
+
         self.sacred_algorithm_action.triggered.connect(self.sacred_algorithm.sacred_algorithm_calling)
+        self.sacred_pause_action.triggered.connect(self.sacred_algorithm.pause)
+        self.sacred_resume_action.triggered.connect(self.sacred_algorithm.resume)
+        self.sacred_cancel_action.triggered.connect(self.sacred_algorithm.cancel)
 
         self.create_graph_menu = QtWidgets.QMenu(self.menubar)
         self.create_graph_menu.setTitle("Создать граф")
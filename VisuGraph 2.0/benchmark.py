@@ -0,0 +1,198 @@
+"""Замеры производительности VisuGraph на сгенерированных графах.
+
+Для каждого генератора из Core.generators и каждого размера (вершин и
+рёбер вместе) отдельно измеряются: три загрузчика из creating_graph.py,
+сохранение и загрузка графа в JSON и двоичном формате, отрисовка сцены
+(обычная и с пакетными рёбрами) и итерации SacredAlgorithm. Qt работает
+на платформе offscreen, окно не показывается. Результат - JSON, поэтому
+прогоны можно сравнивать между собой.
+
+    python benchmark.py --sizes 100 1000 10000 --output results.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PyQt5 import QtCore, QtWidgets
+
+from Algorithms.layout import SacredLayout
+from Core.generators import GENERATORS, generated_graph
+from Core.graph import Graph
+from Core.graph_file import fill_graph, graph_data, load_binary, load_json, save_binary, save_json
+from Core.vizualization import Canvas
+from Core.weight_matrix import SparseMatrix, save_weight_matrix
+from GUI.creating.creating_graph import (
+    create_graph_from_adjacency_matrix,
+    create_graph_from_edge_list,
+    create_graph_from_incidence_matrix,
+)
+
+DEFAULT_SIZES = (100, 1000, 10000)
+INCIDENCE_MAX_CELLS = 4000000  # Плотная матрица инцидентности больше этого не записывается
+SACRED_MAX_VERTICES = 20000
+SACRED_ITERATIONS = 3
+CANVAS_SIZE = (1600, 900)
+
+
+def adjacency_matrix(graph):
+    """Разреженная матрица смежности сгенерированного графа (каждая пара один раз)"""
+    return SparseMatrix(graph.size, graph.starts - 1, graph.ends - 1, graph.weights)
+
+
+def prepared_layout(matrix, seed):
+    """SacredLayout с уже готовым движком итераций (см. SacredLayout.prepare)"""
+    layout = SacredLayout(matrix, SACRED_ITERATIONS, 1.0, seed)
+    layout.prepare()
+    return layout
+
+
+class BenchmarkFunctional:
+    """Очистка графа для загрузчиков creating_graph без окна и журнала правок (как WorkWindowFunctional.clear_graph)."""
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+
+    def clear_graph(self):
+        self.canvas.graph.clear()
+        self.canvas.clear_scene()
+        self.canvas.checkpoint()
+
+
+class Benchmark:
+    """Прогон замеров; results - список записей {"graph", "elements", "vertices", "edges", "stage", "seconds"}"""
+
+    def __init__(self, directory, seed=0):
+        self.directory = directory
+        self.seed = seed
+        self.results = []
+        self.canvas = Canvas(Graph())
+        self.canvas.resize(*CANVAS_SIZE)
+        self.canvas.show()
+        self.functional = BenchmarkFunctional(self.canvas)
+
+    def timed(self, record, stage, function, *args):
+        started = time.perf_counter()
+        value = function(*args)
+        seconds = time.perf_counter() - started
+        self.results.append(dict(record, stage=stage, seconds=round(seconds, 6)))
+        print(f"{record['graph']:>16} {record['elements']:>8} {stage:<22} {seconds:10.4f} с", file=sys.stderr)
+        return value
+
+    def skipped(self, record, stage, reason):
+        self.results.append(dict(record, stage=stage, seconds=None, skipped=reason))
+
+    def run(self, name, elements):
+        graph = generated_graph(name, elements, self.seed)
+        record = {"graph": name, "elements": elements, "vertices": graph.size, "edges": len(graph)}
+        paths = self.write_files(graph)
+
+        self.timed(record, "load_edge_list", create_graph_from_edge_list, self.canvas, self.functional,
+                   paths["edge_list"])
+        self.timed(record, "load_adjacency_matrix", create_graph_from_adjacency_matrix, self.canvas,
+                   self.functional, paths["adjacency_matrix"])
+        if "incidence_matrix" in paths:
+            self.timed(record, "load_incidence_matrix", create_graph_from_incidence_matrix, self.canvas,
+                       self.functional, paths["incidence_matrix"])
+        else:
+            self.skipped(record, "load_incidence_matrix", "матрица инцидентности слишком велика")
+
+        for stage, save, load, extension in (("json", save_json, load_json, ".json"),
+                                             ("binary", save_binary, load_binary, ".vgraph")):
+            path = os.path.join(self.directory, f"{name}_{elements}_graph{extension}")
+            self.timed(record, f"save_{stage}", lambda: save(graph_data(self.canvas.graph), path))
+            self.timed(record, f"load_{stage}", self.load_graph, load, path)
+
+        self.timed(record, "paint", self.paint)
+        self.canvas.set_batched_edges(True)
+        self.timed(record, "paint_batched", self.paint)
+        self.canvas.set_batched_edges(False)
+
+        if graph.size <= SACRED_MAX_VERTICES:
+            matrix = adjacency_matrix(graph)
+            layout = self.timed(record, "sacred_setup", prepared_layout, matrix, self.seed)
+            started = time.perf_counter()
+            for _ in range(SACRED_ITERATIONS):
+                layout.step()
+            seconds = (time.perf_counter() - started) / SACRED_ITERATIONS
+            self.results.append(dict(record, stage="sacred_iteration", seconds=round(seconds, 6)))
+        else:
+            self.skipped(record, "sacred_setup", "граф больше SACRED_MAX_VERTICES")
+            self.skipped(record, "sacred_iteration", "граф больше SACRED_MAX_VERTICES")
+
+    def write_files(self, graph):
+        """Файлы для загрузчиков: список рёбер, разреженная матрица смежности и (для малых графов) матрица инцидентности"""
+        prefix = os.path.join(self.directory, f"{graph.name}_{graph.size}")
+        paths = {"edge_list": prefix + "_edges.json", "adjacency_matrix": prefix + "_adjacency.json"}
+        with open(paths["edge_list"], "w", encoding="utf-8") as file:
+            json.dump({"edges": graph.edges()}, file)
+        save_weight_matrix(adjacency_matrix(graph), paths["adjacency_matrix"])
+
+        if graph.size * len(graph) <= INCIDENCE_MAX_CELLS:
+            incidence = np.zeros((graph.size, len(graph)), dtype=np.int64)
+            columns = np.arange(len(graph))
+            incidence[graph.starts - 1, columns] = 1
+            incidence[graph.ends - 1, columns] = 1
+            paths["incidence_matrix"] = prefix + "_incidence.json"
+            with open(paths["incidence_matrix"], "w", encoding="utf-8") as file:
+                json.dump({"incidence_matrix": incidence.tolist(),
+                           "weights": {str(j): int(weight) for j, weight in enumerate(graph.weights.tolist())}}, file)
+        return paths
+
+    def load_graph(self, load, path):
+        """То же, что WorkWindowFunctional.load_graph, без диалога выбора файла"""
+        data = load(path)
+        self.functional.clear_graph()
+        vertices, edges = fill_graph(self.canvas.graph, data)
+        self.canvas.add_visuals(vertices, edges)
+
+    def paint(self):
+        """Отрисовка всего графа в окне холста"""
+        self.canvas.fit_to_view()
+        self.canvas.viewport().grab()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры производительности VisuGraph")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="число вершин и рёбер вместе, от 100 до 1000000")
+    parser.add_argument("--graphs", nargs="+", default=GENERATORS, choices=GENERATORS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="файл для JSON с результатами (по умолчанию - стандартный вывод)")
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as directory:
+        benchmark = Benchmark(directory, args.seed)
+        for elements in args.sizes:
+            for name in args.graphs:
+                benchmark.run(name, elements)
+                app.processEvents()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "qt": QtCore.QT_VERSION_STR,
+            "seed": args.seed,
+            "sizes": args.sizes,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": benchmark.results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=4)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=4)
+
+
+if __name__ == "__main__":
+    main()
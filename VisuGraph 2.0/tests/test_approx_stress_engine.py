@@ -0,0 +1,31 @@
+import os
+
+import numpy as np
+import pytest
+
+from Algorithms.layout import SacredLayout, load_adjacency_matrix
+from Core.generators import generated_graph
+from Core.weight_matrix import SparseMatrix
+
+EXAMPLE_MATRIX = os.path.join(os.path.dirname(__file__), os.pardir, "Examples", "adjacency_matrix.json")
+
+
+def generated_matrix(name, elements):
+    graph = generated_graph(name, elements, seed=0)
+    return SparseMatrix(graph.size, graph.starts - 1, graph.ends - 1, graph.weights)
+
+
+@pytest.mark.parametrize("matrix", [
+    load_adjacency_matrix(EXAMPLE_MATRIX),
+    generated_matrix("barabasi_albert", 1000),
+    generated_matrix("grid", 1000),
+], ids=["example", "barabasi_albert", "grid"])
+def test_approx_mode_converges_at_alpha_one(matrix):
+    """Приближённый режим с alpha=1 (значение диалога) не расходится, а уменьшает ошибку"""
+    layout = SacredLayout(matrix, iterations=20, alpha=1.0, seed=1, mode="approx")
+    result = layout.run()
+    final_error = layout.engine.error(result.positions)
+
+    assert np.isfinite(result.positions).all()
+    assert np.isfinite(result.errors).all()
+    assert final_error < result.errors[0] / 10
@@ -0,0 +1,62 @@
+import numpy as np
+
+from Core.graph import Graph, Vertex
+from Core.vizualization import Canvas
+
+
+def batched_canvas(vertex_count):
+    graph = Graph()
+    for vertex_id in range(1, vertex_count + 1):
+        graph.add_vertex(Vertex(vertex_id, x=vertex_id * 50, y=vertex_id % 3 * 70))
+    canvas = Canvas(graph)
+    canvas.set_batched_edges(True)
+    canvas.add_visuals(list(graph.vertices.values()), [])
+    return canvas
+
+
+def assert_batches_match_store(canvas):
+    batches, store = canvas.edge_batches, canvas.graph.store
+    assert sum(batch.count for batch in batches.batches.values()) == store.edge_count
+    for batch in batches.batches.values():
+        rows = batch.rows[:batch.count]
+        assert all(batches.batch_of[row] is batch for row in rows.tolist())
+        assert (batches.slot_of[rows] == np.arange(batch.count)).all()
+        assert np.array_equal(batch.coords, batch.row_coords(rows))
+
+
+def test_add_edges_keeps_last_weight_and_reports_reweighted_rows(qapp):
+    graph = batched_canvas(4).graph
+    graph.add_edge(graph.vertices[1], graph.vertices[2], weight=5)
+
+    new_rows, reweighted = graph.add_edges(np.array([2, 3, 4, 3]), np.array([1, 4, 4, 4]),
+                                           np.array([7.0, 1.0, 2.0, 3.5]))
+
+    assert new_rows.tolist() == [1, 2]
+    assert reweighted.tolist() == [0]
+    assert graph.store.edge_views[1:] == [None, None]  # Объекты Edge создаются только по запросу
+    assert graph.get_edge(1, 2).weight == 7
+    assert graph.get_edge(4, 3).weight == 3.5
+    assert graph.get_edge(4, 4).weight == 2
+
+
+def test_batches_follow_rows_moved_by_removal(qapp):
+    canvas = batched_canvas(6)
+    graph = canvas.graph
+    starts, ends = np.array([1, 1, 2, 3, 4, 5]), np.array([2, 3, 4, 5, 6, 6])
+    new_rows, _ = graph.add_edges(starts, ends, np.arange(1.0, 7.0))
+    canvas.add_visuals([], [], new_rows)
+    highlighted = graph.get_edge(5, 6)
+    highlighted.set_highlighted(True)
+    canvas.apply_edge_style(highlighted)
+    assert len(canvas.edge_batches.batches) == 2
+
+    canvas.execute({"op": "remove_edge", "start": 1, "end": 2, "weight": 1})
+    assert_batches_match_store(canvas)
+    canvas.execute({"op": "remove_vertex", "id": 3, "x": 150, "y": 0, "edges": [[1, 3, 2], [3, 5, 4]]})
+    assert_batches_match_store(canvas)
+    canvas.move_vertices([graph.vertices[6]], [(10, 20)])
+    assert_batches_match_store(canvas)
+
+    assert canvas.edge_batches.batches[highlighted.style].count == 1
+    assert canvas.edge_batches.edge_at(canvas.edge_batches.batches[highlighted.style].lines[0].center()) \
+        is highlighted
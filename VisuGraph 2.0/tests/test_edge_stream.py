@@ -0,0 +1,47 @@
+import json
+
+import numpy as np
+import pytest
+
+from Core import edge_stream
+from Core.edge_stream import EdgeStreamReader
+
+EDGES = [(1, 2, 1.5), (2, 3, 1.0), (3, 4, 2.0), (4, 5, 1.0), (50, 1, 0.5)]
+
+# Те же рёбра и две некорректные записи (без конца и с нечисловым началом)
+FILES = {
+    "edges.json": json.dumps({"name": "edges", "edges": [
+        {"start": 1, "end": 2, "weight": 1.5}, {"start": 2, "end": 3}, {"start": 7},
+        {"start": 3, "end": 4, "weight": 2}, {"start": "x", "end": 1}, {"start": 4, "end": 5, "weight": ""},
+        {"start": 50, "end": 1, "weight": 0.5}]}, indent=1),
+    "edges.ndjson": '{"start": 1, "end": 2, "weight": 1.5}\n{"start": 2, "end": 3}\n\n{"start": 7}\n'
+                    '{"start": 3, "end": 4, "weight": 2}\n{"start": "x", "end": 1}\n'
+                    '{"start": 4, "end": 5}\n{"start": 50, "end": 1, "weight": 0.5}\n',
+    "edges.csv": "weight,start,end\n1.5,1,2\n,2,3\n,7,\n2,3,4\nx,x,1\n1,4,5\n0.5,50,1\n",
+}
+
+
+@pytest.mark.parametrize("name", sorted(FILES))
+@pytest.mark.parametrize("read_size", [7, 1 << 20])
+def test_chunks_split_edges_at_chunk_size_across_read_blocks(tmp_path, monkeypatch, name, read_size):
+    monkeypatch.setattr(edge_stream, "READ_SIZE", read_size)  # Записи и ключ "edges" режутся границами блоков
+    path = tmp_path / name
+    path.write_text(FILES[name], encoding="utf-8")
+    reader = EdgeStreamReader(str(path), chunk_size=2)
+
+    chunks = list(reader.chunks())
+
+    assert [len(starts) for starts, _, _ in chunks] == [2, 2, 1]
+    starts, ends, weights = (np.concatenate(column) for column in zip(*chunks))
+    assert list(zip(starts.tolist(), ends.tolist(), weights.tolist())) == EDGES
+    assert reader.edges_read == 5
+    assert reader.skipped == 2
+    assert 0 < reader.bytes_read <= reader.total_bytes  # JSON после "]" может быть не дочитан
+
+
+def test_unclosed_edges_array_is_reported(tmp_path):
+    path = tmp_path / "edges.json"
+    path.write_text('{"edges": [{"start": 1, "end": 2}, {"start": 2, ', encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        list(EdgeStreamReader(str(path)).chunks())
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from Core.graph import Graph, Vertex
+from Core.graph_file import fill_graph, graph_data, is_binary_graph_file, load_binary, load_json, save_binary, save_json
+
+
+def styled_graph():
+    """Граф со своими стилями, рёбрами без объектов Edge и строками, переставленными удалением"""
+    graph = Graph()
+    for vertex_id in (1, 2, 3, 4, 7):
+        graph.add_vertex(Vertex(vertex_id, x=vertex_id * 10.5, y=-vertex_id))
+    graph.vertices[3].update_custom_params(color="red")
+    graph.add_edge(graph.vertices[3], graph.vertices[4], weight=2).update_custom_params(thickness=5)
+    graph.add_edges(np.array([1, 2, 3]), np.array([2, 3, 7]), np.array([0.25, 4.0, 1.0]))
+    graph.remove_vertex(1)
+    return graph
+
+
+def graph_state(graph):
+    vertices = {vertex_id: (vertex.x, vertex.y, vertex.params) for vertex_id, vertex in graph.vertices.items()}
+    edges = {graph.edge_key(edge.start_vertex.id, edge.end_vertex.id): (edge.weight, edge.params)
+             for edge in graph.edges}
+    return vertices, edges
+
+
+@pytest.mark.parametrize("save, load, name", [(save_binary, load_binary, "graph.vgraph"),
+                                              (save_json, load_json, "graph.json")])
+def test_graph_survives_save_and_load(tmp_path, save, load, name):
+    graph = styled_graph()
+    path = str(tmp_path / name)
+
+    save(graph_data(graph), path)
+    data = load(path)
+    restored = Graph()
+    vertices, edges = fill_graph(restored, data)
+    del data
+
+    assert is_binary_graph_file(path) == (load is load_binary)
+    assert [vertex.id for vertex in vertices] == graph.store.ids().tolist()
+    assert len(edges) == graph.store.edge_count
+    assert graph_state(restored) == graph_state(graph)
+    assert restored.vertices[3].params["color"] == "red"
+    assert restored.get_edge(4, 3).params["thickness"] == 5
@@ -0,0 +1,79 @@
+import os
+
+from Core.graph import Graph
+from Core.graph_file import fill_graph
+from Core.journal import EditJournal
+from Core.vizualization import Canvas
+
+
+def crash(journal):
+    """Бросает сеанс, как аварийно завершившийся процесс: файлы закрыты, каталог остаётся"""
+    journal._close_file()
+    journal._lock_file.close()
+
+
+def test_session_being_created_is_not_taken_for_abandoned(tmp_path):
+    creating = tmp_path / "creating"
+    creating.mkdir()
+    (creating / "lock").touch()  # Владелец ещё не взял блокировку и не записал pid
+    (creating / "journal.ndjson").write_text('{"op":"add_vertex","id":1,"x":0,"y":0}\n')
+
+    journal = EditJournal(str(tmp_path))
+    assert not journal.has_unsaved_work()
+    assert creating.exists()
+    journal.close()
+
+
+def test_abandoned_session_is_found_and_closed_session_removed(tmp_path):
+    abandoned = EditJournal(str(tmp_path))
+    abandoned.record({"op": "add_vertex", "id": 1, "x": 0, "y": 0})
+    crash(abandoned)
+
+    journal = EditJournal(str(tmp_path))
+    with open(os.path.join(journal.session_dir, "lock")) as lock:
+        assert lock.read() == str(os.getpid())
+    assert journal.has_unsaved_work()
+    assert journal.recover()[1] == [{"op": "add_vertex", "id": 1, "x": 0, "y": 0}]
+
+    journal.close()
+    assert os.listdir(tmp_path) == []
+
+
+def graph_state(graph):
+    """Вершины с координатами и рёбра с весами в виде, не зависящем от порядка строк"""
+    vertices = {vertex_id: (vertex.x, vertex.y) for vertex_id, vertex in graph.vertices.items()}
+    edges = {graph.edge_key(edge.start_vertex.id, edge.end_vertex.id): edge.weight for edge in graph.edges}
+    return vertices, edges
+
+
+def test_undo_redo_and_replay_after_crash_restore_the_graph(tmp_path, qapp):
+    canvas = Canvas(Graph())
+    canvas.journal = EditJournal(str(tmp_path), compact_every=4)
+    for vertex_id in (1, 2, 3):
+        canvas.execute({"op": "add_vertex", "id": vertex_id, "x": vertex_id * 10, "y": 0})
+    canvas.execute({"op": "add_edge", "start": 1, "end": 2, "weight": 5})  # Здесь журнал сжимается в снимок
+    canvas.execute({"op": "add_edge", "start": 2, "end": 3, "weight": 7})
+    canvas.execute({"op": "move_vertex", "id": 3, "from": [30, 0], "to": [30, 40]})
+    canvas.execute({"op": "remove_vertex", "id": 1, "x": 10, "y": 0, "edges": [[1, 2, 5]]})
+
+    canvas.undo()
+    assert graph_state(canvas.graph) == ({1: (10, 0), 2: (20, 0), 3: (30, 40)}, {(1, 2): 5, (2, 3): 7})
+    canvas.undo()
+    assert canvas.graph.vertices[3].y == 0
+    canvas.redo()
+    expected = graph_state(canvas.graph)
+    assert expected == ({1: (10, 0), 2: (20, 0), 3: (30, 40)}, {(1, 2): 5, (2, 3): 7})
+
+    crash(canvas.journal)
+    journal = EditJournal(str(tmp_path))
+    assert journal.has_unsaved_work()
+    data, operations = journal.recover()
+    assert data is not None and len(operations) == 6
+
+    restored = Canvas(Graph())
+    restored.add_visuals(*fill_graph(restored.graph, data))
+    del data
+    for operation in operations:
+        restored.apply_operation(operation)
+    assert graph_state(restored.graph) == expected
+    journal.close()
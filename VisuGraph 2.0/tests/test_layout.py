@@ -0,0 +1,39 @@
+import numpy as np
+
+import Algorithms.layout
+from Algorithms.layout import SacredLayout
+from Core.generators import barabasi_albert_graph
+from Core.weight_matrix import SparseMatrix
+
+
+def barabasi_albert_matrix(size):
+    graph = barabasi_albert_graph(size, seed=0)
+    return SparseMatrix(graph.size, graph.starts - 1, graph.ends - 1, graph.weights)
+
+
+def test_multilevel_start_is_finite_at_large_alpha():
+    """Наибольший alpha диалога не уводит многоуровневое начало в бесконечность"""
+    layout = SacredLayout(barabasi_albert_matrix(600), iterations=5, alpha=100.0, seed=1, multilevel=True)
+    assert np.isfinite(layout.positions).all()
+
+    result = layout.run()
+    assert np.isfinite(result.positions).all()
+
+
+def test_diverged_multilevel_start_falls_back_to_random(monkeypatch):
+    monkeypatch.setattr(Algorithms.layout, "multilevel_positions",
+                        lambda size, *args: np.full((size, 2), np.nan))
+    layout = SacredLayout(barabasi_albert_matrix(60), alpha=1.0, seed=1, width=100, height=50, multilevel=True)
+
+    assert np.isfinite(layout.positions).all()
+    assert (layout.positions >= 0).all() and (layout.positions <= [100, 50]).all()
+
+
+def test_best_positions_skip_non_finite():
+    layout = SacredLayout(barabasi_albert_matrix(60), seed=1)
+    start = layout.positions
+    layout.remember_best(1.0, start)
+    layout.remember_best(0.0, np.full_like(start, np.inf))
+
+    assert layout.best_error == 1.0
+    assert layout.best_positions is start
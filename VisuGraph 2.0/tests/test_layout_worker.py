@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+
+from Algorithms.layout import SacredLayout, load_adjacency_matrix
+from Algorithms.layout_worker import LayoutWorker
+
+EXAMPLE_MATRIX = os.path.join(os.path.dirname(__file__), os.pardir, "Examples", "adjacency_matrix.json")
+
+
+def run_worker(layout):
+    """Выполняет LayoutWorker.run в текущем потоке; возвращает worker и число сигналов finished"""
+    worker = LayoutWorker(layout)
+    finished = []
+    worker.finished.connect(lambda: finished.append(True))
+    worker.run()
+    return worker, len(finished)
+
+
+def example_layout():
+    layout = SacredLayout(load_adjacency_matrix(EXAMPLE_MATRIX), iterations=5, seed=1)
+    layout.prepare()
+    return layout
+
+
+def test_diverged_positions_are_not_snapshotted():
+    layout = example_layout()
+    layout.engine.step = lambda positions: np.full_like(positions, np.inf)
+    worker, finished = run_worker(layout)
+
+    assert worker.take_snapshot() is None
+    assert finished == 1
+    assert layout.stop_reason == SacredLayout.STOP_DIVERGED
+    assert np.isfinite(layout.positions).all()
+
+
+def test_finished_is_emitted_after_an_exception():
+    layout = example_layout()
+
+    def failing_step(positions):
+        raise RuntimeError("step failed")
+
+    layout.engine.step = failing_step
+    _, finished = run_worker(layout)
+
+    assert finished == 1
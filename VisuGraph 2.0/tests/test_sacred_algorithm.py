@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+
+from Algorithms.layout import SacredLayout, load_adjacency_matrix
+from Algorithms.sacred_algorihm import SacredAlgorithm
+from Algorithms.shortest_paths import ShortestPathCache
+from Algorithms.spanning_tree import MinimumSpanningForest
+from Core.graph import Graph
+from Core.vizualization import Canvas
+
+EXAMPLE_MATRIX = os.path.join(os.path.dirname(__file__), os.pardir, "Examples", "adjacency_matrix.json")
+
+
+def example_scene():
+    canvas = Canvas(Graph())
+    algorithm = SacredAlgorithm(canvas)
+    algorithm.canvas_width, algorithm.canvas_height = 800, 600
+    algorithm.layout = SacredLayout(load_adjacency_matrix(EXAMPLE_MATRIX), seed=1)
+    algorithm.build_scene()
+    return canvas, algorithm
+
+
+def test_move_scene_ignores_non_finite_positions(qapp):
+    canvas, algorithm = example_scene()
+    before = [(vertex.x, vertex.y) for vertex in algorithm.layout_vertices]
+    weights = [edge.weight for edge in algorithm.layout_edges]
+
+    positions = algorithm.layout.positions.copy()
+    positions[0] = np.nan
+    algorithm.move_scene(positions)
+    algorithm.move_scene(algorithm.layout.positions * 1e200)  # Квадраты длин рёбер переполняются до inf
+
+    assert [(vertex.x, vertex.y) for vertex in algorithm.layout_vertices] == before
+    assert [edge.weight for edge in algorithm.layout_edges] == weights
+
+
+def test_move_scene_keeps_path_cache_and_spanning_forest_current(qapp):
+    canvas, algorithm = example_scene()
+    graph = canvas.graph
+    paths = ShortestPathCache(graph)
+    forest = MinimumSpanningForest(graph)
+    canvas.edit_listeners += [paths.on_edit, forest.on_edit]
+    source = algorithm.layout.vertex_ids[0]
+    paths.tree(source)
+
+    positions = algorithm.layout.positions.copy()
+    positions[:, 0] *= np.linspace(0.2, 3, len(positions))  # Длины рёбер, а с ними и веса, меняются
+    algorithm.move_scene(positions)
+
+    assert [edge.weight for edge in algorithm.layout_edges] == \
+        [round(distance) for distance in algorithm.edge_lengths(positions).tolist()]
+    assert paths.tree(source).distance == ShortestPathCache(graph).tree(source).distance
+    assert forest.weight == MinimumSpanningForest(graph).weight
@@ -0,0 +1,56 @@
+import pytest
+
+from Algorithms.shortest_paths import ShortestPathCache
+from Core.graph import Graph, Vertex
+
+
+def path_graph(*weights):
+    """Путь 1 - 2 - ... с заданными весами рёбер"""
+    graph = Graph()
+    for vertex_id in range(1, len(weights) + 2):
+        graph.add_vertex(Vertex(vertex_id))
+    for vertex_id, weight in enumerate(weights, 1):
+        graph.add_edge(graph.vertices[vertex_id], graph.vertices[vertex_id + 1], weight=weight)
+    return graph
+
+
+def test_negative_weight_is_rejected_when_a_path_is_requested():
+    graph = path_graph(2, 3)
+    cache = ShortestPathCache(graph)
+    assert cache.path(1, 3) == (5, [1, 2, 3])
+
+    operation = {"op": "reweight_edge", "start": 2, "end": 3, "from": 3, "to": -4}
+    graph.get_edge(2, 3).weight = -4
+    cache.on_edit(operation)
+
+    with pytest.raises(ValueError, match="отрицательный вес"):
+        cache.path(1, 3)
+    assert 1 not in cache.trees
+
+
+def test_only_edits_that_can_change_a_tree_drop_it():
+    graph = path_graph(2, 3, 4)
+    graph.add_vertex(Vertex(5))
+    cache = ShortestPathCache(graph)
+    tree = cache.tree(1)
+
+    graph.add_edge(graph.vertices[1], graph.vertices[3], weight=10)
+    cache.on_edit({"op": "add_edge", "start": 1, "end": 3, "weight": 10})  # Не короче пути 1 - 2 - 3
+    graph.get_edge(1, 3).weight = 12
+    cache.on_edit({"op": "reweight_edge", "start": 1, "end": 3, "from": 10, "to": 12})
+    cache.on_edit({"op": "move_vertex", "id": 3, "from": [0, 0], "to": [5, 5]})
+    assert cache.tree(1) is tree
+
+    graph.get_edge(1, 2).weight = 1
+    cache.on_edit({"op": "reweight_edge", "start": 1, "end": 2, "from": 2, "to": 1})  # Ребро дерева стало легче
+    assert 1 not in cache.trees
+    assert cache.path(1, 4) == (8, [1, 2, 3, 4])
+
+    graph.add_edge(graph.vertices[4], graph.vertices[5], weight=1)
+    cache.on_edit({"op": "add_edge", "start": 4, "end": 5, "weight": 1})  # Новая вершина стала достижимой
+    assert 1 not in cache.trees
+    assert cache.path(1, 5) == (9, [1, 2, 3, 4, 5])
+
+    graph.add_edge(graph.vertices[1], graph.vertices[4], weight=2)
+    cache.on_edit({"op": "add_edge", "start": 1, "end": 4, "weight": 2})
+    assert cache.path(1, 5) == (3, [1, 4, 5])
@@ -0,0 +1,59 @@
+import random
+
+from Algorithms.spanning_tree import MinimumSpanningForest
+from Core.graph import Graph
+from Core.vizualization import Canvas
+
+
+def tracked_canvas(vertex_count):
+    """Холст без рёбер и лес, который обновляется его правками"""
+    canvas = Canvas(Graph())
+    for vertex_id in range(1, vertex_count + 1):
+        canvas.execute({"op": "add_vertex", "id": vertex_id, "x": vertex_id * 20, "y": 0})
+    forest = MinimumSpanningForest(canvas.graph)
+    canvas.edit_listeners.append(forest.on_edit)
+    return canvas, forest
+
+
+def assert_minimum(forest):
+    graph = forest.graph
+    assert forest.weight == MinimumSpanningForest(graph).weight
+    for start, end in forest.edge_keys():
+        assert graph.get_edge(start, end).weight == forest.tree[start][end]
+
+
+def test_forest_follows_edge_insertions_and_removals(qapp):
+    random.seed(3)
+    canvas, forest = tracked_canvas(12)
+    for _ in range(60):
+        start, end = random.sample(range(1, 13), 2)
+        edge = canvas.graph.get_edge(start, end)
+        if edge is not None and random.random() < 0.4:
+            canvas.execute(canvas.remove_edge_operation(edge))
+        else:
+            canvas.execute({"op": "add_edge", "start": start, "end": end, "weight": random.randint(1, 20)})
+        assert_minimum(forest)
+
+    canvas.execute({"op": "remove_vertex", "id": 5, "x": 100, "y": 0,
+                    "edges": [[edge.start_vertex.id, edge.end_vertex.id, edge.weight]
+                              for edge in canvas.graph.incident_edges(5)]})
+    assert 5 not in forest.tree
+    assert_minimum(forest)
+
+
+def test_lighter_edge_replaces_the_heaviest_edge_of_its_cycle(qapp):
+    canvas, forest = tracked_canvas(4)
+    changes = []
+    forest.on_change = lambda added, removed: changes.append((added, removed))
+    for start, end, weight in ((1, 2, 1), (2, 3, 9), (3, 4, 2)):
+        canvas.execute({"op": "add_edge", "start": start, "end": end, "weight": weight})
+
+    canvas.execute({"op": "add_edge", "start": 1, "end": 3, "weight": 4})
+
+    assert changes[-1] == ({(1, 3)}, {(2, 3)})
+    assert forest.weight == 7
+
+    canvas.execute({"op": "remove_edge", "start": 1, "end": 3, "weight": 4})
+
+    assert changes[-1] == ({(2, 3)}, {(1, 3)})
+    assert forest.weight == 12
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from Core.graph import Graph, Vertex
+from Core.storage import pair_keys
+
+
+def cycle_graph(vertex_count):
+    """Цикл 1 - 2 - ... - vertex_count - 1, вес ребра равен id его начала"""
+    graph = Graph()
+    for vertex_id in range(1, vertex_count + 1):
+        graph.add_vertex(Vertex(vertex_id, x=vertex_id, y=-vertex_id))
+    for vertex_id in range(1, vertex_count + 1):
+        graph.add_edge(graph.vertices[vertex_id], graph.vertices[vertex_id % vertex_count + 1], weight=vertex_id)
+    return graph
+
+
+def assert_store_consistent(graph):
+    """Строки, объекты и списки полурёбер хранилища согласованы между собой"""
+    store = graph.store
+    assert store.vertex_count == len(graph.vertices)
+    for vertex_id, vertex in graph.vertices.items():
+        assert store.vertex_views[vertex._row] is vertex
+        assert int(store.vertex_ids[vertex._row]) == vertex_id
+    for row in range(store.edge_count):
+        start, end = store.edge_endpoints[row].tolist()
+        assert store.find_edge(start, end) == row
+        assert row in store.incident_rows(start) and row in store.incident_rows(end)
+    assert sum(len(store.incident_rows(row)) for row in range(store.vertex_count)) == 2 * store.edge_count
+
+
+def test_edge_removal_moves_the_last_row_into_the_gap():
+    graph = cycle_graph(5)
+    last = graph.get_edge(5, 1)
+    removed = graph.get_edge(2, 3)
+    row = removed._row
+
+    graph.remove_edge(removed)
+
+    assert removed._store is None
+    assert last._row == row
+    assert (last.start_vertex.id, last.end_vertex.id, last.weight) == (5, 1, 5)
+    assert graph.get_edge(2, 3) is None
+    assert_store_consistent(graph)
+
+
+def test_vertex_removal_fixes_up_edges_of_the_moved_vertex():
+    graph = cycle_graph(5)
+    moved = graph.vertices[5]
+    moved_edges = graph.incident_edges(5)
+
+    graph.remove_vertex(1)
+
+    assert moved._row == 0
+    assert (moved.x, moved.y) == (5, -5)
+    assert graph.incident_edges(5) == [edge for edge in moved_edges if edge.end_vertex.id != 1]
+    assert graph.get_edge(4, 5).start_vertex is graph.vertices[4]
+    assert graph.get_edge(4, 5).end_vertex is moved
+    assert_store_consistent(graph)
+
+
+def test_vertex_with_edges_cannot_be_removed_from_the_store():
+    graph = cycle_graph(3)
+    with pytest.raises(ValueError):
+        graph.store.remove_vertex_row(graph.vertex_row(2))
+
+
+def test_pair_lookup_survives_removals_and_table_growth():
+    graph = cycle_graph(40)
+    for vertex_id in range(1, 40, 3):
+        graph.remove_edge(graph.get_edge(vertex_id, vertex_id + 1))
+    graph.add_edges(np.arange(1, 21), np.arange(21, 41), np.ones(20))  # Таблица растёт поверх удалённых ключей
+
+    store = graph.store
+    assert graph.get_edge(2, 1) is None
+    assert graph.get_edge(3, 2).weight == 2
+    assert graph.get_edge(40, 20).weight == 1
+    keys = store.edge_keys(np.arange(store.edge_count))
+    assert store.find_edges(keys).tolist() == list(range(store.edge_count))
+    assert store.find_edges(pair_keys(np.array([0]), np.array([1]))).tolist() == [-1]
+    assert_store_consistent(graph)
@@ -0,0 +1,27 @@
+from Core.graph import Graph, Vertex
+from Core.styles import StyleTable
+
+
+def test_global_update_reaches_derived_styles():
+    graph = Graph()
+    first, second = Vertex(1), Vertex(2)
+    graph.add_vertex(first)
+    graph.add_vertex(second)
+    first.update_custom_params(color="red")
+    second.update_custom_params(color="red")
+    assert first.style_id == second.style_id != StyleTable.DEFAULT
+
+    graph.update_global_vertex_params(color="black", size=40)
+
+    assert first.params["size"] == 40
+    assert first.params["color"] == "red"  # Заменённый параметр не меняется
+    assert first.style_id in graph.vertex_styles.dependents(StyleTable.DEFAULT)
+
+
+def test_derive_without_real_changes_returns_the_base_style():
+    styles = StyleTable.for_edges()
+    red = styles.derive(StyleTable.DEFAULT, color="red")
+
+    assert styles.derive(StyleTable.DEFAULT, color=styles[StyleTable.DEFAULT].params["color"]) == StyleTable.DEFAULT
+    assert styles.derive(red, color=styles[StyleTable.DEFAULT].params["color"]) == StyleTable.DEFAULT
+    assert styles.derive(red, thickness=5) == styles.derive(StyleTable.DEFAULT, thickness=5, color="red")
@@ -0,0 +1,52 @@
+import json
+
+import numpy as np
+import pytest
+
+from Core.weight_matrix import SparseMatrix, check_incidence_matrix, load_weight_matrix, save_weight_matrix
+
+
+def test_malformed_incidence_weights_are_reported(tmp_path):
+    path = tmp_path / "incidence.json"
+    path.write_text(json.dumps({
+        "incidence_matrix": [[1, 1, 0], [1, 0, 1], [0, 1, 1]],
+        "weights": {"0": "heavy", "first": 2, "1": -1, "2": None},
+    }))
+    data = json.loads(path.read_text())
+
+    report = check_incidence_matrix(data["incidence_matrix"], data["weights"])
+
+    assert report.counts["weight_key"] == 1
+    assert report.counts["weight_value"] == 2
+    assert report.counts["weight"] == 1
+    assert report.counts["column"] == 0
+    assert "Ошибка: ключ весов 'first' не является номером столбца." in report.messages()
+    assert "Ошибка: вес 'heavy' у ребра из столбца 0 не является числом." in report.messages()
+
+
+@pytest.mark.parametrize("suffix", [".json", ".npz"])
+def test_sparse_matrix_survives_save_and_load(tmp_path, suffix):
+    dense = [[0, 2, None, 1.5],
+             [2, 0, 7, None],
+             [None, 7, 0, None],
+             [1.5, None, None, 0]]
+    matrix = SparseMatrix.from_dense(dense)
+    path = str(tmp_path / ("matrix" + suffix))
+
+    save_weight_matrix(matrix, path)
+    loaded = load_weight_matrix(path)
+
+    assert isinstance(loaded, SparseMatrix)
+    assert loaded.size == 4
+    assert loaded.check().valid
+    assert loaded.edges() == matrix.edges() == [{"start": 1, "end": 2, "weight": 2},
+                                                {"start": 1, "end": 4, "weight": 1.5},
+                                                {"start": 2, "end": 3, "weight": 7}]
+
+
+def test_csr_npz_is_read_as_sparse_matrix(tmp_path):
+    path = str(tmp_path / "matrix.npz")
+    np.savez_compressed(path, size=3, indptr=[0, 1, 2, 2], indices=[1, 2], values=[4.0, 0.5])
+
+    assert load_weight_matrix(path).edges() == [{"start": 1, "end": 2, "weight": 4},
+                                                {"start": 2, "end": 3, "weight": 0.5}]